@@ -0,0 +1,98 @@
+"""Time embedding generation and response encoding for batches of inputs.
+
+Run from the repository root with ``python benchmarks/bench_embeddings.py``.
+"""
+
+import asyncio
+import hashlib
+import time
+
+import numpy as np
+
+from mock_ai.models.embedding.similarity_embedding import (
+    SimilarityEmbeddingModel,
+)
+from mock_ai.models.embedding.standard_embedding import StandardEmbeddingModel
+from mock_ai.schemas.embedding_request import EmbeddingRequest
+from mock_ai.utils import normal_rows
+
+BATCH_SIZES = (1, 16, 256, 2048)
+DIMENSIONS = 1536
+REPEATS = 5
+
+
+def per_row(keys: list[str], n: int) -> list[np.ndarray]:
+    # One generator per input, as the model used to do.
+    rows = []
+    for key in keys:
+        digest = hashlib.md5(key.encode()).digest()
+        rng = np.random.default_rng(int.from_bytes(digest[:8]))
+        v = rng.normal(size=n)
+        rows.append(v / np.linalg.norm(v))
+    return rows
+
+
+def _seconds(generate, keys: list[str]) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        generate(keys, DIMENSIONS)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def _response(model: StandardEmbeddingModel, data: EmbeddingRequest):
+    start = time.perf_counter()
+    body = (await model.get_response(data)).model_dump_json()
+    return time.perf_counter() - start, len(body)
+
+
+def encoding_formats() -> None:
+    model = StandardEmbeddingModel("bench", dimensions=DIMENSIONS)
+    model.latency_profile = model.latency_profile.model_copy(
+        update={"ttft": 0.0, "prefill_per_token": 0.0}
+    )
+    print(f"\n{'batch':>6} {'format':>8} {'ms':>10} {'MB':>8}")
+    for batch_size in BATCH_SIZES:
+        keys = [f"document chunk {i}" for i in range(batch_size)]
+        for encoding_format in ("float", "base64"):
+            data = EmbeddingRequest(
+                input=keys, model="bench", encoding_format=encoding_format
+            )
+            seconds, size = asyncio.run(_response(model, data))
+            print(
+                f"{batch_size:>6} {encoding_format:>8} {seconds * 1000:>10.1f} "
+                f"{size / 1e6:>8.2f}"
+            )
+
+
+def similarity(documents: int = 20_000) -> None:
+    model = SimilarityEmbeddingModel("bench", dimensions=DIMENSIONS)
+    corpus = [
+        f"chunk {i} of topic {i % 50}: shared words and filler text that "
+        f"gives a retrieval chunk a realistic length, reference {i * 7}"
+        for i in range(documents)
+    ]
+    model.generate(corpus[:1], DIMENSIONS)
+    start = time.perf_counter()
+    model.generate(corpus, DIMENSIONS)
+    seconds = time.perf_counter() - start
+    print(f"\nsimilarity model: {documents / seconds:,.0f} documents/s")
+
+
+def main() -> None:
+    print(f"{'batch':>6} {'per row ms':>12} {'batched ms':>12} {'x':>6}")
+    for batch_size in BATCH_SIZES:
+        keys = [f"document chunk {i}" for i in range(batch_size)]
+        before = _seconds(per_row, keys)
+        after = _seconds(normal_rows, keys)
+        print(
+            f"{batch_size:>6} {before * 1000:>12.2f} {after * 1000:>12.2f} "
+            f"{before / after:>6.1f}"
+        )
+    encoding_formats()
+    similarity()
+
+
+if __name__ == "__main__":
+    main()
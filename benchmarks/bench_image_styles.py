@@ -0,0 +1,48 @@
+"""Compare encoded size and encode time of the noise and procedural styles.
+
+Run from the repository root with ``python benchmarks/bench_image_styles.py``.
+"""
+
+import io
+import time
+
+from mock_ai.utils import (
+    generate_noise_image_from_string,
+    generate_procedural_image_from_string,
+)
+
+SIDES = (256, 512, 1024, 2048)
+FORMATS = ("PNG", "JPEG", "WEBP")
+PROMPT = "a lighthouse on a cliff at dusk, oil painting"
+
+
+def _encode(img, format_: str) -> tuple[float, int]:
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    img.save(buffer, format=format_)
+    return time.perf_counter() - start, buffer.tell()
+
+
+def main() -> None:
+    print(
+        f"{'size':>11} {'format':>7} {'noise KiB':>10} {'noise ms':>9} "
+        f"{'proc KiB':>9} {'proc ms':>8} {'smaller':>8}"
+    )
+    for side in SIDES:
+        noise = generate_noise_image_from_string(PROMPT, side, side)
+        procedural = generate_procedural_image_from_string(
+            PROMPT, side, side, PROMPT
+        )
+        for format_ in FORMATS:
+            noise_seconds, noise_bytes = _encode(noise, format_)
+            seconds, size = _encode(procedural, format_)
+            print(
+                f"{f'{side}x{side}':>11} {format_:>7} "
+                f"{noise_bytes / 1024:>10.0f} {noise_seconds * 1000:>9.1f} "
+                f"{size / 1024:>9.0f} {seconds * 1000:>8.1f} "
+                f"{noise_bytes / size:>7.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
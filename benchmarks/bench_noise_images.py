@@ -0,0 +1,68 @@
+"""Compare peak memory and time of noise image generation across sizes.
+
+The last column cuts the same sizes out of a 4096x4096 noise atlas.
+
+Run from the repository root with ``python benchmarks/bench_noise_images.py``.
+The float64 implementation is skipped above ``FLOAT_MAX_SIDE``, where its
+temporaries would need several gigabytes.
+"""
+
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from mock_ai.noise_atlas import NoiseAtlas
+from mock_ai.utils import (
+    generate_noise_image_from_string,
+    random_gen_from_string,
+)
+
+SIDES = (256, 512, 1024, 2048, 4096, 8192)
+FLOAT_MAX_SIDE = 4096
+
+
+def float_noise(key: str, width: int, height: int) -> Image.Image:
+    # The generator as it was: float64 normals, normalized and cast.
+    rng = random_gen_from_string(key)
+    noise = rng.normal(0.0, 1.0, (height, width, 3))
+    noise = (noise - noise.min()) / (noise.max() - noise.min())
+    return Image.fromarray((noise * 255).astype(np.uint8), mode="RGB")
+
+
+def _measure(generate, side: int) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    generate("benchmark", side, side)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20
+
+
+def main() -> None:
+    generate_noise_image_from_string("warm up", 8, 8)
+    atlas = NoiseAtlas(Path(tempfile.mkdtemp()) / "atlas")
+    atlas.load()
+    print(
+        f"{'size':>11} {'float ms':>10} {'float MiB':>10} "
+        f"{'uint8 ms':>10} {'uint8 MiB':>10} {'atlas ms':>10}"
+    )
+    for side in SIDES:
+        before = f"{'-':>10} {'-':>10}"
+        if side <= FLOAT_MAX_SIDE:
+            seconds, mib = _measure(float_noise, side)
+            before = f"{seconds * 1000:>10.1f} {mib:>10.1f}"
+        seconds, mib = _measure(generate_noise_image_from_string, side)
+        atlas_seconds, _ = _measure(atlas.render, side)
+        print(
+            f"{f'{side}x{side}':>11} {before} {seconds * 1000:>10.1f} "
+            f"{mib:>10.1f} {atlas_seconds * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
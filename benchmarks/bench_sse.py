@@ -0,0 +1,40 @@
+"""Compare per-chunk cost of Pydantic SSE encoding and pre-encoded frames.
+
+Run from the repository root with ``python benchmarks/bench_sse.py``.
+"""
+
+import asyncio
+import time
+
+from mock_ai.models.chat.chat_stream import ChatCompletionStream
+from mock_ai.utils import SSEEncoder, token_vocabulary
+
+CHUNKS = 100_000
+
+
+async def _deltas():
+    vocabulary = token_vocabulary()
+    for _ in range(CHUNKS):
+        yield vocabulary.sample(10)
+
+
+async def _drain(frames) -> float:
+    start = time.process_time()
+    async for _ in frames:
+        pass
+    return time.process_time() - start
+
+
+async def main() -> None:
+    baseline = await _drain(_deltas())
+    pydantic = await _drain(SSEEncoder(ChatCompletionStream("m", _deltas())))
+    frames = await _drain(ChatCompletionStream("m", _deltas()).sse())
+
+    print(f"{'encoder':>10} {'us/chunk':>10}")
+    for name, seconds in (("pydantic", pydantic), ("frames", frames)):
+        per_chunk = (seconds - baseline) / CHUNKS * 1e6
+        print(f"{name:>10} {per_chunk:>10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+"""Compare token throughput of ``TokenBatchFactory`` and ``TokenVocabulary``.
+
+Run from the repository root with ``python benchmarks/bench_tokens.py``.
+"""
+
+import time
+
+from mock_ai.utils import TokenBatchFactory, token_vocabulary
+
+CHUNK_SIZES = (1, 10, 100, 1000)
+DURATION = 1.0
+
+
+def _tokens_per_second(produce, chunk_size: int) -> float:
+    chunks = 0
+    start = time.perf_counter()
+    deadline = start + DURATION
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            produce(chunk_size)
+        chunks += 100
+    return chunks * chunk_size / (time.perf_counter() - start)
+
+
+def main() -> None:
+    vocabulary = token_vocabulary()
+
+    # The chat model used to build a new factory for every chunk.
+    def factory(size: int) -> str:
+        return next(TokenBatchFactory(size))
+
+    print(f"{'chunk':>6} {'factory tok/s':>16} {'vocab tok/s':>16} {'x':>6}")
+    for chunk_size in CHUNK_SIZES:
+        before = _tokens_per_second(factory, chunk_size)
+        after = _tokens_per_second(vocabulary.sample, chunk_size)
+        print(
+            f"{chunk_size:>6} {before:>16,.0f} {after:>16,.0f} "
+            f"{after / before:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
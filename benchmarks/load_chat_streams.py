@@ -0,0 +1,117 @@
+"""Load test concurrent ``/v1/chat/completions`` streams in one process.
+
+Requests are driven straight through the ASGI app, so the numbers measure
+the server side only: CPU time, wall time, ASGI body writes per second (each
+one a ``send`` syscall on a real socket) and event-loop lag (how late a
+10 ms probe timer fires) while all streams are open. Each stream echoes a
+message in 40 chunks 10 ms apart. Streams are paced with one
+``asyncio.sleep`` per chunk, with the shared tick scheduler, and with the
+scheduler plus SSE write coalescing.
+
+Run from the repository root, optionally passing stream counts::
+
+    python benchmarks/load_chat_streams.py 1000 10000 50000
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from mock_ai.app import api_app
+from mock_ai.settings import pacing_settings, stream_settings
+
+DEFAULT_STREAMS = (1_000, 10_000, 50_000)
+PROBE_INTERVAL = 0.01
+FLUSH_INTERVAL = 0.05
+BODY = json.dumps(
+    {
+        "model": "parrot-chat-model",
+        "messages": [{"role": "user", "content": "0123456789" * 40}],
+        "stream": True,
+    }
+).encode()
+# (name, use_scheduler, flush_interval)
+MODES = (
+    ("sleep", False, 0.0),
+    ("scheduler", True, 0.0),
+    ("coalesced", True, FLUSH_INTERVAL),
+)
+
+
+async def _stream(done: asyncio.Event) -> int:
+    """Run one stream and return the number of body writes."""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "POST",
+        "path": "/v1/chat/completions",
+        "raw_path": b"/v1/chat/completions",
+        "query_string": b"",
+        "root_path": "",
+        "scheme": "http",
+        "server": ("test", 80),
+        "headers": [(b"content-type", b"application/json")],
+    }
+    sent = False
+    writes = 0
+
+    async def receive() -> dict:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": BODY}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal writes
+        if message["type"] == "http.response.body" and message.get("body"):
+            writes += 1
+
+    await api_app(scope, receive, send)
+    return writes
+
+
+async def _probe(stop: asyncio.Event, lags: list[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - start - PROBE_INTERVAL)
+
+
+async def _run(streams: int) -> tuple[float, float, int, float, float]:
+    done, stop = asyncio.Event(), asyncio.Event()
+    lags: list[float] = []
+    probe = asyncio.create_task(_probe(stop, lags))
+    cpu, wall = time.process_time(), time.perf_counter()
+    writes = await asyncio.gather(*(_stream(done) for _ in range(streams)))
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    done.set()
+    stop.set()
+    await probe
+    return cpu, wall, sum(writes), statistics.mean(lags), max(lags)
+
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_STREAMS
+    print(
+        f"{'streams':>8} {'mode':>10} {'cpu s':>8} {'wall s':>8} "
+        f"{'writes/s':>10} {'lag avg ms':>11} {'lag max ms':>11}"
+    )
+    for streams in counts:
+        for mode, use_scheduler, flush_interval in MODES:
+            pacing_settings.use_scheduler = use_scheduler
+            stream_settings.flush_interval = flush_interval
+            cpu, wall, writes, lag, max_lag = asyncio.run(_run(streams))
+            print(
+                f"{streams:>8} {mode:>10} {cpu:>8.2f} {wall:>8.2f} "
+                f"{writes / wall:>10.0f} {lag * 1e3:>11.2f} "
+                f"{max_lag * 1e3:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
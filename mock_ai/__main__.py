@@ -1,3 +1,6 @@
+import itertools
+import json
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Annotated, Any
 
@@ -228,5 +231,77 @@ def run(
     )
 
 
+def _corpus_texts(corpus: Path, field: str) -> Iterator[str]:
+    with corpus.open(encoding="utf-8") as lines:
+        for line in lines:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            yield item if isinstance(item, str) else str(item[field])
+
+
+@app.command()
+def prewarm_embeddings(
+    corpus: Annotated[
+        Path,
+        typer.Argument(
+            help=(
+                "JSONL corpus, one string or one object with the text "
+                "in [blue]--field[/blue] per line."
+            ),
+            exists=True,
+            dir_okay=False,
+        ),
+    ],
+    *,
+    model: Annotated[
+        str, typer.Option(help="Embedding model to prewarm.")
+    ] = "mock-embedding-model",
+    dimensions: Annotated[
+        int | None,
+        typer.Option(
+            help=(
+                "Largest vector dimensions served, the model default if "
+                "unset; smaller ones share the full width vectors."
+            )
+        ),
+    ] = None,
+    field: Annotated[
+        str, typer.Option(help="Text field of JSON object lines.")
+    ] = "text",
+    batch_size: Annotated[
+        int, typer.Option(help="Texts generated per batch.")
+    ] = 1024,
+) -> Any:
+    """Fill the embedding store with the vectors of a corpus."""
+    from mock_ai.embedding_store import embedding_store
+    from mock_ai.models.embedding.standard_embedding import (
+        StandardEmbeddingModel,
+    )
+    from mock_ai.models.standard_registry import STANDARD_REGISTRY
+
+    embedding_model = STANDARD_REGISTRY.get(model)
+    if not isinstance(embedding_model, StandardEmbeddingModel):
+        err_console.print(f"[red]{model} is not a standard embedding model[/]")
+        raise typer.Exit(code=1)
+
+    embedding_store.enabled = True
+    # Requests read the store at full width and shorten the vectors, so
+    # smaller dimensions are prewarmed at full width too.
+    dimensions = embedding_model.stored_dimensions(dimensions or 0)
+    texts = _corpus_texts(corpus, field)
+    total = 0
+    while batch := list(itertools.islice(texts, batch_size)):
+        embedding_model.embed(batch, dimensions)
+        total += len(batch)
+
+    stats = embedding_store.stats()
+    console.print(
+        f"Embedded {total} texts into {embedding_store.path}: "
+        f"{stats['vectors']} vectors stored, {stats['rejected']} skipped "
+        "because the store is full"
+    )
+
+
 if __name__ == "__main__":
     main()
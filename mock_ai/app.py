@@ -1,11 +1,39 @@
-import io
-
-from fastapi import Depends, FastAPI, HTTPException, Request, status
+import base64
+import hashlib
+import json
+import re
+from collections.abc import Awaitable, Callable
+from typing import Annotated, get_args
+
+from fastapi import (
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    Request,
+    status,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, StreamingResponse
+from fastapi.responses import Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import BaseModel
 
-from mock_ai.exceptions import FileNotFound, ModelNotFound, ModelTypeError
+from mock_ai.artifacts import (
+    IMMUTABLE,
+    artifact_cache,
+    artifact_response,
+    etag_matches,
+)
+from mock_ai.cache import response_cache
+from mock_ai.embedding_store import embedding_store
+from mock_ai.exceptions import (
+    FileNotFound,
+    ModelNotFound,
+    ModelTypeError,
+    RateLimitExceeded,
+    RequestTooLarge,
+)
+from mock_ai.executor import executor
 from mock_ai.mcps import mcp_stateless, mcp_steteful
 from mock_ai.models import (
     ChatModel,
@@ -14,8 +42,23 @@ from mock_ai.models import (
     OcrModel,
     SpeechModel,
 )
+from mock_ai.models.base_ai_model import BaseAIModel
 from mock_ai.models.standard_registry import STANDARD_REGISTRY
+from mock_ai.models.text_to_image.standard_image import (
+    ImageStyle,
+    render_b64,
+)
+from mock_ai.noise_atlas import noise_atlas
+from mock_ai.prefix_cache import prefix_cache
+from mock_ai.rate_limit import (
+    MemoryBuckets,
+    RateLimit,
+    RateLimiter,
+    RateLimitHeadersMiddleware,
+    SharedBuckets,
+)
 from mock_ai.schemas.chat_completion_request import ChatCompletionRequest
+from mock_ai.schemas.completion_response import created_factory, id_factory
 from mock_ai.schemas.embedding_request import EmbeddingRequest
 from mock_ai.schemas.embedding_response import EmbeddingResponse
 from mock_ai.schemas.image_request import ImageRequest
@@ -24,10 +67,15 @@ from mock_ai.schemas.models_response import ModelInfo, ModelsResponse
 from mock_ai.schemas.ocr_request import OcrRequest
 from mock_ai.schemas.ocr_response import Document
 from mock_ai.schemas.speech_request import SpeechRequest
-from mock_ai.settings import auth_settings, cors_settings
+from mock_ai.settings import (
+    auth_settings,
+    cors_settings,
+    rate_limit_settings,
+    stream_settings,
+)
+from mock_ai.streaming import ChatStreamingResponse, stream_stats
+from mock_ai.tokenizer import count_messages, count_text
 from mock_ai.utils import (
-    SSEEncoder,
-    generate_noise_image_from_string,
     get_data_from_image_id,
     parse_dimensions,
 )
@@ -59,6 +107,7 @@ def create_app() -> FastAPI:
         allow_methods=cors_settings.allow_methods,
         allow_headers=cors_settings.allow_headers,
     )
+    app.add_middleware(RateLimitHeadersMiddleware)
 
     return app
 
@@ -66,6 +115,153 @@ def create_app() -> FastAPI:
 api_app = create_app()
 
 
+def create_rate_limiter() -> RateLimiter:
+    """Create the rate limiter from the settings."""
+    buckets: MemoryBuckets | SharedBuckets = MemoryBuckets()
+    if rate_limit_settings.backend == "shared":
+        buckets = SharedBuckets(
+            rate_limit_settings.shared_file, rate_limit_settings.shared_slots
+        )
+    return RateLimiter(
+        RateLimit(
+            requests_per_minute=rate_limit_settings.requests_per_minute,
+            tokens_per_minute=rate_limit_settings.tokens_per_minute,
+        ),
+        rate_limit_settings.models,
+        buckets,
+        enabled=rate_limit_settings.enabled,
+    )
+
+
+rate_limiter = create_rate_limiter()
+
+
+def _request_tokens(body: dict) -> int:
+    """Tokens charged to the tokens-per-minute budget of a request.
+
+    Like provider limits, chat requests are charged for the prompt and the
+    maximum completion length of every choice. The body is not validated
+    yet, so malformed parts are skipped and left to the request schema.
+    """
+    if isinstance(body.get("messages"), list):
+        messages = [m for m in body["messages"] if isinstance(m, dict)]
+        max_tokens = [
+            value
+            for value in (
+                body.get("max_tokens"),
+                body.get("max_completion_tokens"),
+            )
+            if isinstance(value, int)
+        ]
+        n = body.get("n")
+        choices = n if isinstance(n, int) and n > 0 else 1
+        return count_messages(messages) + choices * min(max_tokens, default=0)
+    texts = body.get("input")
+    if isinstance(texts, str):
+        return count_text(texts)
+    if isinstance(texts, list):
+        return sum(count_text(text) for text in texts if isinstance(text, str))
+    return 0
+
+
+async def rate_limit(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+) -> None:
+    """Charge the request to the rate limits of its bearer token and model."""
+    if not rate_limiter.enabled:
+        return
+    try:
+        body = await request.json()
+    except ValueError:
+        # Malformed JSON is rejected by the request validation.
+        return
+    if not isinstance(body, dict) or not isinstance(body.get("model"), str):
+        return
+    if STANDARD_REGISTRY.get(body["model"]) is None:
+        return
+    caller = credentials.credentials if credentials else ""
+    tokens = _request_tokens(body)
+    status = rate_limiter.acquire(caller, body["model"], tokens)
+    if status.too_large:
+        assert status.limit.tokens_per_minute is not None
+        raise RequestTooLarge(status.limit.tokens_per_minute, tokens)
+    if not status.allowed:
+        raise RateLimitExceeded(status.headers())
+    request.state.rate_limit = status
+
+
+class ChatReplay:
+    """Refresh the per-request fields of a replayed chat completion.
+
+    The cached body keeps holes where its ``id``, ``created`` and cached
+    prompt tokens were; a hit splices a new completion id, the current
+    time and the prompt's prefix cache match into them, without parsing
+    the body. A hole is a NUL byte, which JSON text never contains
+    unescaped, followed by the field's tag.
+    """
+
+    FIELDS = re.compile(rb'"(id|created|cached_tokens)":("[^"]*"|\d+)')
+    TAGS = {b"id": b"i", b"created": b"t", b"cached_tokens": b"c"}
+    HOLE = re.compile(rb"\x00([itc])")
+
+    def __init__(self, model: ChatModel, messages: list[dict]):
+        self.model = model
+        self.messages = messages
+
+    @classmethod
+    def template(cls, content: bytes) -> bytes:
+        """Cut the first value of each replayed field out of ``content``."""
+        parts = []
+        seen = set()
+        start = 0
+        for field in cls.FIELDS.finditer(content):
+            tag = cls.TAGS[field[1]]
+            if tag in seen:
+                continue
+            seen.add(tag)
+            parts += [content[start : field.start(2)], b"\x00", tag]
+            start = field.end(2)
+        parts.append(content[start:])
+        return b"".join(parts)
+
+    def fill(self, template: bytes) -> bytes:
+        cached = self.model.count_prompt(self.messages).cached
+        values = {
+            b"i": json.dumps(id_factory()).encode(),
+            b"t": str(created_factory()).encode(),
+            b"c": str(cached or 0).encode(),
+        }
+        return self.HOLE.sub(lambda hole: values[hole[1]], template)
+
+
+async def cached_json_response(
+    model: BaseAIModel,
+    data: BaseModel,
+    generate: Callable[[], Awaitable[BaseModel]],
+    replay: ChatReplay | None = None,
+) -> Response:
+    """Serve a JSON response from the response cache, generating on a miss.
+
+    A repeated request still waits the model's base time to first token.
+    With ``replay``, the body is cached as its template and filled in on
+    every hit.
+    """
+    key = response_cache.key(model.key, data)
+    content = response_cache.get(key)
+    if content is None:
+        model_response = await generate()
+        content = model_response.model_dump_json().encode()
+        response_cache.put(
+            key, content if replay is None else replay.template(content)
+        )
+    else:
+        await model.wait_first_token()
+        if replay is not None:
+            content = replay.fill(content)
+    return Response(content=content, media_type="application/json")
+
+
 @api_app.get("/v1/models/", response_model=ModelsResponse)
 async def models() -> ModelsResponse:
     return STANDARD_REGISTRY.get_models()
@@ -79,7 +275,7 @@ async def model(model_name: str) -> ModelInfo:
     return model.model_info
 
 
-@api_app.post("/v1/chat/completions")
+@api_app.post("/v1/chat/completions", dependencies=[Depends(rate_limit)])
 async def chat_completions(
     data: ChatCompletionRequest,
 ) -> Response:
@@ -91,34 +287,48 @@ async def chat_completions(
     model_settings = data.to_settings()
     if data.stream:
         stream_response = await model.get_response(model_settings, True)
-        return StreamingResponse(
-            SSEEncoder(stream_response), media_type="text/event-stream"
+        return ChatStreamingResponse(
+            stream_response,
+            flush_interval=(
+                stream_settings.flush_interval if model.coalesce_stream else 0
+            ),
+            flush_bytes=stream_settings.flush_bytes,
         )
     else:
-        model_response = await model.get_response(model_settings, False)
-        return Response(
-            content=model_response.model_dump_json(),
-            media_type="application/json",
+        return await cached_json_response(
+            model,
+            data,
+            lambda: model.get_response(model_settings, False),
+            ChatReplay(model, model_settings.messages),
         )
 
 
-@api_app.post("/v1/embeddings")
+@api_app.post(
+    "/v1/embeddings",
+    response_model=EmbeddingResponse,
+    dependencies=[Depends(rate_limit)],
+)
 async def embeddings(
     data: EmbeddingRequest,
-) -> EmbeddingResponse:
+) -> Response:
     model = STANDARD_REGISTRY.get(data.model)
     if model is None:
         raise ModelNotFound(data.model)
     if not isinstance(model, EmbeddingModel):
         raise ModelTypeError(data.model, "embedding")
-    model_response = await model.get_response(data)
-    return model_response
+    return await cached_json_response(
+        model, data, lambda: model.get_response(data)
+    )
 
 
-@api_app.post("/v1/images/generations")
+@api_app.post(
+    "/v1/images/generations",
+    response_model=ImageResponse[ImageUrl] | ImageResponse[ImageB64],
+    dependencies=[Depends(rate_limit)],
+)
 async def images_generations(
     data: ImageRequest, request: Request
-) -> ImageResponse[ImageUrl] | ImageResponse[ImageB64]:
+) -> ImageResponse[ImageUrl] | Response:
     model = STANDARD_REGISTRY.get(data.model)
     if model is None:
         raise ModelNotFound(data.model)
@@ -129,55 +339,115 @@ async def images_generations(
         for image in model_response_urls.data:
             image.url = str(request.base_url) + image.url
         return model_response_urls
-    elif data.response_format == "b64_json":
-        model_response_b64 = await model.get_response(data, "b64_json")
-        return model_response_b64
+    else:
+        return await cached_json_response(
+            model, data, lambda: model.get_response(data, "b64_json")
+        )
 
 
 @api_app.get("/private/images/{id_}.{ext}")
-async def private(id_: str, ext: str) -> Response:
+async def private(
+    id_: str,
+    ext: str,
+    if_none_match: Annotated[str | None, Header()] = None,
+    range_: Annotated[str | None, Header(alias="range")] = None,
+    if_range: Annotated[str | None, Header()] = None,
+) -> Response:
     data = get_data_from_image_id(id_)
     if data is None:
         raise FileNotFound()
     try:
-        size, format_ = data.split("|")
+        size, format_, *extra = data.split("|", 3)
     except Exception:
         raise FileNotFound()
-    width, height = parse_dimensions(size)
-    img = generate_noise_image_from_string(id_, width, height)
-    buffer = io.BytesIO()
-    img.save(buffer, format=format_)
-    img_data = buffer.getvalue()
-    return Response(content=img_data, media_type=f"image/{format_.lower()}")
+    style = extra[0] if extra else "noise"
+    if style not in get_args(ImageStyle):
+        raise FileNotFound()
+    text = extra[1] if len(extra) > 1 else None
+    headers = {"ETag": f'"{id_}"', "Cache-Control": IMMUTABLE}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    key = ("private-images", id_)
+    img_data = artifact_cache.get(key)
+    if img_data is None:
+        width, height = parse_dimensions(size)
+        # Rendered like the b64_json responses, so both stay in step.
+        encoded = await executor.run(
+            "private-images",
+            "image",
+            render_b64,
+            id_,
+            width,
+            height,
+            format_,
+            style,
+            text,
+        )
+        img_data = base64.b64decode(encoded)
+        artifact_cache.put(key, img_data)
+    return artifact_response(
+        img_data, f"image/{format_.lower()}", headers, range_, if_range
+    )
 
 
-@api_app.post("/v1/audio/speech")
-async def speech_generation(data: SpeechRequest) -> Response:
+@api_app.post("/v1/audio/speech", dependencies=[Depends(rate_limit)])
+async def speech_generation(
+    data: SpeechRequest,
+    range_: Annotated[str | None, Header(alias="range")] = None,
+    if_range: Annotated[str | None, Header()] = None,
+) -> Response:
     model = STANDARD_REGISTRY.get(data.model)
     if model is None:
         raise ModelNotFound(data.model)
     if not isinstance(model, SpeechModel):
         raise ModelTypeError(data.model, "text to speech")
-    audio_data = await model.get_response(data)
-    return Response(
-        content=audio_data,
-        media_type=f"audio/{data.response_format}",
-        headers={
-            "Content-Length": str(len(audio_data)),
-            "Accept-Ranges": "bytes",
-        },
+    # Seeking players send the same request with a new Range, so the audio
+    # is cached and every range is a slice of the same buffer.
+    key = response_cache.key(model.key, data)
+    audio_data = artifact_cache.get(key)
+    if audio_data is None:
+        audio_data = await model.get_response(data)
+        artifact_cache.put(key, audio_data)
+    else:
+        await model.wait_first_token()
+    # The tag hashes the audio itself, so a re-registered model with other
+    # settings does not match the ranges and tags of its old audio.
+    etag = hashlib.blake2b(audio_data, digest_size=16).hexdigest()
+    return artifact_response(
+        audio_data,
+        f"audio/{data.response_format}",
+        {"ETag": f'"{etag}"'},
+        range_,
+        if_range,
     )
 
 
-@api_app.post("/v1/ocr")
-async def ocr(data: OcrRequest) -> Document:
+@api_app.post(
+    "/v1/ocr", response_model=Document, dependencies=[Depends(rate_limit)]
+)
+async def ocr(data: OcrRequest) -> Response:
     model = STANDARD_REGISTRY.get(data.model)
     if model is None:
         raise ModelNotFound(data.model)
     if not isinstance(model, OcrModel):
         raise ModelTypeError(data.model, "ocr")
-    document = await model.get_response(data)
-    return document
+    return await cached_json_response(
+        model, data, lambda: model.get_response(data)
+    )
+
+
+@api_app.get("/private/stats")
+async def stats() -> dict[str, dict]:
+    return {
+        "response_cache": response_cache.stats(),
+        "prefix_cache": prefix_cache.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "streams": stream_stats.stats(),
+        "embedding_store": embedding_store.stats(),
+        "noise_atlas": noise_atlas.stats(),
+        "executor": executor.stats(),
+        "artifact_cache": artifact_cache.stats(),
+    }
 
 
 from collections.abc import AsyncIterator
@@ -189,11 +459,16 @@ from starlette.routing import Mount
 
 @asynccontextmanager
 async def lifespan(app: Starlette) -> AsyncIterator[None]:
-    async with (
-        mcp_steteful.session_manager.run(),
-        mcp_stateless.session_manager.run(),
-    ):
-        yield
+    if noise_atlas.enabled:
+        noise_atlas.load()
+    try:
+        async with (
+            mcp_steteful.session_manager.run(),
+            mcp_stateless.session_manager.run(),
+        ):
+            yield
+    finally:
+        executor.shutdown()
 
 
 app = Starlette(
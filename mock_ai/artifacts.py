@@ -0,0 +1,123 @@
+import uuid
+
+from fastapi.responses import Response
+
+from mock_ai.cache import ResponseCache
+from mock_ai.settings import cache_settings
+
+# Generated artifacts are a pure function of their URL.
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Requests asking for more ranges are served in full.
+MAX_RANGES = 64
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag``.
+
+    Uses the weak comparison required for ``If-None-Match``, so a
+    ``W/``-prefixed copy of the tag also matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in tags
+
+
+def parse_ranges(header: str, size: int) -> list[tuple[int, int]] | None:
+    """Resolve a ``Range`` header to sorted, merged ``(start, stop)`` pairs.
+
+    Returns ``None`` when the header is malformed or uses another unit, in
+    which case it must be ignored, and an empty list when no range
+    overlaps the ``size`` bytes of the representation.
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs.strip():
+        return None
+    ranges = []
+    for spec in specs.split(","):
+        first, dash, last = spec.strip().partition("-")
+        if not dash or not (first + last).isdigit():
+            return None
+        if not first:
+            # A suffix range: the last ``last`` bytes.
+            if int(last):
+                ranges.append((max(size - int(last), 0), size))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, min(int(last) + 1 if last else size, size)))
+    if len(ranges) > MAX_RANGES:
+        return None
+    merged: list[tuple[int, int]] = []
+    for start, stop in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+def artifact_response(
+    content: bytes,
+    media_type: str,
+    headers: dict[str, str],
+    range_header: str | None = None,
+    if_range: str | None = None,
+) -> Response:
+    """Serve a generated artifact, honoring ``Range`` requests.
+
+    Single ranges are sent as a ``206`` slice of the cached bytes, several
+    ranges as ``multipart/byteranges`` and unsatisfiable ones get a
+    ``416``. An ``If-Range`` that does not match the ``ETag`` in
+    ``headers`` yields the full content.
+    """
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    size = len(content)
+    ranges = None
+    if range_header and (if_range is None or if_range == headers.get("ETag")):
+        ranges = parse_ranges(range_header, size)
+    if ranges is None:
+        return Response(content=content, media_type=media_type, headers=headers)
+    if not ranges:
+        return Response(
+            status_code=416,
+            headers={**headers, "Content-Range": f"bytes */{size}"},
+        )
+
+    view = memoryview(content)
+    if len(ranges) == 1:
+        start, stop = ranges[0]
+        return Response(
+            content=view[start:stop],
+            status_code=206,
+            media_type=media_type,
+            headers={
+                **headers,
+                "Content-Range": f"bytes {start}-{stop - 1}/{size}",
+            },
+        )
+    boundary = uuid.uuid4().hex
+    parts: list[bytes | memoryview] = []
+    for start, stop in ranges:
+        parts.append(
+            f"--{boundary}\r\nContent-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{stop - 1}/{size}\r\n\r\n".encode()
+        )
+        parts.append(view[start:stop])
+        parts.append(b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return Response(
+        content=b"".join(parts),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers,
+    )
+
+
+artifact_cache = ResponseCache(
+    cache_settings.artifact_max_bytes, enabled=cache_settings.enabled
+)
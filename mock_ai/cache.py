@@ -0,0 +1,86 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+from pydantic import BaseModel
+
+from mock_ai.settings import cache_settings
+
+
+class ResponseCache:
+    """LRU cache of serialized responses bounded by their total size.
+
+    Entries are keyed by model key and a canonical hash of the validated
+    request, and hold the final bytes sent to the client, so a hit skips
+    both generation and serialization.
+    """
+
+    def __init__(self, max_bytes: int, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(model_key: str, request: BaseModel) -> tuple[str, str]:
+        canonical = json.dumps(
+            request.model_dump(mode="json"),
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return model_key, digest
+
+    def get(self, key: tuple[str, str]) -> bytes | None:
+        if not self.enabled:
+            return None
+        content = self._entries.get(key)
+        if content is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return content
+
+    def put(self, key: tuple[str, str], content: bytes) -> None:
+        if not self.enabled or len(content) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = content
+        self.size += len(content)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def invalidate(self, model_key: str) -> None:
+        """Drop every entry produced by ``model_key``."""
+        for key in [key for key in self._entries if key[0] == model_key]:
+            self.size -= len(self._entries.pop(key))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+response_cache = ResponseCache(
+    cache_settings.max_bytes, enabled=cache_settings.enabled
+)
@@ -0,0 +1,211 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from mock_ai.settings import embedding_store_settings
+
+
+class EmbeddingStore:
+    """Embedding vectors persisted in a memory mapped file.
+
+    The file starts with a header and an open addressing index of
+    ``slots`` entries, keyed by a hash of the model key, the dimensions and
+    the input text, followed by an append-only region of float32 vectors.
+    Every worker maps the same file, so a vector generated once is served
+    to all of them by slicing the mapping. Lookups hold a shared ``flock``
+    and inserts an exclusive one; as ``flock`` does not keep the threads of
+    one process apart, both also hold a per-store thread lock. Once the
+    file reaches ``max_bytes`` or the index is three quarters full, new
+    vectors are no longer stored.
+    """
+
+    MAGIC = b"MOCKEMB1"
+    HEADER = struct.Struct("<8sQQQQ")
+    ENTRY = struct.Struct("<QQI4x")
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int,
+        slots: int = 1 << 20,
+        enabled: bool = True,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.slots = slots
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self._fd: int | None = None
+        self._map: mmap.mmap | None = None
+        self._thread_lock = threading.Lock()
+
+    @property
+    def data_offset(self) -> int:
+        return self.HEADER.size + self.ENTRY.size * self.slots
+
+    @staticmethod
+    def key(model_key: str, dimensions: int, text: str) -> int:
+        digest = hashlib.blake2b(
+            f"{model_key}\x00{dimensions}\x00{text}".encode(), digest_size=8
+        ).digest()
+        return int.from_bytes(digest) or 1
+
+    def _open(self) -> mmap.mmap:
+        import fcntl
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(fd, self.HEADER.size, 0)
+            if (
+                len(header) != self.HEADER.size
+                or self.HEADER.unpack(header)[:3]
+                != (self.MAGIC, self.slots, self.max_bytes)
+                or os.fstat(fd).st_size != self.max_bytes
+            ):
+                # A new file, or one made with other sizes: start over.
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self.max_bytes)
+                os.pwrite(
+                    fd,
+                    self.HEADER.pack(
+                        self.MAGIC, self.slots, self.max_bytes, 0, 0
+                    ),
+                    0,
+                )
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._map = mmap.mmap(fd, self.max_bytes)
+        return self._map
+
+    def _lock(self, operation: int) -> mmap.mmap:
+        import fcntl
+
+        self._thread_lock.acquire()
+        try:
+            data = self._map or self._open()
+            assert self._fd is not None
+            fcntl.flock(self._fd, operation)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return data
+
+    def _unlock(self) -> None:
+        import fcntl
+
+        assert self._fd is not None
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            self._thread_lock.release()
+
+    def _find(self, data: mmap.mmap, key: int) -> tuple[int, int, int]:
+        """Return the entry offset, vector offset and dimensions of a key.
+
+        A missing key yields the free entry to insert it into and a zero
+        vector offset.
+        """
+        for probe in range(self.slots):
+            entry = (
+                self.HEADER.size
+                + ((key + probe) % self.slots) * self.ENTRY.size
+            )
+            slot_key, offset, dimensions = self.ENTRY.unpack_from(data, entry)
+            if slot_key == key or slot_key == 0:
+                return entry, offset if slot_key else 0, dimensions
+        return 0, 0, 0
+
+    def get_many(
+        self, keys: list[int], dimensions: int
+    ) -> list[np.ndarray | None]:
+        """Return read-only views of the stored vectors, ``None`` if missing."""
+        if not self.enabled or not keys:
+            return [None] * len(keys)
+        import fcntl
+
+        data = self._lock(fcntl.LOCK_SH)
+        try:
+            vectors: list[np.ndarray | None] = []
+            for key in keys:
+                _, offset, stored_dimensions = self._find(data, key)
+                if offset and stored_dimensions == dimensions:
+                    vectors.append(
+                        np.frombuffer(
+                            data, dtype="<f4", count=dimensions, offset=offset
+                        )
+                    )
+                else:
+                    vectors.append(None)
+            found = sum(vector is not None for vector in vectors)
+            self.hits += found
+            self.misses += len(keys) - found
+        finally:
+            self._unlock()
+        return vectors
+
+    def put_many(self, keys: list[int], vectors: np.ndarray) -> int:
+        """Store the rows of ``vectors`` under ``keys``; return how many."""
+        if not self.enabled or not keys:
+            return 0
+        import fcntl
+
+        vectors = np.ascontiguousarray(vectors, dtype="<f4")
+        data = self._lock(fcntl.LOCK_EX)
+        stored = 0
+        try:
+            magic, slots, max_bytes, used, count = self.HEADER.unpack_from(
+                data, 0
+            )
+            used = max(used, self.data_offset)
+            for key, vector in zip(keys, vectors, strict=True):
+                entry, offset, _ = self._find(data, key)
+                if offset:
+                    continue
+                if (
+                    not entry
+                    or count * 4 >= self.slots * 3
+                    or used + vector.nbytes > self.max_bytes
+                ):
+                    self.rejected += 1
+                    continue
+                data[used : used + vector.nbytes] = vector.tobytes()
+                # The entry is written after its vector, so readers never
+                # see a key whose vector is incomplete.
+                self.ENTRY.pack_into(data, entry, key, used, len(vector))
+                used += vector.nbytes
+                count += 1
+                stored += 1
+            self.HEADER.pack_into(data, 0, magic, slots, max_bytes, used, count)
+        finally:
+            self._unlock()
+        return stored
+
+    def stats(self) -> dict[str, int]:
+        count = used = 0
+        if self.enabled and self._map is not None:
+            *_, used, count = self.HEADER.unpack_from(self._map, 0)
+        return {
+            "vectors": count,
+            "used_bytes": used,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+        }
+
+
+embedding_store = EmbeddingStore(
+    path=embedding_store_settings.path,
+    max_bytes=embedding_store_settings.max_bytes,
+    slots=embedding_store_settings.slots,
+    enabled=embedding_store_settings.enabled,
+)
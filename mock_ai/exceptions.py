@@ -19,3 +19,23 @@ class ModelTypeError(HTTPException):
 class FileNotFound(HTTPException):
     def __init__(self):
         super().__init__(status_code=404, detail="File not found")
+
+
+class RateLimitExceeded(HTTPException):
+    def __init__(self, headers: dict[str, str]):
+        super().__init__(
+            status_code=429,
+            detail="Rate limit reached, retry after the `retry-after` delay",
+            headers=headers,
+        )
+
+
+class RequestTooLarge(HTTPException):
+    def __init__(self, limit: int, requested: int):
+        super().__init__(
+            status_code=413,
+            detail=(
+                f"Request too large: limit {limit} tokens per minute, "
+                f"requested {requested}"
+            ),
+        )
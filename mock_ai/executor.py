@@ -0,0 +1,143 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal, TypeVar
+
+from mock_ai.settings import executor_settings
+
+T = TypeVar("T")
+
+ExecutorKind = Literal["inline", "thread", "process"]
+Workload = Literal["image", "speech", "ocr", "embedding"]
+
+
+class ModelQueue:
+    """Offloaded calls of one model: its concurrency limit and counters."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit)
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "limit": self.limit,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+class OffloadExecutor:
+    """Runs CPU-bound generation off the event loop.
+
+    Each workload runs inline, in a shared thread pool (NumPy, PIL and
+    libsndfile release the GIL for the heavy parts) or in a process pool,
+    whose calls and results must be picklable. Every model may run at
+    most ``model_limits.get(key, model_limit)`` calls at once; extra
+    calls wait in its queue, whose depth is reported by ``stats()``.
+    """
+
+    def __init__(
+        self,
+        workloads: dict[str, ExecutorKind] | None = None,
+        max_workers: int | None = None,
+        model_limit: int = 4,
+        model_limits: dict[str, int] | None = None,
+    ):
+        self.workloads = workloads or {}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.model_limit = model_limit
+        self.model_limits = model_limits or {}
+        self._pools: dict[ExecutorKind, Executor] = {}
+        self._queues: dict[str, ModelQueue] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _pool(self, kind: ExecutorKind) -> Executor:
+        pool = self._pools.get(kind)
+        if pool is None:
+            if kind == "process":
+                # Forking the threaded server could deadlock the children.
+                pool = ProcessPoolExecutor(
+                    self.max_workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+            else:
+                pool = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="mock-ai"
+                )
+            self._pools[kind] = pool
+        return pool
+
+    def _queue(self, model_key: str) -> ModelQueue:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores belong to the loop they were first used on.
+            self._loop = loop
+            self._queues.clear()
+        queue = self._queues.get(model_key)
+        if queue is None:
+            limit = self.model_limits.get(model_key, self.model_limit)
+            queue = self._queues[model_key] = ModelQueue(limit)
+        return queue
+
+    async def run(
+        self,
+        model_key: str,
+        workload: Workload,
+        func: Callable[..., T],
+        *args: object,
+    ) -> T:
+        """Run ``func(*args)`` for ``model_key`` and return its result."""
+        kind = self.workloads.get(workload, "thread")
+        if kind == "inline":
+            return func(*args)
+        queue = self._queue(model_key)
+        queue.queued += 1
+        try:
+            await queue.semaphore.acquire()
+        finally:
+            queue.queued -= 1
+        queue.running += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._pool(kind), functools.partial(func, *args)
+            )
+        except BaseException:
+            queue.failed += 1
+            raise
+        else:
+            queue.completed += 1
+            return result
+        finally:
+            queue.running -= 1
+            queue.semaphore.release()
+
+    def stats(self) -> dict[str, object]:
+        queues = {key: queue.stats() for key, queue in self._queues.items()}
+        names = ("queued", "running", "completed", "failed")
+        totals = dict.fromkeys(names, 0)
+        for queue_stats in queues.values():
+            for name in names:
+                totals[name] += queue_stats[name]
+        return {"max_workers": self.max_workers, **totals, "models": queues}
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools.clear()
+
+
+executor = OffloadExecutor(
+    workloads=executor_settings.workloads,
+    max_workers=executor_settings.max_workers,
+    model_limit=executor_settings.model_concurrency,
+    model_limits=executor_settings.models,
+)
@@ -0,0 +1,159 @@
+import math
+from typing import Annotated, Literal
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class _Distribution(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+
+class FixedDelay(_Distribution):
+    kind: Literal["fixed"] = "fixed"
+    value: float = Field(0.0, ge=0)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return np.full(size, self.value)
+
+
+class UniformDelay(_Distribution):
+    kind: Literal["uniform"] = "uniform"
+    low: float = Field(..., ge=0)
+    high: float = Field(..., ge=0)
+
+    @model_validator(mode="after")
+    def check_bounds(self) -> "UniformDelay":
+        if self.high < self.low:
+            raise ValueError("`high` must not be lower than `low`")
+        return self
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.uniform(self.low, self.high, size)
+
+
+class LogNormalDelay(_Distribution):
+    """Log-normal delays described by their median and log-space sigma."""
+
+    kind: Literal["lognormal"] = "lognormal"
+    median: float = Field(..., gt=0)
+    sigma: float = Field(..., ge=0)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.lognormal(math.log(self.median), self.sigma, size)
+
+
+class HistogramDelay(_Distribution):
+    """Empirical delays: pick a bin by weight, then a uniform value in it."""
+
+    kind: Literal["histogram"] = "histogram"
+    edges: list[float] = Field(..., min_length=2)
+    weights: list[float]
+
+    @model_validator(mode="after")
+    def check_bins(self) -> "HistogramDelay":
+        if len(self.weights) != len(self.edges) - 1:
+            raise ValueError("`weights` needs one entry per bin")
+        if any(b < a for a, b in zip(self.edges, self.edges[1:])):
+            raise ValueError("`edges` must be sorted")
+        if min(self.edges) < 0 or min(self.weights) < 0:
+            raise ValueError("`edges` and `weights` must be non-negative")
+        if sum(self.weights) <= 0:
+            raise ValueError("`weights` must not be all zero")
+        return self
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        edges = np.asarray(self.edges)
+        weights = np.asarray(self.weights)
+        bins = rng.choice(len(weights), size=size, p=weights / weights.sum())
+        return rng.uniform(edges[bins], edges[bins + 1])
+
+
+DelayDistribution = Annotated[
+    FixedDelay | UniformDelay | LogNormalDelay | HistogramDelay,
+    Field(discriminator="kind"),
+]
+
+
+class LatencyProfile(BaseModel):
+    """Simulated latency of a model.
+
+    The first chunk waits ``ttft`` plus ``prefill_per_token`` for every prompt
+    token; each chunk then waits a delay drawn from ``inter_chunk``. With
+    probability ``spike_probability`` a chunk is delayed further by a draw
+    from ``spike``, and ``max_tokens_per_second`` caps the output rate.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    ttft: float = Field(0.0, ge=0)
+    prefill_per_token: float = Field(0.0, ge=0)
+    inter_chunk: DelayDistribution = FixedDelay()
+    spike_probability: float = Field(0.0, ge=0, le=1)
+    spike: DelayDistribution = FixedDelay()
+    max_tokens_per_second: float | None = Field(None, gt=0)
+
+    def first_token_delay(self, prompt_tokens: int) -> float:
+        return self.ttft + self.prefill_per_token * prompt_tokens
+
+    def sample(
+        self, rng: np.random.Generator, size: int, tokens_per_chunk: float
+    ) -> np.ndarray:
+        """Draw ``size`` inter-chunk delays with spikes and rate cap."""
+        delays = self.inter_chunk.sample(rng, size)
+        if self.spike_probability:
+            spikes = rng.random(size) < self.spike_probability
+            delays[spikes] += self.spike.sample(rng, int(spikes.sum()))
+        if self.max_tokens_per_second:
+            np.maximum(
+                delays, tokens_per_chunk / self.max_tokens_per_second, delays
+            )
+        return delays
+
+    def sampler(
+        self,
+        rng: np.random.Generator,
+        tokens_per_chunk: float = 1,
+        prompt_tokens: int = 0,
+    ) -> "DelaySampler":
+        return DelaySampler(self, rng, tokens_per_chunk, prompt_tokens)
+
+
+class DelaySampler:
+    """Per-stream source of chunk delays.
+
+    Delays are drawn ``BLOCK_SIZE`` at a time, so a chunk only costs a list
+    lookup. The first delay also includes the time to first token.
+    """
+
+    BLOCK_SIZE = 64
+
+    def __init__(
+        self,
+        profile: LatencyProfile,
+        rng: np.random.Generator,
+        tokens_per_chunk: float = 1,
+        prompt_tokens: int = 0,
+    ):
+        self.profile = profile
+        self.rng = rng
+        self.tokens_per_chunk = tokens_per_chunk
+        self._block = self._draw()
+        self._block[0] += profile.first_token_delay(prompt_tokens)
+        self._position = 0
+
+    def _draw(self) -> list[float]:
+        return self.profile.sample(
+            self.rng, self.BLOCK_SIZE, self.tokens_per_chunk
+        ).tolist()
+
+    def __iter__(self) -> "DelaySampler":
+        return self
+
+    def __next__(self) -> float:
+        if self._position == len(self._block):
+            self._block = self._draw()
+            self._position = 0
+        delay = self._block[self._position]
+        self._position += 1
+        return delay
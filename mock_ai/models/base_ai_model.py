@@ -1,6 +1,8 @@
 import abc
+import asyncio
 from typing import final
 
+from mock_ai.latency import LatencyProfile
 from mock_ai.schemas.models_response import ModelInfo
 
 
@@ -15,6 +17,8 @@ class HasKey(abc.ABC):
 
 
 class BaseAIModel(HasKey):
+    latency_profile: LatencyProfile = LatencyProfile()
+
     @abc.abstractmethod
     def _get_model_info(self) -> ModelInfo:
         """Fetch raw model metadata."""
@@ -26,4 +30,11 @@ class BaseAIModel(HasKey):
         """Return model info with assigned model key."""
         model_info = self._get_model_info()
         model_info.id = self.key
+        model_info.latency_profile = self.latency_profile
         return model_info
+
+    async def wait_first_token(self, prompt_tokens: int = 0) -> None:
+        """Sleep for the simulated time to first token, if any."""
+        delay = self.latency_profile.first_token_delay(prompt_tokens)
+        if delay:
+            await asyncio.sleep(delay)
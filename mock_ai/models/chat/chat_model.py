@@ -1,20 +1,58 @@
 import abc
-from collections.abc import AsyncIterator
-from typing import Literal, overload
+from collections.abc import Sequence
+from typing import Literal, NamedTuple, overload
 
+from mock_ai.prefix_cache import prefix_cache
 from mock_ai.schemas import ModelSettings
 from mock_ai.schemas.completion_response import (
     ChatCompletionResponse,
-    DeltaChoice,
     MessageChoice,
 )
+from mock_ai.schemas.usage import PromptTokensDetails, Usage
+from mock_ai.tokenizer import count_messages
 
 from ..base_ai_model import BaseAIModel
+from .chat_stream import ChatCompletionStream
+
+
+class PromptTokens(NamedTuple):
+    """Prompt token count and the part served from the prefix cache."""
+
+    total: int
+    cached: int | None = None
+
+    @property
+    def prefill(self) -> int:
+        """Tokens that still need to be processed before the first token."""
+        return self.total - (self.cached or 0)
+
+    def usage(self, completion_tokens: int) -> Usage:
+        details = None
+        if self.cached is not None:
+            details = PromptTokensDetails(
+                cached_tokens=self.cached, audio_tokens=0
+            )
+        return Usage(
+            prompt_tokens=self.total,
+            completion_tokens=completion_tokens,
+            prompt_tokens_details=details,
+        )
 
 
 class ChatModel(BaseAIModel):
     """Base interface for calling a language model."""
 
+    # Whether streamed frames may be coalesced into fewer writes; models
+    # that need strict per-chunk timing set this to False.
+    coalesce_stream: bool = True
+
+    def count_prompt(self, messages: Sequence[dict]) -> PromptTokens:
+        """Count prompt tokens, looking the prompt up in the prefix cache."""
+        total = count_messages(messages)
+        if not prefix_cache.enabled:
+            return PromptTokens(total)
+        return PromptTokens(total, prefix_cache.match(self.key, messages))
+
     @overload
     async def get_response(
         self,
@@ -28,7 +66,7 @@ class ChatModel(BaseAIModel):
         self,
         model_settings: ModelSettings,
         stream: Literal[True],
-    ) -> AsyncIterator[ChatCompletionResponse[DeltaChoice]]:
+    ) -> ChatCompletionStream:
         """Stream chat completion deltas."""
 
     @abc.abstractmethod
@@ -36,8 +74,5 @@ class ChatModel(BaseAIModel):
         self,
         model_settings: ModelSettings,
         stream: bool,
-    ) -> (
-        ChatCompletionResponse
-        | AsyncIterator[ChatCompletionResponse[DeltaChoice]]
-    ):
+    ) -> ChatCompletionResponse | ChatCompletionStream:
         """Fetch chat completions, optionally streaming."""
@@ -0,0 +1,138 @@
+import json
+from collections.abc import AsyncGenerator, AsyncIterator, Iterator
+from typing import NamedTuple
+
+from mock_ai.schemas.completion_response import (
+    ChatCompletionResponse,
+    Delta,
+    DeltaChoice,
+    Usage,
+    created_factory,
+    id_factory,
+)
+from mock_ai.tokenizer import count_text
+
+_PLACEHOLDER = "\x00"
+_ENCODED_PLACEHOLDER = json.dumps(_PLACEHOLDER).encode()
+
+SSE_DONE = b"data: [DONE]\n\n"
+
+
+class ChoiceDelta(NamedTuple):
+    """Content delta of the choice with index ``choice``."""
+
+    choice: int
+    content: str
+
+
+StreamItem = str | ChoiceDelta | Usage
+
+
+def interleave(
+    choices: list[Iterator[tuple[str, int]]],
+) -> Iterator[list[tuple[ChoiceDelta, int]]]:
+    """Group the token chunks of several choices into rounds.
+
+    Each round holds the next chunk of every unfinished choice, with its
+    token count, so choices are streamed side by side like the real API.
+    """
+    active = dict(enumerate(choices))
+    while active:
+        round_ = []
+        for index, chunks in list(active.items()):
+            chunk = next(chunks, None)
+            if chunk is None:
+                del active[index]
+            else:
+                round_.append((ChoiceDelta(index, chunk[0]), chunk[1]))
+        if round_:
+            yield round_
+
+
+class ChatCompletionStream:
+    """Stream of ``chat.completion.chunk`` objects for one completion.
+
+    Models feed the stream with content deltas followed by an optional
+    ``Usage``. A plain string is a delta of the first choice, while
+    ``ChoiceDelta`` items interleave the deltas of several choices.
+    Iterating the stream yields ``ChatCompletionResponse`` chunks, while
+    ``sse`` renders Server-Sent Events frames directly: the constant parts
+    of a chunk are serialized once per stream and each delta only splices
+    in its JSON-escaped content.
+    """
+
+    def __init__(self, model: str, deltas: AsyncIterator[StreamItem]):
+        self.id = id_factory()
+        self.created = created_factory()
+        self.model = model
+        self.deltas = deltas
+        self.produced_bytes = 0
+        self.produced_tokens = 0
+
+    def __aiter__(self) -> "ChatCompletionStream":
+        return self
+
+    async def __anext__(self) -> ChatCompletionResponse[DeltaChoice]:
+        item = await anext(self.deltas)
+        if isinstance(item, Usage):
+            return self.chunk(choices=[], usage=item)
+        if isinstance(item, ChoiceDelta):
+            return self.chunk(
+                choices=[
+                    DeltaChoice(
+                        index=item.choice, delta=Delta(content=item.content)
+                    )
+                ]
+            )
+        return self.chunk(choices=[DeltaChoice(delta=Delta(content=item))])
+
+    def chunk(
+        self, choices: list[DeltaChoice], usage: Usage | None = None
+    ) -> ChatCompletionResponse[DeltaChoice]:
+        return ChatCompletionResponse(
+            id=self.id,
+            object="chat.completion.chunk",
+            created=self.created,
+            model=self.model,
+            choices=choices,
+            usage=usage,
+        )
+
+    def _frame_template(self, index: int = 0) -> tuple[bytes, bytes]:
+        template = self.chunk(
+            choices=[
+                DeltaChoice(index=index, delta=Delta(content=_PLACEHOLDER))
+            ]
+        )
+        prefix, suffix = (
+            template.model_dump_json().encode().split(_ENCODED_PLACEHOLDER)
+        )
+        return b"data: " + prefix, suffix + b"\n\n"
+
+    async def sse(self) -> AsyncGenerator[bytes]:
+        """Yield encoded SSE frames, terminated by ``data: [DONE]``."""
+        templates = {0: self._frame_template()}
+        async for item in self.deltas:
+            if isinstance(item, Usage):
+                chunk = self.chunk(choices=[], usage=item)
+                frame = f"data: {chunk.model_dump_json()}\n\n".encode()
+            else:
+                index = 0
+                if isinstance(item, ChoiceDelta):
+                    index, item = item
+                template = templates.get(index)
+                if template is None:
+                    template = templates[index] = self._frame_template(index)
+                prefix, suffix = template
+                content = json.dumps(item, ensure_ascii=False).encode()
+                frame = prefix + content + suffix
+                self.produced_tokens += count_text(item)
+            self.produced_bytes += len(frame)
+            yield frame
+        yield SSE_DONE
+
+    async def aclose(self) -> None:
+        """Stop the model generator feeding the stream."""
+        aclose = getattr(self.deltas, "aclose", None)
+        if aclose is not None:
+            await aclose()
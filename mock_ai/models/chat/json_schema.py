@@ -0,0 +1,392 @@
+import hashlib
+import json
+import math
+import string
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import numpy as np
+
+from mock_ai.tokenizer import token_chunks
+
+_Generate = Callable[[np.random.Generator, int], Any]
+_Emit = Callable[
+    [np.random.Generator, int, "TokenBudget | None"], Iterator[str]
+]
+SchemaEmitter = Callable[
+    [np.random.Generator, "TokenBudget | None"], Iterator[str]
+]
+
+CACHE_SIZE = 256
+# Beyond this nesting depth arrays get their minimum length and optional
+# properties are left out, so recursive schemas terminate.
+MAX_DEPTH = 8
+
+_LETTERS = np.frombuffer(string.ascii_letters.encode(), dtype=np.uint8)
+_WORDS = np.frombuffer(string.ascii_lowercase.encode(), dtype=np.uint8)
+_cache: OrderedDict[bytes, _Emit] = OrderedDict()
+
+
+class TokenBudget:
+    """Completion tokens left for a JSON document being emitted.
+
+    Once the budget is spent, arrays stop at their minimum length and
+    optional properties are skipped, so the document still closes cleanly.
+    """
+
+    def __init__(self, tokens: float):
+        self.remaining = tokens
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining <= 0
+
+    def spend(self, tokens: int) -> None:
+        self.remaining -= tokens
+
+
+def random_string(rng: np.random.Generator, length: int = 8) -> str:
+    indexes = rng.integers(0, len(_LETTERS), length)
+    return _LETTERS[indexes].tobytes().decode()
+
+
+def schema_emitter(response_format: dict) -> SchemaEmitter:
+    """Return a streaming generator for a ``json_schema`` response format.
+
+    The emitter lazily yields the JSON text of an instance in fragments, so
+    memory stays bounded however large the document is. It accepts both
+    the OpenAI ``{"name": ..., "schema": {...}}`` envelope and a bare
+    schema. Compiled schemas are kept in an LRU cache keyed by a hash of
+    the schema, so a schema sent on every request is compiled once.
+    """
+    schema = response_format
+    if "schema" in schema and isinstance(schema["schema"], dict):
+        schema = schema["schema"]
+    key = hashlib.blake2b(
+        json.dumps(schema, sort_keys=True, default=str).encode(),
+        digest_size=16,
+    ).digest()
+    emit = _cache.get(key)
+    if emit is not None:
+        _cache.move_to_end(key)
+    else:
+        emit = _cache[key] = _Compiler(schema).compile(schema)
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return lambda rng, budget: emit(rng, 0, budget)
+
+
+def schema_generator(
+    response_format: dict,
+) -> Callable[[np.random.Generator], Any]:
+    """Return a generator of instances of a ``json_schema`` response format."""
+    emit = schema_emitter(response_format)
+    return lambda rng: json.loads("".join(emit(rng, None)))
+
+
+def json_deltas(
+    response_format: dict,
+    rng: np.random.Generator,
+    max_tokens: float,
+    tokens_per_chunk: float,
+) -> Iterator[tuple[str, int]]:
+    """Stream the JSON content of a ``response_format`` as token chunks.
+
+    Yields each delta with its token count; the document is closed as soon
+    as the ``max_tokens`` budget allows.
+    """
+    if response_format.get("type") == "json_schema":
+        budget = TokenBudget(max_tokens)
+        emit = schema_emitter(response_format.get("json_schema", {}))
+        for delta, tokens in token_chunks(emit(rng, budget), tokens_per_chunk):
+            budget.spend(tokens)
+            yield delta, tokens
+    else:
+        content = json.dumps({"mock": random_string(rng, 4)})
+        yield from token_chunks((content,), tokens_per_chunk)
+
+
+def _leaf(generate: _Generate) -> _Emit:
+    def emit(
+        rng: np.random.Generator, depth: int, budget: TokenBudget | None
+    ) -> Iterator[str]:
+        yield json.dumps(generate(rng, depth))
+
+    return emit
+
+
+def _null(
+    rng: np.random.Generator, depth: int, budget: TokenBudget | None
+) -> Iterator[str]:
+    yield "null"
+
+
+def _choice(options: list[_Emit]) -> _Emit:
+    if not options:
+        # Nothing validates against an empty choice; emit null rather
+        # than fail on a client supplied schema.
+        return _null
+
+    def emit(
+        rng: np.random.Generator, depth: int, budget: TokenBudget | None
+    ) -> Iterator[str]:
+        yield from options[int(rng.integers(len(options)))](rng, depth, budget)
+
+    return emit
+
+
+def _enum(values: list) -> _Emit:
+    encoded = [json.dumps(value) for value in values]
+    if not encoded:
+        return _null
+    return lambda rng, depth, budget: iter(
+        (encoded[int(rng.integers(len(encoded)))],)
+    )
+
+
+def _string(schema: dict) -> _Generate:
+    format_ = schema.get("format")
+    if format_ == "date-time":
+        return lambda rng, depth: f"{_date(rng)}T{_time(rng)}Z"
+    if format_ == "date":
+        return lambda rng, depth: _date(rng)
+    if format_ == "time":
+        return lambda rng, depth: _time(rng)
+    if format_ == "email":
+        return lambda rng, depth: f"{_word(rng, 6)}@{_word(rng, 6)}.com"
+    if format_ in ("uri", "url"):
+        return lambda rng, depth: f"https://{_word(rng, 8)}.com/{_word(rng, 6)}"
+    if format_ == "hostname":
+        return lambda rng, depth: f"{_word(rng, 8)}.com"
+    if format_ == "ipv4":
+        return lambda rng, depth: ".".join(
+            map(str, rng.integers(1, 255, 4).tolist())
+        )
+    if format_ == "uuid":
+        return lambda rng, depth: str(uuid.UUID(bytes=rng.bytes(16), version=4))
+    min_length = schema.get("minLength", 0)
+    max_length = max(schema.get("maxLength", max(min_length, 8)), min_length)
+    if min_length == max_length:
+        return lambda rng, depth: random_string(rng, min_length)
+    low, high = max(min_length, min(8, max_length)), max_length
+    return lambda rng, depth: random_string(
+        rng, int(rng.integers(low, min(high, low + 8) + 1))
+    )
+
+
+def _word(rng: np.random.Generator, length: int) -> str:
+    return _WORDS[rng.integers(0, len(_WORDS), length)].tobytes().decode()
+
+
+def _date(rng: np.random.Generator) -> str:
+    year, month, day = rng.integers((2000, 1, 1), (2030, 13, 29))
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def _time(rng: np.random.Generator) -> str:
+    hour, minute, second = rng.integers(0, (24, 60, 60))
+    return f"{hour:02d}:{minute:02d}:{second:02d}"
+
+
+def _bounds(
+    schema: dict,
+) -> tuple[float | None, bool, float | None, bool]:
+    """Return the lower and upper bounds and whether each is exclusive.
+
+    Draft 4 marks ``minimum`` and ``maximum`` exclusive with booleans;
+    later drafts give ``exclusiveMinimum`` and ``exclusiveMaximum`` as
+    numbers, of which the tighter of each pair applies.
+    """
+    bounds: list[tuple[float | None, bool]] = []
+    for key, exclusive_key, tighter in (
+        ("minimum", "exclusiveMinimum", float.__ge__),
+        ("maximum", "exclusiveMaximum", float.__le__),
+    ):
+        bound, exclusive = _numeric(schema.get(key)), False
+        flag = schema.get(exclusive_key)
+        if flag is True:
+            exclusive = bound is not None
+        elif (value := _numeric(flag)) is not None and (
+            bound is None or tighter(value, bound)
+        ):
+            bound, exclusive = value, True
+        bounds.append((bound, exclusive))
+    (low, low_exclusive), (high, high_exclusive) = bounds
+    return low, low_exclusive, high, high_exclusive
+
+
+def _numeric(value: Any) -> float | None:
+    if isinstance(value, int | float) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def _integer(schema: dict) -> _Generate:
+    low, low_exclusive, high, high_exclusive = _bounds(schema)
+    top = None
+    if high is not None:
+        top = math.ceil(high) - 1 if high_exclusive else math.floor(high)
+    if low is not None:
+        bottom = math.floor(low) + 1 if low_exclusive else math.ceil(low)
+    else:
+        bottom = min(0, top - 100) if top is not None else 0
+    if top is None:
+        top = max(bottom, 0) + 100
+    # No integer satisfies an empty range: emit the lower bound.
+    top = max(top, bottom)
+    return lambda rng, depth: int(rng.integers(bottom, top + 1))
+
+
+def _number(schema: dict) -> _Generate:
+    low, low_exclusive, high, high_exclusive = _bounds(schema)
+    if low is None:
+        low = min(0.0, high - 100) if high is not None else 0.0
+    elif low_exclusive:
+        low = float(np.nextafter(low, np.inf))
+    if high is None:
+        high = max(low, 0.0) + 100
+    elif high_exclusive:
+        # ``uniform`` may round up to its upper bound.
+        high = float(np.nextafter(high, -np.inf))
+    high = max(high, low)
+    return lambda rng, depth: min(float(rng.uniform(low, high)), high)
+
+
+class _Compiler:
+    """Turns a JSON schema into nested emitter closures.
+
+    ``$ref`` targets are compiled once and looked up when emitting, which
+    keeps recursive schemas compilable.
+    """
+
+    def __init__(self, root: dict):
+        self.root = root
+        self.refs: dict[str, _Emit] = {}
+
+    def compile(self, schema: Any) -> _Emit:
+        if not isinstance(schema, dict):
+            return _leaf(lambda rng, depth: random_string(rng))
+        if "$ref" in schema:
+            return self._ref(schema["$ref"])
+        if "const" in schema:
+            const = json.dumps(schema["const"])
+            return lambda rng, depth, budget: iter((const,))
+        if "enum" in schema:
+            return _enum(schema["enum"])
+        for keyword in ("anyOf", "oneOf"):
+            if keyword in schema:
+                return _choice(
+                    [self.compile(option) for option in schema[keyword]]
+                )
+        if "allOf" in schema:
+            return self.compile(self._merge(schema))
+
+        type_ = schema.get("type")
+        if isinstance(type_, list):
+            return _choice([self.compile({**schema, "type": t}) for t in type_])
+        if type_ == "object" or (type_ is None and "properties" in schema):
+            return self._object(schema)
+        if type_ == "array" or (type_ is None and "items" in schema):
+            return self._array(schema)
+        if type_ == "integer":
+            return _leaf(_integer(schema))
+        if type_ == "number":
+            return _leaf(_number(schema))
+        if type_ == "boolean":
+            return _leaf(lambda rng, depth: bool(rng.integers(2)))
+        if type_ == "null":
+            return _null
+        return _leaf(_string(schema))
+
+    def _ref(self, ref: str) -> _Emit:
+        refs = self.refs
+        if ref not in refs:
+            # Mark the reference as being compiled so recursion stops here.
+            refs[ref] = _null
+            refs[ref] = self.compile(self._resolve(ref))
+        return lambda rng, depth, budget: refs[ref](rng, depth, budget)
+
+    def _merge(self, schema: dict) -> dict:
+        merged = {key: value for key, value in schema.items() if key != "allOf"}
+        for part in schema["allOf"]:
+            while isinstance(part, dict) and "$ref" in part and len(part) == 1:
+                part = self._resolve(part["$ref"])
+            if not isinstance(part, dict):
+                continue
+            for key, value in part.items():
+                if key == "properties":
+                    merged["properties"] = {
+                        **merged.get("properties", {}),
+                        **value,
+                    }
+                elif key == "required":
+                    merged["required"] = [*merged.get("required", []), *value]
+                else:
+                    merged.setdefault(key, value)
+        return merged
+
+    def _resolve(self, ref: str) -> Any:
+        target: Any = self.root
+        for part in ref.removeprefix("#").strip("/").split("/"):
+            if part:
+                part = part.replace("~1", "/").replace("~0", "~")
+                target = target.get(part) if isinstance(target, dict) else None
+        return target
+
+    def _object(self, schema: dict) -> _Emit:
+        properties = schema.get("properties") or {}
+        required = set(schema.get("required", properties))
+        fields = [
+            (f"{json.dumps(name)}: ", self.compile(sub), name in required)
+            for name, sub in properties.items()
+        ]
+
+        def emit(
+            rng: np.random.Generator, depth: int, budget: TokenBudget | None
+        ) -> Iterator[str]:
+            separator = "{"
+            for prefix, field, is_required in fields:
+                if not is_required and (
+                    depth >= MAX_DEPTH
+                    or (budget is not None and budget.exhausted)
+                    or not rng.integers(2)
+                ):
+                    continue
+                yield separator + prefix
+                yield from field(rng, depth + 1, budget)
+                separator = ", "
+            yield "{}" if separator == "{" else "}"
+
+        return emit
+
+    def _array(self, schema: dict) -> _Emit:
+        items = self.compile(schema.get("items", {}))
+        min_items = schema.get("minItems", 0)
+        max_items = schema.get("maxItems", max(min_items, 1) + 2)
+        low = min(max(min_items, 1), max_items)
+        high = max(max_items, low)
+
+        def emit(
+            rng: np.random.Generator, depth: int, budget: TokenBudget | None
+        ) -> Iterator[str]:
+            size = (
+                min_items
+                if depth >= MAX_DEPTH
+                else int(rng.integers(low, min(high, low + 3) + 1))
+            )
+            separator = "["
+            for index in range(size):
+                if (
+                    index >= min_items
+                    and budget is not None
+                    and budget.exhausted
+                ):
+                    break
+                yield separator
+                yield from items(rng, depth + 1, budget)
+                separator = ", "
+            yield "[]" if separator == "[" else "]"
+
+        return emit
@@ -1,19 +1,19 @@
-import asyncio
-from collections.abc import AsyncGenerator, AsyncIterator
+from collections.abc import AsyncGenerator
 from typing import Any, Literal, overload
 
+from mock_ai.latency import FixedDelay, LatencyProfile
+from mock_ai.pacing import Pacer
 from mock_ai.schemas.chat_completion_request import ModelSettings
 from mock_ai.schemas.completion_response import (
     ChatCompletionResponse,
-    Delta,
-    DeltaChoice,
     Message,
     MessageChoice,
-    Usage,
 )
 from mock_ai.schemas.models_response import ModelInfo
+from mock_ai.tokenizer import count_text
 
 from .chat_model import ChatModel
+from .chat_stream import ChatCompletionStream, ChoiceDelta, StreamItem
 
 MD_TEXT = """
 Here's a concise list of common Markdown formatting styles (in English), with examples:
@@ -126,6 +126,8 @@ MD_IMAGE = """18. **Markdown Image**
 
 
 class MarkdownChatModel(ChatModel):
+    latency_profile = LatencyProfile(inter_chunk=FixedDelay(value=0.2))
+
     @property
     def key(self) -> str:
         return "markdown-chat-model"
@@ -142,64 +144,48 @@ class MarkdownChatModel(ChatModel):
         self,
         model_settings: ModelSettings,
         stream: Literal[True],
-    ) -> AsyncIterator[ChatCompletionResponse[DeltaChoice]]: ...
+    ) -> ChatCompletionStream: ...
 
     async def get_response(
         self,
         model_settings: ModelSettings,
         stream: bool,
-    ) -> (
-        ChatCompletionResponse
-        | AsyncIterator[ChatCompletionResponse[DeltaChoice]]
-    ):
+    ) -> ChatCompletionResponse | ChatCompletionStream:
+        prompt = self.count_prompt(model_settings.messages)
+        n = model_settings.n
         if stream:
 
-            async def stream_response() -> AsyncGenerator[
-                ChatCompletionResponse[DeltaChoice]
-            ]:
-                for i in range(0, len(MD_TEXT), 10):
-                    await asyncio.sleep(0.2)
-
-                    yield ChatCompletionResponse(
-                        model=self.key,
-                        choices=[
-                            DeltaChoice(
-                                delta=Delta(content=MD_TEXT[i : i + 10])
-                            ),
-                        ],
-                    )
-                yield ChatCompletionResponse(
-                    model=self.key,
-                    choices=[
-                        DeltaChoice(delta=Delta(content=MD_IMAGE)),
-                    ],
+            async def stream_response() -> AsyncGenerator[StreamItem]:
+                delays = self.latency_profile.sampler(
+                    model_settings.rng(), 2.5, prompt.prefill
                 )
+                pacer = Pacer()
+                for i in range(0, len(MD_TEXT), 10):
+                    await pacer.wait(next(delays))
+                    for index in range(n):
+                        yield ChoiceDelta(index, MD_TEXT[i : i + 10])
+                for index in range(n):
+                    yield ChoiceDelta(index, MD_IMAGE)
 
                 if model_settings.needs_usage():
-                    prompt_tokens = len(str(model_settings.messages)) // 4
-                    yield ChatCompletionResponse(
-                        model=self.key,
-                        choices=[],
-                        usage=Usage(
-                            prompt_tokens=prompt_tokens,
-                            completion_tokens=4,
-                        ),
-                    )
+                    yield prompt.usage(n * count_text(MD_TEXT + MD_IMAGE))
 
-            return stream_response()
+            return ChatCompletionStream(self.key, stream_response())
         else:
+            await self.wait_first_token(prompt.prefill)
             return ChatCompletionResponse(
                 model=self.key,
                 choices=[
                     MessageChoice(
-                        index=0,
+                        index=index,
                         message=Message(
                             role="assistant",
                             content=MD_TEXT,
                         ),
                     )
+                    for index in range(n)
                 ],
-                usage=Usage(prompt_tokens=1, completion_tokens=1),
+                usage=prompt.usage(n * count_text(MD_TEXT)),
             )
 
     def _get_model_info(self) -> ModelInfo:
@@ -1,24 +1,29 @@
-import asyncio
-from collections.abc import AsyncGenerator, AsyncIterator
+from collections.abc import AsyncGenerator
 from typing import Any, Literal, overload
 
+from mock_ai.latency import FixedDelay, LatencyProfile
+from mock_ai.pacing import Pacer
 from mock_ai.schemas.chat_completion_request import ModelSettings
 from mock_ai.schemas.completion_response import (
     ChatCompletionResponse,
-    Delta,
-    DeltaChoice,
     Message,
     MessageChoice,
-    Usage,
 )
 from mock_ai.schemas.models_response import ModelInfo
+from mock_ai.tokenizer import count_text
 
 from .chat_model import ChatModel
+from .chat_stream import ChatCompletionStream, ChoiceDelta, StreamItem
 
 
 class ParrotChatModel(ChatModel):
     """Chat model that echoes the last user message."""
 
+    latency_profile = LatencyProfile(inter_chunk=FixedDelay(value=0.01))
+    # Echoed chunks arrive on a fixed clock, which clients of the parrot use
+    # to check their per-token handling, so every frame is written alone.
+    coalesce_stream = False
+
     @property
     def key(self) -> str:
         return "parrot-chat-model"
@@ -41,58 +46,44 @@ class ParrotChatModel(ChatModel):
         self,
         model_settings: ModelSettings,
         stream: Literal[True],
-    ) -> AsyncIterator[ChatCompletionResponse[DeltaChoice]]: ...
+    ) -> ChatCompletionStream: ...
 
     async def get_response(
         self,
         model_settings: ModelSettings,
         stream: bool,
-    ) -> (
-        ChatCompletionResponse
-        | AsyncIterator[ChatCompletionResponse[DeltaChoice]]
-    ):
+    ) -> ChatCompletionResponse | ChatCompletionStream:
         message = self._last_user_message(model_settings)
+        prompt = self.count_prompt(model_settings.messages)
+        n = model_settings.n
+        completion_tokens = n * count_text(message)
         if stream:
 
-            async def stream_response() -> AsyncGenerator[
-                ChatCompletionResponse[DeltaChoice]
-            ]:
+            async def stream_response() -> AsyncGenerator[StreamItem]:
+                delays = self.latency_profile.sampler(
+                    model_settings.rng(), 2.5, prompt.prefill
+                )
+                pacer = Pacer()
                 for i in range(0, len(message), 10):
-                    await asyncio.sleep(0.01)
-                    yield ChatCompletionResponse(
-                        model=self.key,
-                        choices=[
-                            DeltaChoice(
-                                delta=Delta(content=message[i : i + 10])
-                            )
-                        ],
-                    )
+                    await pacer.wait(next(delays))
+                    for index in range(n):
+                        yield ChoiceDelta(index, message[i : i + 10])
                 if model_settings.needs_usage():
-                    prompt_tokens = len(str(model_settings.messages)) // 4
-                    completion_tokens = len(message) // 4
-                    yield ChatCompletionResponse(
-                        model=self.key,
-                        choices=[],
-                        usage=Usage(
-                            prompt_tokens=prompt_tokens,
-                            completion_tokens=completion_tokens,
-                        ),
-                    )
+                    yield prompt.usage(completion_tokens)
 
-            return stream_response()
+            return ChatCompletionStream(self.key, stream_response())
         else:
+            await self.wait_first_token(prompt.prefill)
             return ChatCompletionResponse(
                 model=self.key,
                 choices=[
                     MessageChoice(
-                        index=0,
+                        index=index,
                         message=Message(role="assistant", content=message),
                     )
+                    for index in range(n)
                 ],
-                usage=Usage(
-                    prompt_tokens=len(str(model_settings.messages)) // 4,
-                    completion_tokens=len(message) // 4,
-                ),
+                usage=prompt.usage(completion_tokens),
             )
 
     def _get_model_info(self) -> ModelInfo:
@@ -1,45 +1,26 @@
-import asyncio
-import json
-import random
-import string
-from collections.abc import AsyncGenerator, AsyncIterator
-from typing import Any, Literal, overload
+from collections.abc import AsyncGenerator
+from typing import Literal, overload
 
+from mock_ai.latency import FixedDelay, LatencyProfile
+from mock_ai.pacing import Pacer
 from mock_ai.schemas.chat_completion_request import ModelSettings
 from mock_ai.schemas.completion_response import (
     ChatCompletionResponse,
-    Delta,
-    DeltaChoice,
     Message,
     MessageChoice,
     Usage,
 )
 from mock_ai.schemas.models_response import ModelInfo
-from mock_ai.utils import TokenBatchFactory
+from mock_ai.utils import token_vocabulary
 
 from .chat_model import ChatModel
-
-
-def _random_string(length: int = 8) -> str:
-    return "".join(random.choice(string.ascii_letters) for _ in range(length))
-
-
-def _from_schema(schema: dict) -> Any:
-    type_ = schema.get("type")
-    if type_ == "object":
-        return {
-            key: _from_schema(sub)
-            for key, sub in schema.get("properties", {}).items()
-        }
-    if type_ == "array":
-        return [_from_schema(schema.get("items", {}))]
-    if type_ == "integer":
-        return random.randint(0, 100)
-    if type_ == "number":
-        return random.random() * 100
-    if type_ == "boolean":
-        return random.choice([True, False])
-    return _random_string()
+from .chat_stream import (
+    ChatCompletionStream,
+    ChoiceDelta,
+    StreamItem,
+    interleave,
+)
+from .json_schema import json_deltas
 
 
 class StandardChatModel(ChatModel):
@@ -53,11 +34,16 @@ class StandardChatModel(ChatModel):
         completions_tokens_limit: int = COMPLETIONS_TOKENS_LIMIT,
         batch_per_second: int = BATCH_PER_SECOND,
         token_per_batch: int = TOKEN_PER_BATCH,
+        latency_profile: LatencyProfile | None = None,
     ):
         self._key = key
         self.batch_per_second = batch_per_second
         self.completions_tokens_limit = completions_tokens_limit
         self.token_per_batch = token_per_batch
+        self.vocabulary = token_vocabulary()
+        self.latency_profile = latency_profile or LatencyProfile(
+            inter_chunk=FixedDelay(value=1 / batch_per_second)
+        )
 
     @property
     def key(self) -> str:
@@ -75,123 +61,118 @@ class StandardChatModel(ChatModel):
         self,
         model_settings: ModelSettings,
         stream: Literal[True],
-    ) -> AsyncIterator[ChatCompletionResponse[DeltaChoice]]: ...
+    ) -> ChatCompletionStream: ...
 
     async def get_response(
         self,
         model_settings: ModelSettings,
         stream: bool,
-    ) -> (
-        ChatCompletionResponse
-        | AsyncIterator[ChatCompletionResponse[DeltaChoice]]
-    ):
+    ) -> ChatCompletionResponse | ChatCompletionStream:
         max_completion_tokens = int(
             min(
                 self.completions_tokens_limit,
                 model_settings.tokens_upper_limit,
             )
         )
+        prompt = self.count_prompt(model_settings.messages)
+        rng = model_settings.rng()
 
         fmt = model_settings.response_format or {}
+        n = model_settings.n
         if fmt:
-            if fmt.get("type") == "json_schema":
-                payload = _from_schema(fmt.get("json_schema", {}))
-            else:
-                payload = {"mock": _random_string(4)}
-            content = json.dumps(payload)
-
             if stream:
 
-                async def stream_response() -> AsyncGenerator[
-                    ChatCompletionResponse[DeltaChoice]
-                ]:
-                    for i in range(0, len(content), 10):
-                        await asyncio.sleep(1 / self.batch_per_second)
-                        yield ChatCompletionResponse(
-                            model=self.key,
-                            choices=[
-                                DeltaChoice(
-                                    delta=Delta(content=content[i : i + 10])
-                                )
-                            ],
+                async def stream_response() -> AsyncGenerator[StreamItem]:
+                    delays = self.latency_profile.sampler(
+                        rng.spawn(1)[0], self.token_per_batch, prompt.prefill
+                    )
+                    pacer = Pacer()
+                    completion_tokens = 0
+                    choices = [
+                        json_deltas(
+                            fmt,
+                            rng,
+                            max_completion_tokens,
+                            self.token_per_batch,
                         )
+                        for _ in range(n)
+                    ]
+                    for round_ in interleave(choices):
+                        await pacer.wait(next(delays))
+                        for delta, tokens in round_:
+                            completion_tokens += tokens
+                            yield delta
                     if model_settings.needs_usage():
-                        prompt_tokens = len(str(model_settings.messages)) // 4
-                        completion_tokens = len(content) // 4
-                        yield ChatCompletionResponse(
-                            model=self.key,
-                            choices=[],
-                            usage=Usage(
-                                prompt_tokens=prompt_tokens,
-                                completion_tokens=completion_tokens,
-                            ),
-                        )
-
-                return stream_response()
-
+                        yield prompt.usage(completion_tokens)
+
+                return ChatCompletionStream(self.key, stream_response())
+
+            contents = []
+            completion_tokens = 0
+            for _ in range(n):
+                deltas, counts = zip(
+                    *json_deltas(
+                        fmt, rng, max_completion_tokens, self.token_per_batch
+                    ),
+                    strict=True,
+                )
+                contents.append("".join(deltas))
+                completion_tokens += sum(counts)
+            await self.wait_first_token(prompt.prefill)
             return ChatCompletionResponse(
                 model=self.key,
                 choices=[
                     MessageChoice(
-                        index=0,
+                        index=index,
                         message=Message(role="assistant", content=content),
                     )
+                    for index, content in enumerate(contents)
                 ],
-                usage=Usage(
-                    prompt_tokens=len(str(model_settings.messages)) // 4,
-                    completion_tokens=len(content) // 4,
-                ),
+                usage=prompt.usage(completion_tokens),
             )
 
         if stream:
 
-            async def stream_response() -> AsyncGenerator[
-                ChatCompletionResponse[DeltaChoice]
-            ]:
+            async def stream_response() -> AsyncGenerator[StreamItem]:
+                delays = self.latency_profile.sampler(
+                    rng.spawn(1)[0], self.token_per_batch, prompt.prefill
+                )
+                pacer = Pacer()
                 tokens_bank = max_completion_tokens
+                completion_tokens = 0
                 while tokens_bank > 0:
                     batch_size = min(self.token_per_batch, tokens_bank)
                     tokens_bank -= batch_size
 
-                    await asyncio.sleep(1 / self.batch_per_second)
-
-                    yield ChatCompletionResponse(
-                        model=self.key,
-                        choices=[
-                            DeltaChoice(
-                                delta=Delta(
-                                    content=next(TokenBatchFactory(batch_size))
-                                ),
-                            )
-                        ],
+                    await pacer.wait(next(delays))
+
+                    # One draw covers the next chunk of every choice.
+                    batch = self.vocabulary.draw((n, batch_size), rng)
+                    completion_tokens += int(
+                        self.vocabulary.emitted(batch).sum()
                     )
+                    for index, row in enumerate(batch):
+                        yield ChoiceDelta(index, self.vocabulary.decode(row))
                 if model_settings.needs_usage():
-                    prompt_tokens = len(str(model_settings.messages)) // 4
-                    yield ChatCompletionResponse(
-                        model=self.key,
-                        choices=[],
-                        usage=Usage(
-                            prompt_tokens=prompt_tokens,
-                            completion_tokens=4,
-                        ),
-                    )
+                    yield prompt.usage(completion_tokens)
 
-            return stream_response()
+            return ChatCompletionStream(self.key, stream_response())
         else:
+            await self.wait_first_token(prompt.prefill)
+            tokens = self.vocabulary.draw((n, max_completion_tokens), rng)
             return ChatCompletionResponse(
                 model=self.key,
                 choices=[
                     MessageChoice(
-                        index=0,
+                        index=index,
                         message=Message(
                             role="assistant",
-                            content=next(
-                                TokenBatchFactory(max_completion_tokens)
-                            ),
+                            content=self.vocabulary.decode(row),
                         ),
                     )
+                    for index, row in enumerate(tokens)
                 ],
-                usage=Usage(prompt_tokens=1, completion_tokens=1),
+                usage=prompt.usage(int(self.vocabulary.emitted(tokens).sum())),
             )
 
     def _get_model_info(self) -> ModelInfo:
@@ -1,49 +1,27 @@
-import asyncio
-import json
-import random
-import string
-from collections.abc import AsyncGenerator, AsyncIterator
-from typing import Any, Literal, overload
+from collections.abc import AsyncGenerator
+from typing import Literal, overload
 
+from mock_ai.latency import FixedDelay, LatencyProfile
+from mock_ai.pacing import Pacer
 from mock_ai.schemas.chat_completion_request import ModelSettings
 from mock_ai.schemas.completion_response import (
     ChatCompletionResponse,
-    Delta,
-    DeltaChoice,
     Message,
     MessageChoice,
-    Usage,
 )
 from mock_ai.schemas.models_response import ModelInfo
 
 from .chat_model import ChatModel
-
-
-def _random_string(length: int = 8) -> str:
-    return "".join(random.choice(string.ascii_letters) for _ in range(length))
-
-
-def _from_schema(schema: dict) -> Any:
-    type_ = schema.get("type")
-    if type_ == "object":
-        return {
-            key: _from_schema(sub)
-            for key, sub in schema.get("properties", {}).items()
-        }
-    if type_ == "array":
-        return [_from_schema(schema.get("items", {}))]
-    if type_ == "integer":
-        return random.randint(0, 100)
-    if type_ == "number":
-        return random.random() * 100
-    if type_ == "boolean":
-        return random.choice([True, False])
-    return _random_string()
+from .chat_stream import ChatCompletionStream, StreamItem, interleave
+from .json_schema import json_deltas
 
 
 class StructuredChatModel(ChatModel):
     """Chat model that returns JSON according to ``response_format``."""
 
+    latency_profile = LatencyProfile(inter_chunk=FixedDelay(value=0.01))
+    TOKENS_PER_CHUNK = 3
+
     def __init__(self, key: str = "structured-chat-model") -> None:
         self._key = key
 
@@ -63,65 +41,60 @@ class StructuredChatModel(ChatModel):
         self,
         model_settings: ModelSettings,
         stream: Literal[True],
-    ) -> AsyncIterator[ChatCompletionResponse[DeltaChoice]]: ...
+    ) -> ChatCompletionStream: ...
 
     async def get_response(
         self,
         model_settings: ModelSettings,
         stream: bool,
-    ) -> (
-        ChatCompletionResponse
-        | AsyncIterator[ChatCompletionResponse[DeltaChoice]]
-    ):
+    ) -> ChatCompletionResponse | ChatCompletionStream:
+        rng = model_settings.rng()
         fmt = model_settings.response_format or {}
-        if fmt.get("type") == "json_schema":
-            payload = _from_schema(fmt.get("json_schema", {}))
-        else:
-            payload = {"mock": _random_string(4)}
-
-        content = json.dumps(payload)
+        prompt = self.count_prompt(model_settings.messages)
+        max_tokens = model_settings.tokens_upper_limit
 
         if stream:
 
-            async def stream_response() -> AsyncGenerator[
-                ChatCompletionResponse[DeltaChoice]
-            ]:
-                for i in range(0, len(content), 10):
-                    await asyncio.sleep(0.01)
-                    yield ChatCompletionResponse(
-                        model=self.key,
-                        choices=[
-                            DeltaChoice(
-                                delta=Delta(content=content[i : i + 10])
-                            )
-                        ],
-                    )
+            async def stream_response() -> AsyncGenerator[StreamItem]:
+                delays = self.latency_profile.sampler(
+                    rng.spawn(1)[0], self.TOKENS_PER_CHUNK, prompt.prefill
+                )
+                pacer = Pacer()
+                completion_tokens = 0
+                choices = [
+                    json_deltas(fmt, rng, max_tokens, self.TOKENS_PER_CHUNK)
+                    for _ in range(model_settings.n)
+                ]
+                for round_ in interleave(choices):
+                    await pacer.wait(next(delays))
+                    for delta, tokens in round_:
+                        completion_tokens += tokens
+                        yield delta
                 if model_settings.needs_usage():
-                    prompt_tokens = len(str(model_settings.messages)) // 4
-                    completion_tokens = len(content) // 4
-                    yield ChatCompletionResponse(
-                        model=self.key,
-                        choices=[],
-                        usage=Usage(
-                            prompt_tokens=prompt_tokens,
-                            completion_tokens=completion_tokens,
-                        ),
-                    )
-
-            return stream_response()
-
+                    yield prompt.usage(completion_tokens)
+
+            return ChatCompletionStream(self.key, stream_response())
+
+        contents = []
+        completion_tokens = 0
+        for _ in range(model_settings.n):
+            deltas, counts = zip(
+                *json_deltas(fmt, rng, max_tokens, self.TOKENS_PER_CHUNK),
+                strict=True,
+            )
+            contents.append("".join(deltas))
+            completion_tokens += sum(counts)
+        await self.wait_first_token(prompt.prefill)
         return ChatCompletionResponse(
             model=self.key,
             choices=[
                 MessageChoice(
-                    index=0,
+                    index=index,
                     message=Message(role="assistant", content=content),
                 )
+                for index, content in enumerate(contents)
             ],
-            usage=Usage(
-                prompt_tokens=len(str(model_settings.messages)) // 4,
-                completion_tokens=len(content) // 4,
-            ),
+            usage=prompt.usage(completion_tokens),
         )
 
     def _get_model_info(self) -> ModelInfo:
@@ -0,0 +1,25 @@
+import numpy as np
+
+from mock_ai.schemas.embedding_request import Precision
+
+
+def quantize(
+    rows: np.ndarray, precision: Precision
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Convert unit-norm float32 rows to ``precision``.
+
+    Returns little-endian rows ready to be base64 encoded and, for
+    ``int8``, the per-row scale that maps the integers back to floats.
+    ``binary`` packs the sign bits of eight dimensions into each byte,
+    most significant bit first.
+    """
+    if precision == "float16":
+        return rows.astype("<f2"), None
+    if precision == "int8":
+        scales = np.abs(rows).max(axis=1) / 127
+        scales[scales == 0] = 1
+        quantized = np.rint(rows / scales[:, None]).astype(np.int8)
+        return quantized, scales
+    if precision == "binary":
+        return np.packbits(rows > 0, axis=1), None
+    return rows.astype("<f4", copy=False), None
@@ -0,0 +1,126 @@
+import functools
+
+import numpy as np
+
+from mock_ai.utils import normal_rows, splitmix64
+
+from .standard_embedding import StandardEmbeddingModel
+
+# Documents hashed and projected together, bounding the feature matrix.
+BLOCK_SIZE = 256
+CHAR_NGRAMS = (3, 4)
+
+_FNV_PRIME = np.uint64(0x100000001B3)
+# Bytes that belong to words: ASCII letters and digits, and all non-ASCII
+# bytes so that UTF-8 encoded letters are kept together.
+_WORD_BYTES = np.zeros(256, dtype=bool)
+_WORD_BYTES[list(b"0123456789abcdefghijklmnopqrstuvwxyz")] = True
+_WORD_BYTES[128:] = True
+
+
+@functools.lru_cache(maxsize=8)
+def _projection(seed: int, features: int, dimensions: int) -> np.ndarray:
+    """Random directions the hashed features are projected onto."""
+    return normal_rows(
+        [f"{seed}\x00{feature}" for feature in range(features)], dimensions
+    )
+
+
+def _tagged(hashes: np.ndarray, tag: int) -> np.ndarray:
+    return splitmix64(hashes ^ np.uint64(tag << 56))
+
+
+def _hash_features(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Hash the n-grams of ``texts`` in one pass over their joined bytes.
+
+    Returns the document index and the 64 bit hash of every feature:
+    character n-grams, words and word bigrams, plus one constant feature
+    per document so that empty texts still get a direction.
+    """
+    encoded = [text.lower().encode() for text in texts]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(texts))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    docs = np.repeat(np.arange(len(texts)), lengths)
+    symbols = data.astype(np.uint64)
+
+    doc_ids: list[np.ndarray] = [np.arange(len(texts))]
+    hashes: list[np.ndarray] = [np.zeros(len(texts), dtype=np.uint64)]
+
+    for n in CHAR_NGRAMS:
+        if len(data) < n:
+            continue
+        starts = np.flatnonzero(docs[: len(data) - n + 1] == docs[n - 1 :])
+        ngrams = np.zeros(len(starts), dtype=np.uint64)
+        for offset in range(n):
+            ngrams *= _FNV_PRIME
+            ngrams ^= symbols[starts + offset]
+        doc_ids.append(docs[starts])
+        hashes.append(_tagged(ngrams, n))
+
+    in_word = _WORD_BYTES[data]
+    positions = np.flatnonzero(in_word)
+    if len(positions):
+        first = np.ones(len(positions), dtype=bool)
+        first[1:] = (np.diff(positions) > 1) | (
+            docs[positions[1:]] != docs[positions[:-1]]
+        )
+        word_starts = np.flatnonzero(first)
+        word_index = np.cumsum(first) - 1
+        offsets = np.arange(len(positions)) - word_starts[word_index]
+        letters = splitmix64(
+            symbols[positions] | (offsets.astype(np.uint64) << np.uint64(8))
+        )
+        words = _tagged(np.add.reduceat(letters, word_starts), 1)
+        word_docs = docs[positions[word_starts]]
+        doc_ids.append(word_docs)
+        hashes.append(words)
+
+        pairs = np.flatnonzero(word_docs[1:] == word_docs[:-1])
+        doc_ids.append(word_docs[pairs])
+        hashes.append(_tagged(words[pairs] * _FNV_PRIME ^ words[pairs + 1], 2))
+
+    return np.concatenate(doc_ids), np.concatenate(hashes)
+
+
+class SimilarityEmbeddingModel(StandardEmbeddingModel):
+    """Embedding model whose vectors are closer the more similar the texts.
+
+    Character n-grams, words and word bigrams are hashed into ``features``
+    signed buckets, and the bucket counts are projected onto fixed random
+    directions seeded by ``seed``. Texts sharing many n-grams therefore
+    get vectors with a high cosine similarity, which gives vector indexes
+    realistic cluster structure to work with.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        dimensions: int = 1536,
+        features: int = 1024,
+        seed: int = 0,
+    ):
+        super().__init__(key, dimensions)
+        self.features = features
+        self.seed = seed
+
+    def generate(self, texts: list[str], dimensions: int) -> np.ndarray:
+        projection = _projection(self.seed, self.features, dimensions)
+        rows = np.empty((len(texts), dimensions), dtype=np.float32)
+        for start in range(0, len(texts), BLOCK_SIZE):
+            block = texts[start : start + BLOCK_SIZE]
+            doc_ids, hashes = _hash_features(block)
+            buckets = (hashes % np.uint64(self.features)).astype(np.int64)
+            signs = np.where(hashes >> np.uint64(63), -1.0, 1.0)
+            counts = np.bincount(
+                doc_ids * self.features + buckets,
+                weights=signs,
+                minlength=len(block) * self.features,
+            )
+            np.matmul(
+                counts.reshape(len(block), self.features).astype(np.float32),
+                projection,
+                out=rows[start : start + BLOCK_SIZE],
+            )
+        norms = np.sqrt(np.einsum("ij,ij->i", rows, rows))[:, None]
+        rows /= np.maximum(norms, np.finfo(np.float32).tiny)
+        return rows
@@ -1,13 +1,24 @@
-from mock_ai.schemas.embedding_request import EmbeddingRequest
+import base64
+from typing import Literal
+
+import numpy as np
+
+from mock_ai.embedding_store import EmbeddingStore, embedding_store
+from mock_ai.executor import executor
+from mock_ai.schemas.embedding_request import EmbeddingRequest, Precision
 from mock_ai.schemas.embedding_response import (
     EmbeddingObject,
     EmbeddingResponse,
+    QuantizedEmbeddingObject,
     Usage,
 )
 from mock_ai.schemas.models_response import ModelInfo
-from mock_ai.utils import normal_from_string
+from mock_ai.settings import executor_settings
+from mock_ai.tokenizer import count_text
+from mock_ai.utils import normal_rows
 
 from .embedding_model import EmbeddingModel
+from .quantization import quantize
 
 
 class StandardEmbeddingModel(EmbeddingModel):
@@ -24,21 +35,99 @@ class StandardEmbeddingModel(EmbeddingModel):
     async def get_response(self, data: EmbeddingRequest) -> EmbeddingResponse:
         m = data.dimensions if data.dimensions else self.dimensions
         batch = data.input if isinstance(data.input, list) else [data.input]
-        embedding_object_list = [
-            EmbeddingObject(
-                index=i, embedding=normal_from_string(s, m).tolist()
+        prompt_tokens = sum(map(count_text, batch))
+        await self.wait_first_token(prompt_tokens)
+        if len(batch) >= executor_settings.embedding_min_batch:
+            embeddings, scales = await executor.run(
+                self.key,
+                "embedding",
+                self.encode,
+                batch,
+                m,
+                data.precision,
+                data.encoding_format,
+            )
+        else:
+            embeddings, scales = self.encode(
+                batch, m, data.precision, data.encoding_format
             )
-            for i, s in enumerate(batch)
-        ]
 
-        return EmbeddingResponse(
+        # The vectors are generated here, so per-float validation is skipped.
+        embedding_object_list: list[QuantizedEmbeddingObject | EmbeddingObject]
+        if scales is None:
+            embedding_object_list = [
+                EmbeddingObject.model_construct(index=i, embedding=embedding)
+                for i, embedding in enumerate(embeddings)
+            ]
+        else:
+            embedding_object_list = [
+                QuantizedEmbeddingObject.model_construct(
+                    index=i, embedding=embedding, scale=scale
+                )
+                for i, (embedding, scale) in enumerate(
+                    zip(embeddings, scales, strict=True)
+                )
+            ]
+        return EmbeddingResponse.model_construct(
             data=embedding_object_list,
             model="standard-embedding",
-            usage=Usage(
-                prompt_tokens=len(str(data.input)) // 4, completion_tokens=0
-            ),
+            usage=Usage(prompt_tokens=prompt_tokens, completion_tokens=0),
         )
 
+    def encode(
+        self,
+        texts: list[str],
+        dimensions: int,
+        precision: Precision,
+        encoding_format: Literal["float", "base64"],
+    ) -> tuple[list[list[float] | list[int] | str], list[float] | None]:
+        """Return the encoded embeddings of ``texts`` and any int8 scales."""
+        rows = self.embed(texts, self.stored_dimensions(dimensions))
+        if dimensions < rows.shape[1]:
+            rows = rows[:, :dimensions]
+            rows = rows / np.sqrt(np.einsum("ij,ij->i", rows, rows))[:, None]
+        quantized, scales = quantize(rows, precision)
+        embeddings: list[list[float] | list[int] | str]
+        if encoding_format == "base64":
+            # Rows are contiguous, so they are encoded straight from the
+            # matrix buffer.
+            embeddings = [base64.b64encode(row).decode() for row in quantized]
+        else:
+            embeddings = quantized.tolist()
+        return embeddings, None if scales is None else scales.tolist()
+
+    def stored_dimensions(self, dimensions: int) -> int:
+        """Width of the vectors generated and stored for ``dimensions``.
+
+        Shortened embeddings are the renormalized prefix of the full
+        vector, so every dimension count shares the generated vectors.
+        """
+        return max(dimensions, self.dimensions)
+
+    def embed(self, texts: list[str], dimensions: int) -> np.ndarray:
+        """Return the float32 vectors of ``texts``, using the store if on."""
+        if not embedding_store.enabled:
+            return self.generate(texts, dimensions)
+        keys = [
+            EmbeddingStore.key(self.key, dimensions, text) for text in texts
+        ]
+        rows = np.empty((len(texts), dimensions), dtype=np.float32)
+        missing = []
+        for i, vector in enumerate(embedding_store.get_many(keys, dimensions)):
+            if vector is None:
+                missing.append(i)
+            else:
+                rows[i] = vector
+        if missing:
+            generated = self.generate([texts[i] for i in missing], dimensions)
+            rows[missing] = generated
+            embedding_store.put_many([keys[i] for i in missing], generated)
+        return rows
+
+    def generate(self, texts: list[str], dimensions: int) -> np.ndarray:
+        """Generate unit-norm float32 vectors for ``texts``."""
+        return normal_rows(texts, dimensions)
+
     def _get_model_info(self) -> ModelInfo:
         """Fetch raw model metadata."""
         return ModelInfo(id="", created=0, owned_by="")
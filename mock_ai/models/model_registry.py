@@ -1,7 +1,10 @@
 from collections.abc import Iterator
 from typing import Generic, TypeVar
 
+from mock_ai.artifacts import artifact_cache
+from mock_ai.cache import response_cache
 from mock_ai.schemas.models_response import ModelsResponse
+from mock_ai.settings import latency_settings
 
 from .base_ai_model import BaseAIModel, HasKey
 
@@ -30,6 +33,19 @@ class Registry(Generic[T]):
 
 
 class ModelRegistry(Registry[BaseAIModel]):
+    def register(self, obj: BaseAIModel) -> BaseAIModel:
+        profile = latency_settings.profiles.get(obj.key)
+        if profile is not None:
+            obj.latency_profile = profile
+        response_cache.invalidate(obj.key)
+        artifact_cache.invalidate(obj.key)
+        return super().register(obj)
+
+    def delete(self, key: str) -> bool:
+        response_cache.invalidate(key)
+        artifact_cache.invalidate(key)
+        return super().delete(key)
+
     def get_models(self) -> ModelsResponse:
         return ModelsResponse(
             data=[model.model_info for model in self._store.values()]
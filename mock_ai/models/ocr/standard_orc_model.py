@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-import asyncio
-
+from mock_ai.executor import executor
+from mock_ai.latency import LatencyProfile
 from mock_ai.schemas.models_response import ModelInfo
 from mock_ai.schemas.ocr_request import OcrRequest
 from mock_ai.schemas.ocr_response import (
@@ -15,6 +15,11 @@ from mock_ai.utils import generate_noise_image_from_string, img_to_b64
 from .ocr_model import OcrModel
 
 
+def render_preview(url: str, width: int, height: int) -> str:
+    img = generate_noise_image_from_string(url, width, height)
+    return img_to_b64(img, format="PNG")
+
+
 class StandardOcrModel(OcrModel):
     """Standard OCR model returning a mock parsed document.
 
@@ -26,14 +31,14 @@ class StandardOcrModel(OcrModel):
     def __init__(self, key: str, response_delay: float | None = None):
         self._key = key
         self.response_delay = response_delay
+        self.latency_profile = LatencyProfile(ttft=response_delay or 0)
 
     @property
     def key(self) -> str:
         return self._key
 
     async def get_response(self, embedding_request: OcrRequest) -> Document:
-        if self.response_delay:
-            await asyncio.sleep(self.response_delay)
+        await self.wait_first_token()
 
         url = embedding_request.document.document_url
 
@@ -54,8 +59,9 @@ class StandardOcrModel(OcrModel):
         if embedding_request.include_image_base64:
             # Produce a tiny deterministic image preview tied to the URL
             width, height = 100, 60
-            img = generate_noise_image_from_string(url, width, height)
-            b64 = img_to_b64(img, format="PNG")
+            b64 = await executor.run(
+                self.key, "ocr", render_preview, url, width, height
+            )
             images.append(
                 ImageRegion(
                     id="img-0",
@@ -3,12 +3,25 @@ import io
 import numpy as np
 import soundfile as sf
 
+from mock_ai.executor import executor
 from mock_ai.schemas.models_response import ModelInfo
 from mock_ai.schemas.speech_request import SpeechRequest
+from mock_ai.tokenizer import count_text
 
 from .speech_model import SpeechModel
 
 
+def render_tone(sample_rate: int, amplitude: float, format_: str) -> bytes:
+    """Encode ten seconds of a 200 Hz sine wave."""
+    duration = 10
+    t = np.linspace(0, duration, sample_rate * duration, False)
+    sine = (amplitude * np.sin(2 * np.pi * 200 * t)).astype(np.float32)
+
+    buffer = io.BytesIO()
+    sf.write(buffer, sine, sample_rate, format=format_.upper())
+    return buffer.getvalue()
+
+
 class StandardSpeechModel(SpeechModel):
     def __init__(
         self, key: str, sample_rate: int = 24000, amplitude: float = 0.5
@@ -22,18 +35,15 @@ class StandardSpeechModel(SpeechModel):
         return self._key
 
     async def get_response(self, data: SpeechRequest) -> bytes:
-        duration = 10
-        t = np.linspace(0, duration, self.sample_rate * duration, False)
-        sine = (self.amplitude * np.sin(2 * np.pi * 200 * t)).astype(np.float32)
-
-        buffer = io.BytesIO()
-        sf.write(
-            buffer,
-            sine,
+        await self.wait_first_token(count_text(data.input))
+        return await executor.run(
+            self.key,
+            "speech",
+            render_tone,
             self.sample_rate,
-            format=data.response_format.upper(),
+            self.amplitude,
+            data.response_format,
         )
-        return buffer.getvalue()
 
     def _get_model_info(self) -> ModelInfo:
         return ModelInfo(id="", created=0, owned_by="")
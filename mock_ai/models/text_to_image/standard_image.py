@@ -1,6 +1,9 @@
 import asyncio
 from typing import Literal
 
+from mock_ai.executor import executor
+from mock_ai.latency import LatencyProfile
+from mock_ai.noise_atlas import noise_atlas
 from mock_ai.schemas.image_request import ImageRequest
 from mock_ai.schemas.image_response import (
     ImageB64,
@@ -11,19 +14,57 @@ from mock_ai.schemas.models_response import ModelInfo
 from mock_ai.utils import (
     gen_image_id,
     generate_noise_image_from_string,
+    generate_procedural_image_from_string,
     img_to_b64,
     parse_dimensions,
 )
 
 from .image_model import ImageModel
 
+ImageStyle = Literal["noise", "procedural"]
+# Characters of the prompt drawn onto procedural images, which also bounds
+# the image ids that carry them.
+PROMPT_TEXT_CHARS = 200
+
+
+def render_b64(
+    key: str,
+    width: int,
+    height: int,
+    format_: str,
+    style: ImageStyle = "noise",
+    text: str | None = None,
+) -> str:
+    """Render the image of ``key`` and return it base64 encoded."""
+    if style == "procedural":
+        img = generate_procedural_image_from_string(key, width, height, text)
+    elif noise_atlas.enabled:
+        img = noise_atlas.render(key, width, height)
+    else:
+        img = generate_noise_image_from_string(key, width, height)
+    return img_to_b64(img, format=format_)
+
 
 class StandardImageModel(ImageModel):
-    """Standard image model."""
+    """Standard image model.
 
-    def __init__(self, key: str, response_deley: float | None = None):
+    ``style`` chooses between random noise, the worst case for image
+    codecs, and procedural pictures that compress to a small fraction of
+    its size, optionally with the prompt drawn on them.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        response_deley: float | None = None,
+        style: ImageStyle = "noise",
+        prompt_text: bool = False,
+    ):
         self._key = key
         self.response_deley = response_deley
+        self.style = style
+        self.prompt_text = prompt_text
+        self.latency_profile = LatencyProfile(ttft=response_deley or 0)
 
     @property
     def key(self) -> str:
@@ -32,12 +73,17 @@ class StandardImageModel(ImageModel):
     async def get_response(
         self, data: ImageRequest, response_format: Literal["url", "b64_json"]
     ) -> ImageResponse:
-        if self.response_deley:
-            await asyncio.sleep(self.response_deley)
+        await self.wait_first_token()
+        text = data.prompt[:PROMPT_TEXT_CHARS] if self.prompt_text else None
         if response_format == "url":
+            payload = f"{data.size}|{data.output_format}"
+            if self.style != "noise":
+                payload += f"|{self.style}"
+                if text:
+                    payload += f"|{text}"
             image_urls = []
             for _ in range(data.n):
-                image_id = gen_image_id(f"{data.size}|{data.output_format}")
+                image_id = gen_image_id(payload)
                 image_urls.append(
                     ImageUrl(
                         url=f"private/images/{image_id}.{data.output_format.lower()}"
@@ -49,13 +95,23 @@ class StandardImageModel(ImageModel):
             )
         elif response_format == "b64_json":
             width, height = parse_dimensions(data.size)
-            b64_images = []
-            for i in range(data.n):
-                img = generate_noise_image_from_string(
-                    f"{data.prompt}{i}", width, height
+            images = await asyncio.gather(
+                *(
+                    executor.run(
+                        self.key,
+                        "image",
+                        render_b64,
+                        f"{data.prompt}{i}",
+                        width,
+                        height,
+                        data.output_format,
+                        self.style,
+                        text,
+                    )
+                    for i in range(data.n)
                 )
-                b64 = img_to_b64(img, format=data.output_format)
-                b64_images.append(ImageB64(b64_json=b64))
+            )
+            b64_images = [ImageB64(b64_json=b64) for b64 in images]
             return ImageResponse(
                 created=0,
                 data=b64_images,
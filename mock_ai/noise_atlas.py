@@ -0,0 +1,122 @@
+import hashlib
+import math
+import os
+import struct
+import threading
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from mock_ai.settings import image_settings
+from mock_ai.utils import generate_noise_image_from_string
+
+
+class NoiseAtlas:
+    """A square noise texture that images are cut out of.
+
+    The texture is rendered once, from a fixed seed, and kept in a file
+    that every worker maps read-only, or in memory when ``path`` is
+    ``None``. Each key hashes to an offset, an odd row stride and an
+    inversion flag; the image is assembled from contiguous slices of the
+    strided texture rows, wrapping around both edges, so rendering costs a
+    copy of the output instead of a random draw per pixel.
+    """
+
+    MAGIC = b"MOCKNOI1"
+    HEADER = struct.Struct("<8sQ")
+    SEED = "noise-atlas"
+
+    def __init__(
+        self, path: Path | None, size: int = 4096, enabled: bool = True
+    ):
+        self.path = path
+        self.size = size
+        self.enabled = enabled
+        self._texture: np.ndarray | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.size * 3
+
+    def _render(self) -> np.ndarray:
+        img = generate_noise_image_from_string(self.SEED, self.size, self.size)
+        return np.asarray(img)
+
+    def _valid(self, path: Path) -> bool:
+        try:
+            with path.open("rb") as file:
+                header = file.read(self.HEADER.size)
+                size = os.fstat(file.fileno()).st_size
+        except FileNotFoundError:
+            return False
+        return (
+            len(header) == self.HEADER.size
+            and self.HEADER.unpack(header) == (self.MAGIC, self.size)
+            and size == self.HEADER.size + self.nbytes
+        )
+
+    def _write(self, path: Path) -> None:
+        # Workers racing to build the file write identical textures, and
+        # the rename makes sure none of them maps a partial one.
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with partial.open("wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.size))
+            file.write(self._render().tobytes())
+        partial.replace(path)
+
+    def load(self) -> np.ndarray:
+        """Return the texture, building or mapping it on first use."""
+        with self._lock:
+            if self._texture is None:
+                if self.path is None:
+                    self._texture = self._render()
+                else:
+                    if not self._valid(self.path):
+                        self._write(self.path)
+                    self._texture = np.memmap(
+                        self.path,
+                        dtype=np.uint8,
+                        mode="r",
+                        offset=self.HEADER.size,
+                        shape=(self.size, self.size, 3),
+                    )
+            return self._texture
+
+    def render(self, key: str, width: int, height: int) -> Image.Image:
+        """Cut the deterministic noise image of ``key`` out of the atlas."""
+        texture = self.load()
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        top, left, stride = (
+            int.from_bytes(digest[i : i + 5]) % self.size for i in (0, 5, 10)
+        )
+        stride |= 1
+        while math.gcd(stride, self.size) != 1:
+            stride += 2
+        rows = (top + stride * np.arange(height)) % self.size
+
+        pixels = np.empty((height, width, 3), dtype=np.uint8)
+        done = 0
+        while done < width:
+            count = min(width - done, self.size - left)
+            pixels[:, done : done + count] = texture[rows, left : left + count]
+            done += count
+            left = 0
+        if digest[15] & 1:
+            np.subtract(255, pixels, out=pixels)
+        return Image.fromarray(pixels, mode="RGB")
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "size": self.size,
+            "loaded": self._texture is not None,
+        }
+
+
+noise_atlas = NoiseAtlas(
+    path=image_settings.atlas_path,
+    size=image_settings.atlas_size,
+    enabled=image_settings.noise_atlas,
+)
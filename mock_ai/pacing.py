@@ -0,0 +1,134 @@
+import asyncio
+import heapq
+import math
+import weakref
+
+from mock_ai.settings import pacing_settings
+
+
+class TickScheduler:
+    """Timing wheel shared by every paced stream of an event loop.
+
+    Deadlines are rounded up to the next tick of ``resolution`` seconds and
+    grouped into one bucket per tick. A single timer fires for the earliest
+    non-empty tick and wakes every stream in the due buckets at once, so the
+    loop's timer heap holds one entry instead of one per open stream.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        resolution: float = 0.005,
+    ):
+        # The loop and its pending timer, which references the loop, are
+        # held weakly so that the scheduler does not keep a closed loop
+        # alive as a key of ``_schedulers``.
+        self._loop = weakref.ref(loop)
+        self.resolution = resolution
+        # Waiters of each tick, kept in insertion ordered dicts so that a
+        # cancelled waiter is removed in constant time.
+        self._buckets: dict[int, dict[asyncio.Future[None], None]] = {}
+        self._ticks: list[int] = []
+        self._timer: weakref.ref[asyncio.TimerHandle] | None = None
+        self._timer_tick = 0
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        loop = self._loop()
+        if loop is None:
+            raise RuntimeError("the event loop was garbage collected")
+        return loop
+
+    def wait_until(self, deadline: float) -> asyncio.Future[None]:
+        """Return a future resolved on the first tick after ``deadline``.
+
+        Cancelling the future unregisters the waiter; it is dropped from its
+        bucket when the tick fires.
+        """
+        tick = math.ceil(deadline / self.resolution)
+        future = self.loop.create_future()
+        bucket = self._buckets.get(tick)
+        if bucket is None:
+            bucket = self._buckets[tick] = {}
+            heapq.heappush(self._ticks, tick)
+            if self._timer is None or tick < self._timer_tick:
+                self._schedule(tick)
+        bucket[future] = None
+        return future
+
+    def discard(self, future: asyncio.Future[None], deadline: float) -> None:
+        """Unregister a waiter returned by ``wait_until`` for ``deadline``."""
+        tick = math.ceil(deadline / self.resolution)
+        bucket = self._buckets.get(tick)
+        if bucket is None or bucket.pop(future, False) is False:
+            return
+        if not bucket:
+            # The tick stays in the heap; firing skips it.
+            del self._buckets[tick]
+
+    def _schedule(self, tick: int) -> None:
+        timer = self._timer() if self._timer is not None else None
+        if timer is not None:
+            timer.cancel()
+        self._timer_tick = tick
+        self._timer = weakref.ref(
+            self.loop.call_at(tick * self.resolution, self._fire)
+        )
+
+    def _fire(self) -> None:
+        # The loop may run a timer slightly early, within its clock
+        # resolution, so the tick the timer was set for is always due.
+        now = math.floor(self.loop.time() / self.resolution)
+        due = max(self._timer_tick, now)
+        self._timer = None
+        while self._ticks and self._ticks[0] <= due:
+            tick = heapq.heappop(self._ticks)
+            for future in self._buckets.pop(tick, ()):
+                if not future.done():
+                    future.set_result(None)
+        if self._ticks:
+            self._schedule(self._ticks[0])
+
+
+_schedulers: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, TickScheduler
+] = weakref.WeakKeyDictionary()
+
+
+def tick_scheduler() -> TickScheduler:
+    """Return the scheduler of the running event loop."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = TickScheduler(loop, pacing_settings.tick_resolution)
+        _schedulers[loop] = scheduler
+    return scheduler
+
+
+class Pacer:
+    """Drift-free pacing of a single stream.
+
+    Each ``wait`` advances an absolute deadline measured from the moment the
+    pacer was created on the loop's monotonic clock, so time spent producing
+    a chunk does not accumulate over long streams. A stream that has fallen
+    behind its schedule is not delayed further.
+    """
+
+    def __init__(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.deadline = self.loop.time()
+
+    async def wait(self, delay: float) -> None:
+        self.deadline += delay
+        if self.deadline <= self.loop.time():
+            return
+        if pacing_settings.use_scheduler:
+            scheduler = tick_scheduler()
+            future = scheduler.wait_until(self.deadline)
+            try:
+                await future
+            except asyncio.CancelledError:
+                scheduler.discard(future, self.deadline)
+                raise
+        else:
+            await asyncio.sleep(self.deadline - self.loop.time())
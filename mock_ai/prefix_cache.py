@@ -0,0 +1,145 @@
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from mock_ai.settings import prefix_cache_settings
+from mock_ai.tokenizer import message_digest, token_counter
+
+
+class _Node:
+    __slots__ = ("children", "digests", "parent", "tokens")
+
+    def __init__(
+        self,
+        parent: "_Node | None",
+        digests: list[bytes],
+        tokens: list[int],
+    ):
+        self.parent = parent
+        self.digests = digests
+        self.tokens = tokens
+        self.children: dict[bytes, _Node] = {}
+
+
+class PrefixCache:
+    """Simulated provider prompt cache.
+
+    Prompts are stored in a radix tree whose edges are runs of message
+    digests, each weighted by the tokens of its message. A lookup returns
+    the tokens of the longest stored prefix and inserts the rest of the
+    prompt. The tree holds at most ``max_nodes`` nodes; least recently used
+    leaves are evicted first.
+    """
+
+    def __init__(self, max_nodes: int, enabled: bool = True):
+        self.max_nodes = max_nodes
+        self.enabled = enabled
+        self._root = _Node(None, [], [])
+        # Every node but the root, least recently used first. Paths are
+        # touched leaf first, so a parent is always more recent than its
+        # children and the first entry is always a leaf.
+        self._lru: OrderedDict[_Node, None] = OrderedDict()
+        self.segments = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def match(self, model_key: str, messages: Sequence[dict]) -> int:
+        """Return the cached prompt tokens and cache the whole prompt."""
+        if not self.enabled:
+            return 0
+        digests = [model_key.encode(), *map(message_digest, messages)]
+        tokens = [0, *map(token_counter.count_message, messages)]
+        node, position, cached = self._root, 0, 0
+        while position < len(digests):
+            child = node.children.get(digests[position])
+            if child is None:
+                break
+            common = 0
+            limit = min(len(child.digests), len(digests) - position)
+            while (
+                common < limit
+                and child.digests[common] == digests[position + common]
+            ):
+                common += 1
+            cached += sum(child.tokens[:common])
+            position += common
+            if common < len(child.digests):
+                node = self._split(child, common)
+                break
+            node = child
+        if position < len(digests):
+            node = self._add(node, digests[position:], tokens[position:])
+        self._touch(node)
+
+        self.prompt_tokens += sum(tokens)
+        self.cached_tokens += cached
+        if cached:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self._evict()
+        return cached
+
+    def _split(self, node: _Node, at: int) -> _Node:
+        assert node.parent is not None
+        head = _Node(node.parent, node.digests[:at], node.tokens[:at])
+        node.parent.children[head.digests[0]] = head
+        node.digests, node.tokens = node.digests[at:], node.tokens[at:]
+        node.parent = head
+        head.children[node.digests[0]] = node
+        self._lru[head] = None
+        return head
+
+    def _add(
+        self, parent: _Node, digests: list[bytes], tokens: list[int]
+    ) -> _Node:
+        node = _Node(parent, digests, tokens)
+        parent.children[digests[0]] = node
+        self._lru[node] = None
+        self.segments += len(digests)
+        return node
+
+    def _touch(self, node: _Node) -> None:
+        while node.parent is not None:
+            self._lru.move_to_end(node)
+            node = node.parent
+
+    def _evict(self) -> None:
+        while len(self._lru) > self.max_nodes:
+            node, _ = self._lru.popitem(last=False)
+            assert node.parent is not None
+            del node.parent.children[node.digests[0]]
+            self.segments -= len(node.digests)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._root = _Node(None, [], [])
+        self._lru.clear()
+        self.segments = 0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "nodes": len(self._lru),
+            "max_nodes": self.max_nodes,
+            "segments": self.segments,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "token_hit_rate": (
+                self.cached_tokens / self.prompt_tokens
+                if self.prompt_tokens
+                else 0.0
+            ),
+        }
+
+
+prefix_cache = PrefixCache(
+    prefix_cache_settings.max_nodes, enabled=prefix_cache_settings.enabled
+)
@@ -0,0 +1,300 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple, cast
+
+from pydantic import BaseModel, ConfigDict, Field
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+WINDOW = 60.0
+
+# Levels and last update times of the request and token buckets.
+BucketState = tuple[float, float, float, float]
+
+
+class RateLimit(BaseModel):
+    """Requests and tokens allowed per minute; ``None`` means unlimited."""
+
+    model_config = ConfigDict(frozen=True)
+
+    requests_per_minute: int | None = Field(None, gt=0)
+    tokens_per_minute: int | None = Field(None, gt=0)
+
+
+class RateLimitStatus(NamedTuple):
+    limit: RateLimit
+    remaining_requests: int
+    remaining_tokens: int
+    reset_requests: float
+    reset_tokens: float
+    retry_after: float
+    # Whether the request needs more tokens than a full bucket holds.
+    too_large: bool = False
+
+    @property
+    def allowed(self) -> bool:
+        return self.retry_after == 0 and not self.too_large
+
+    def headers(self) -> dict[str, str]:
+        headers = {}
+        if self.limit.requests_per_minute is not None:
+            headers["x-ratelimit-limit-requests"] = str(
+                self.limit.requests_per_minute
+            )
+            headers["x-ratelimit-remaining-requests"] = str(
+                self.remaining_requests
+            )
+            headers["x-ratelimit-reset-requests"] = _duration(
+                self.reset_requests
+            )
+        if self.limit.tokens_per_minute is not None:
+            headers["x-ratelimit-limit-tokens"] = str(
+                self.limit.tokens_per_minute
+            )
+            headers["x-ratelimit-remaining-tokens"] = str(self.remaining_tokens)
+            headers["x-ratelimit-reset-tokens"] = _duration(self.reset_tokens)
+        if self.retry_after:
+            headers["retry-after"] = str(math.ceil(self.retry_after))
+            headers["retry-after-ms"] = str(math.ceil(self.retry_after * 1000))
+        return headers
+
+
+def _duration(seconds: float) -> str:
+    """Format a delay like the OpenAI reset headers, e.g. ``1m30s``."""
+    if seconds < 1:
+        return f"{math.ceil(seconds * 1000)}ms"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes:
+        return f"{int(minutes)}m{int(seconds)}s"
+    return f"{seconds:.3g}s"
+
+
+def _refill(level: float, updated: float, capacity: int, now: float) -> float:
+    if updated < 0:
+        return capacity
+    return min(capacity, level + max(0.0, now - updated) * capacity / WINDOW)
+
+
+class MemoryBuckets:
+    """Bucket states of a single process."""
+
+    def __init__(self) -> None:
+        self._states: dict[int, BucketState] = {}
+
+    def update(
+        self,
+        key: int,
+        update: Callable[[BucketState | None], BucketState],
+        now: float,
+    ) -> None:
+        self._states[key] = update(self._states.get(key))
+
+
+class SharedBuckets:
+    """Bucket states shared by every worker through a memory mapped file.
+
+    The file holds an open addressing table of ``slots`` entries, guarded
+    by an exclusive ``flock``. Slots whose buckets have been full for a
+    whole window are reused, so the table never needs to grow. When every
+    slot is in use, the least recently updated bucket is evicted: its
+    caller starts over with a full budget, while the active callers keep
+    theirs.
+    """
+
+    SLOT = struct.Struct("<Q4d")
+
+    def __init__(self, path: Path, slots: int = 4096):
+        self.path = path
+        self.slots = slots
+        self._fd: int | None = None
+        self._map: mmap.mmap | None = None
+
+    def _open(self) -> mmap.mmap:
+        import fcntl
+
+        size = self.SLOT.size * self.slots
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._map = mmap.mmap(fd, size)
+        return self._map
+
+    def _find(self, data: mmap.mmap, key: int, now: float) -> int:
+        home = key % self.slots
+        reusable = None
+        oldest, oldest_updated = home * self.SLOT.size, math.inf
+        for probe in range(self.slots):
+            offset = ((home + probe) % self.slots) * self.SLOT.size
+            slot_key, _, req_updated, _, tok_updated = self.SLOT.unpack_from(
+                data, offset
+            )
+            if slot_key == key:
+                return offset
+            if slot_key == 0:
+                return offset if reusable is None else reusable
+            updated = max(req_updated, tok_updated)
+            if reusable is None and now - updated > WINDOW:
+                reusable = offset
+            if updated < oldest_updated:
+                oldest, oldest_updated = offset, updated
+        return oldest if reusable is None else reusable
+
+    def update(
+        self,
+        key: int,
+        update: Callable[[BucketState | None], BucketState],
+        now: float,
+    ) -> None:
+        import fcntl
+
+        data = self._map or self._open()
+        fd = self._fd
+        assert fd is not None
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            offset = self._find(data, key, now)
+            slot_key, *state = self.SLOT.unpack_from(data, offset)
+            previous = cast(BucketState, tuple(state))
+            new_state = update(previous if slot_key == key else None)
+            self.SLOT.pack_into(data, offset, key, *new_state)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class RateLimiter:
+    """Per caller and model token buckets for requests and tokens.
+
+    Each bucket holds up to a minute worth of budget and refills
+    continuously. A request is admitted only if both buckets can pay for
+    it, and rejected requests are not charged. A request needing more
+    tokens than the bucket holds is rejected as too large.
+    """
+
+    def __init__(
+        self,
+        default: RateLimit,
+        models: dict[str, RateLimit] | None = None,
+        buckets: MemoryBuckets | SharedBuckets | None = None,
+        enabled: bool = True,
+    ):
+        self.default = default
+        self.models = models or {}
+        self.buckets = buckets or MemoryBuckets()
+        self.enabled = enabled
+        self.allowed = 0
+        self.rejected = 0
+
+    @staticmethod
+    def key(caller: str, model_key: str) -> int:
+        digest = hashlib.blake2b(
+            f"{caller}\x00{model_key}".encode(), digest_size=8
+        ).digest()
+        return int.from_bytes(digest) or 1
+
+    def acquire(
+        self,
+        caller: str,
+        model_key: str,
+        tokens: int,
+        now: float | None = None,
+    ) -> RateLimitStatus:
+        """Charge one request of ``tokens`` tokens if the budgets allow it."""
+        limit = self.models.get(model_key, self.default)
+        if limit.tokens_per_minute and tokens > limit.tokens_per_minute:
+            # Waiting would never help, so the bucket is left untouched.
+            self.rejected += 1
+            return RateLimitStatus(limit, 0, 0, 0.0, 0.0, 0.0, too_large=True)
+        now = time.time() if now is None else now
+        result: list[RateLimitStatus] = []
+
+        def update(state: BucketState | None) -> BucketState:
+            req_level, req_updated, tok_level, tok_updated = state or (
+                0.0,
+                -1.0,
+                0.0,
+                -1.0,
+            )
+            req_capacity = limit.requests_per_minute or 0
+            tok_capacity = limit.tokens_per_minute or 0
+            req_level = _refill(req_level, req_updated, req_capacity, now)
+            tok_level = _refill(tok_level, tok_updated, tok_capacity, now)
+            wait = 0.0
+            if req_capacity and req_level < 1:
+                wait = (1 - req_level) * WINDOW / req_capacity
+            if tok_capacity and tok_level < tokens:
+                wait = max(wait, (tokens - tok_level) * WINDOW / tok_capacity)
+            if not wait:
+                req_level -= 1 if req_capacity else 0
+                tok_level -= tokens if tok_capacity else 0
+            result.append(
+                RateLimitStatus(
+                    limit=limit,
+                    remaining_requests=int(max(req_level, 0)),
+                    remaining_tokens=int(max(tok_level, 0)),
+                    reset_requests=_time_to_full(req_level, req_capacity),
+                    reset_tokens=_time_to_full(tok_level, tok_capacity),
+                    retry_after=wait,
+                )
+            )
+            return req_level, now, tok_level, now
+
+        self.buckets.update(self.key(caller, model_key), update, now)
+        status = result[0]
+        if status.allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return status
+
+    def stats(self) -> dict[str, int]:
+        return {"allowed": self.allowed, "rejected": self.rejected}
+
+
+def _time_to_full(level: float, capacity: int) -> float:
+    if not capacity:
+        return 0.0
+    return (capacity - level) * WINDOW / capacity
+
+
+class RateLimitHeadersMiddleware:
+    """Add the ``x-ratelimit-*`` headers of an admitted request.
+
+    The status is left in the request state by the rate limit dependency,
+    which cannot set headers itself on endpoints returning a ``Response``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status = scope.get("state", {}).get("rate_limit")
+                if status is not None:
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        *(
+                            (name.encode(), value.encode())
+                            for name, value in status.headers().items()
+                        ),
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
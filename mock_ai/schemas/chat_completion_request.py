@@ -1,4 +1,9 @@
-from pydantic import BaseModel
+import json
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from mock_ai.utils import random_gen_from_string
 
 
 class ModelSettings(BaseModel):
@@ -8,6 +13,8 @@ class ModelSettings(BaseModel):
     temperature: float | None = 1
     response_format: dict | None = None
     stream_options: dict | None = None
+    seed: int | None = None
+    n: int = Field(1, ge=1, le=128)
 
     def needs_usage(self) -> bool:
         return (
@@ -15,6 +22,17 @@ class ModelSettings(BaseModel):
             and "include_usage" in self.stream_options
         )
 
+    def rng(self) -> np.random.Generator:
+        """Return a generator dedicated to this request.
+
+        Without a ``seed`` the generator is derived from a stable hash of the
+        messages, so identical requests produce identical output.
+        """
+        if self.seed is not None:
+            return np.random.default_rng(self.seed & 0xFFFFFFFFFFFFFFFF)
+        key = json.dumps(self.messages, sort_keys=True, default=str)
+        return random_gen_from_string(key)
+
     @property
     def tokens_upper_limit(self) -> int | float:
         upper_limit = float("inf")
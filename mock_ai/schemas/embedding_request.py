@@ -1,11 +1,14 @@
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+Precision = Literal["float32", "float16", "int8", "binary"]
 
 
 class EmbeddingRequest(BaseModel):
     input: str | list[str]
     model: str
     encoding_format: Literal["float", "base64"] = "float"
-    dimensions: int | None = None
+    dimensions: int | None = Field(None, gt=0)
+    precision: Precision = "float32"
     user: str | None = None
@@ -7,12 +7,18 @@ from .usage import Usage
 
 class EmbeddingObject(BaseModel):
     object: Literal["embedding"] = "embedding"
-    embedding: list[float]
+    embedding: list[float] | list[int] | str
     index: int
 
 
+class QuantizedEmbeddingObject(EmbeddingObject):
+    """An ``int8`` embedding, which is ``scale`` times the integers."""
+
+    scale: float
+
+
 class EmbeddingResponse(BaseModel):
     object: Literal["list"] = "list"
-    data: list[EmbeddingObject]
+    data: list[QuantizedEmbeddingObject | EmbeddingObject]
     model: str
     usage: Usage
@@ -2,12 +2,15 @@ from typing import Literal
 
 from pydantic import BaseModel
 
+from mock_ai.latency import LatencyProfile
+
 
 class ModelInfo(BaseModel):
     id: str
     object: Literal["model"] = "model"
     created: int
     owned_by: str
+    latency_profile: LatencyProfile | None = None
 
 
 class ModelsResponse(BaseModel):
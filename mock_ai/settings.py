@@ -1,9 +1,13 @@
+import tempfile
 from pathlib import Path
-from typing import Annotated, Any
+from typing import Annotated, Any, Literal
 
-from pydantic import field_validator
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
+from mock_ai.latency import LatencyProfile
+from mock_ai.rate_limit import RateLimit
+
 
 class UvicornSettings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -72,3 +76,176 @@ class CorsSettings(BaseSettings):
 
 
 cors_settings = CorsSettings()
+
+
+class PacingSettings(BaseSettings):
+    """Pacing configuration for streamed responses."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="PACING_",
+        env_file=".env",
+        extra="allow",
+    )
+
+    use_scheduler: bool = True
+    tick_resolution: float = 0.005
+
+
+pacing_settings = PacingSettings()
+
+
+class LatencySettings(BaseSettings):
+    """Latency profiles overriding the model defaults, keyed by model."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="LATENCY_",
+        env_file=".env",
+        extra="allow",
+    )
+
+    profiles: dict[str, LatencyProfile] = {}
+
+
+latency_settings = LatencySettings()
+
+
+class CacheSettings(BaseSettings):
+    """Response cache configuration."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="CACHE_",
+        env_file=".env",
+        extra="allow",
+    )
+
+    enabled: bool = True
+    max_bytes: int = 256 * 1024 * 1024
+    artifact_max_bytes: int = 128 * 1024 * 1024
+
+
+cache_settings = CacheSettings()
+
+
+class TokenizerSettings(BaseSettings):
+    """Prompt token counting configuration."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="TOKENIZER_",
+        env_file=".env",
+        extra="allow",
+    )
+
+    vocab_file: Path | None = None
+    cache_size: int = 65536
+
+
+tokenizer_settings = TokenizerSettings()
+
+
+class PrefixCacheSettings(BaseSettings):
+    """Simulated prompt prefix cache configuration."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="PREFIX_CACHE_",
+        env_file=".env",
+        extra="allow",
+    )
+
+    enabled: bool = True
+    max_nodes: int = 100_000
+
+
+prefix_cache_settings = PrefixCacheSettings()
+
+
+class RateLimitSettings(BaseSettings):
+    """Simulated rate limits per bearer token and model."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="RATE_LIMIT_",
+        env_file=".env",
+        extra="allow",
+    )
+
+    enabled: bool = False
+    requests_per_minute: int | None = 500
+    tokens_per_minute: int | None = 200_000
+    models: dict[str, RateLimit] = {}
+    backend: Literal["memory", "shared"] = "shared"
+    shared_file: Path = Path(tempfile.gettempdir()) / "mock-ai-rate-limit"
+    shared_slots: int = 4096
+
+
+rate_limit_settings = RateLimitSettings()
+
+
+class StreamSettings(BaseSettings):
+    """Server-Sent Events transport configuration."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="STREAM_",
+        env_file=".env",
+        extra="allow",
+    )
+
+    flush_interval: float = 0.0
+    flush_bytes: int = 16384
+
+
+stream_settings = StreamSettings()
+
+
+class EmbeddingStoreSettings(BaseSettings):
+    """Persistent embedding store shared by the workers."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="EMBEDDING_STORE_",
+        env_file=".env",
+        extra="allow",
+    )
+
+    enabled: bool = False
+    path: Path = Path(tempfile.gettempdir()) / "mock-ai-embeddings"
+    max_bytes: int = 1024 * 1024 * 1024
+    slots: int = 1 << 20
+
+
+embedding_store_settings = EmbeddingStoreSettings()
+
+
+class ExecutorSettings(BaseSettings):
+    """Pools running CPU-bound generation off the event loop."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="EXECUTOR_",
+        env_file=".env",
+        extra="allow",
+    )
+
+    max_workers: int | None = None
+    workloads: dict[str, Literal["inline", "thread", "process"]] = {}
+    model_concurrency: int = 4
+    models: dict[str, int] = {}
+    embedding_min_batch: int = 256
+
+
+executor_settings = ExecutorSettings()
+
+
+class ImageSettings(BaseSettings):
+    """Image rendering."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="IMAGE_",
+        env_file=".env",
+        extra="allow",
+    )
+
+    noise_atlas: bool = False
+    atlas_size: int = Field(4096, gt=0)
+    atlas_path: Path | None = (
+        Path(tempfile.gettempdir()) / "mock-ai-noise-atlas"
+    )
+
+
+image_settings = ImageSettings()
@@ -0,0 +1,151 @@
+import asyncio
+
+import anyio
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from mock_ai.models.chat.chat_stream import ChatCompletionStream
+
+
+class StreamStats:
+    """Counters of chat completion streams served by this worker."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.completed = 0
+        self.aborted = 0
+        self.wasted_bytes = 0
+        self.wasted_tokens = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "active": self.active,
+            "completed": self.completed,
+            "aborted": self.aborted,
+            "wasted_bytes": self.wasted_bytes,
+            "wasted_tokens": self.wasted_tokens,
+        }
+
+
+stream_stats = StreamStats()
+
+
+class ChatStreamingResponse(StreamingResponse):
+    """SSE response that stops generating as soon as the client leaves.
+
+    Starlette only watches for ``http.disconnect`` on servers older than
+    ASGI spec 2.4 and otherwise notices a dropped client on the next failed
+    write. This response always listens on ``receive``, cancels the stream
+    when the client disconnects and closes the model generator, which
+    releases its pacing timer. Bytes and tokens produced for aborted
+    streams are counted in ``stream_stats``.
+
+    With a positive ``flush_interval`` the frames produced within that many
+    seconds of the first unsent one, up to ``flush_bytes``, are coalesced
+    into a single write.
+    """
+
+    def __init__(
+        self,
+        stream: ChatCompletionStream,
+        flush_interval: float = 0.0,
+        flush_bytes: int = 16384,
+    ):
+        self.frames = stream.sse()
+        super().__init__(self.frames, media_type="text/event-stream")
+        self.stream = stream
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        disconnected = False
+        stream_stats.active += 1
+        try:
+            async with anyio.create_task_group() as task_group:
+
+                async def stream_response() -> None:
+                    nonlocal disconnected
+                    try:
+                        if self.flush_interval > 0:
+                            await self.coalesced_stream_response(send)
+                        else:
+                            await self.stream_response(send)
+                    except OSError:
+                        disconnected = True
+                    task_group.cancel_scope.cancel()
+
+                task_group.start_soon(stream_response)
+                await self.listen_for_disconnect(receive)
+                disconnected = True
+                task_group.cancel_scope.cancel()
+        finally:
+            stream_stats.active -= 1
+            await self.frames.aclose()
+            await self.stream.aclose()
+            if disconnected:
+                stream_stats.aborted += 1
+                stream_stats.wasted_bytes += self.stream.produced_bytes
+                stream_stats.wasted_tokens += self.stream.produced_tokens
+            else:
+                stream_stats.completed += 1
+
+    async def coalesced_stream_response(self, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        loop = asyncio.get_running_loop()
+        buffer: list[bytes] = []
+        size = 0
+        done = False
+        ready = asyncio.Event()
+        drained = asyncio.Event()
+        timer: asyncio.TimerHandle | None = None
+
+        async def produce() -> None:
+            nonlocal size, done, timer
+            async for frame in self.frames:
+                buffer.append(frame)
+                size += len(frame)
+                if size >= self.flush_bytes:
+                    # Wait for the writer, so a slow client bounds the buffer.
+                    drained.clear()
+                    ready.set()
+                    await drained.wait()
+                elif timer is None:
+                    timer = loop.call_later(self.flush_interval, ready.set)
+            done = True
+            ready.set()
+
+        try:
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(produce)
+                while not (done and not buffer):
+                    await ready.wait()
+                    ready.clear()
+                    if timer is not None:
+                        timer.cancel()
+                        timer = None
+                    body = b"".join(buffer)
+                    buffer.clear()
+                    size = 0
+                    drained.set()
+                    if body:
+                        await send(
+                            {
+                                "type": "http.response.body",
+                                "body": body,
+                                "more_body": True,
+                            }
+                        )
+        finally:
+            if timer is not None:
+                timer.cancel()
+        await send(
+            {"type": "http.response.body", "body": b"", "more_body": False}
+        )
@@ -0,0 +1,240 @@
+import abc
+import base64
+import functools
+import hashlib
+import re
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from mock_ai.settings import tokenizer_settings
+
+
+class TokenCounter(abc.ABC):
+    """Counts prompt tokens of chat messages.
+
+    When ``memoize`` is set, message counts are cached by a hash of the
+    message, so a conversation that grows by one message per turn is only
+    counted incrementally.
+    """
+
+    memoize = True
+
+    # Framing overhead per message and for priming the reply, as documented
+    # for OpenAI chat models.
+    TOKENS_PER_MESSAGE = 3
+    TOKENS_PER_NAME = 1
+    TOKENS_PER_REPLY = 3
+    # Flat cost of non-text content parts such as images or audio.
+    TOKENS_PER_MEDIA_PART = 85
+
+    def __init__(self, cache_size: int = 65536):
+        self.cache_size = cache_size
+        self._cache: OrderedDict[bytes, int] = OrderedDict()
+
+    @abc.abstractmethod
+    def count_text(self, text: str) -> int:
+        """Count the tokens of a piece of text."""
+        ...
+
+    def count_messages(self, messages: Iterable[dict]) -> int:
+        total = self.TOKENS_PER_REPLY
+        for message in messages:
+            total += self.count_message(message)
+        return total
+
+    def count_message(self, message: dict) -> int:
+        if not self.memoize:
+            return self._count_message(message)
+        key = message_digest(message)
+        count = self._cache.get(key)
+        if count is not None:
+            self._cache.move_to_end(key)
+            return count
+        count = self._count_message(message)
+        self._cache[key] = count
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return count
+
+    def _count_message(self, message: dict) -> int:
+        count = self.TOKENS_PER_MESSAGE + self._count_content(
+            message.get("content")
+        )
+        if message.get("name"):
+            count += self.TOKENS_PER_NAME + self.count_text(
+                str(message["name"])
+            )
+        tool_calls = message.get("tool_calls")
+        # Messages are only loosely validated: skip malformed tool calls.
+        for tool_call in tool_calls if isinstance(tool_calls, list) else ():
+            if not isinstance(tool_call, dict):
+                continue
+            function = tool_call.get("function")
+            if isinstance(function, dict):
+                count += self.count_text(str(function.get("name", "")))
+                count += self.count_text(str(function.get("arguments", "")))
+        return count
+
+    def _count_content(self, content: Any) -> int:
+        if content is None:
+            return 0
+        if isinstance(content, str):
+            return self.count_text(content)
+        if isinstance(content, list):
+            count = 0
+            for part in content:
+                if isinstance(part, dict) and part.get("type") == "text":
+                    count += self.count_text(str(part.get("text", "")))
+                elif isinstance(part, str):
+                    count += self.count_text(part)
+                else:
+                    count += self.TOKENS_PER_MEDIA_PART
+            return count
+        return self.count_text(str(content))
+
+
+def _digest_value(digest: Any, value: Any) -> None:
+    # Strings go in as their bytes, and lists and dicts part by part, so a
+    # base64 image is hashed without building a repr of the message.
+    if isinstance(value, str):
+        data = value.encode("utf-8", "surrogatepass")
+        digest.update(b"s%d:" % len(data))
+        digest.update(data)
+    elif isinstance(value, list):
+        digest.update(b"l%d:" % len(value))
+        for item in value:
+            _digest_value(digest, item)
+    elif isinstance(value, dict):
+        digest.update(b"d%d:" % len(value))
+        for key, item in value.items():
+            _digest_value(digest, str(key))
+            _digest_value(digest, item)
+    else:
+        digest.update(b"r")
+        _digest_value(digest, repr(value))
+
+
+def message_digest(message: dict) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    for key in ("role", "name", "content", "tool_calls"):
+        value = message.get(key)
+        digest.update(key.encode())
+        if value is not None:
+            _digest_value(digest, value)
+        digest.update(b"\x00")
+    return digest.digest()
+
+
+class HeuristicTokenCounter(TokenCounter):
+    """Approximate counter assuming four characters per token.
+
+    Counting only needs string lengths, which is cheaper than hashing the
+    message, so counts are not memoized.
+    """
+
+    memoize = False
+    CHARS_PER_TOKEN = 4
+
+    def count_text(self, text: str) -> int:
+        return -(-len(text) // self.CHARS_PER_TOKEN)
+
+
+# Approximation of the GPT pre-tokenizer with the standard `re` module.
+_PRE_TOKENIZER = re.compile(
+    r"""'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+""",
+    re.IGNORECASE,
+)
+
+
+class BpeTokenCounter(TokenCounter):
+    """Byte-pair encoding counter using a local vocabulary file.
+
+    The file uses the ``tiktoken`` format: one base64 encoded token and its
+    merge rank per line.
+    """
+
+    def __init__(self, ranks: dict[bytes, int], cache_size: int = 65536):
+        super().__init__(cache_size)
+        self.ranks = ranks
+        self._count_piece = functools.lru_cache(maxsize=cache_size)(
+            self._bpe_length
+        )
+
+    @classmethod
+    def from_file(
+        cls, path: Path, cache_size: int = 65536
+    ) -> "BpeTokenCounter":
+        ranks: dict[bytes, int] = {}
+        with path.open("rb") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+        return cls(ranks, cache_size)
+
+    def count_text(self, text: str) -> int:
+        return sum(
+            self._count_piece(piece) for piece in _PRE_TOKENIZER.findall(text)
+        )
+
+    def _bpe_length(self, piece: str) -> int:
+        data = piece.encode("utf-8", "surrogatepass")
+        if data in self.ranks:
+            return 1
+        parts = [data[i : i + 1] for i in range(len(data))]
+        while len(parts) > 1:
+            best_rank, best_index = None, -1
+            for i in range(len(parts) - 1):
+                rank = self.ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank, best_index = rank, i
+            if best_rank is None:
+                break
+            parts[best_index : best_index + 2] = [
+                parts[best_index] + parts[best_index + 1]
+            ]
+        return len(parts)
+
+
+def _default_counter() -> TokenCounter:
+    if tokenizer_settings.vocab_file is not None:
+        return BpeTokenCounter.from_file(
+            tokenizer_settings.vocab_file, tokenizer_settings.cache_size
+        )
+    return HeuristicTokenCounter(tokenizer_settings.cache_size)
+
+
+token_counter = _default_counter()
+
+
+def count_text(text: str) -> int:
+    return token_counter.count_text(text)
+
+
+def count_messages(messages: Iterable[dict]) -> int:
+    return token_counter.count_messages(messages)
+
+
+def token_chunks(
+    fragments: Iterable[str], tokens_per_chunk: float
+) -> Iterator[tuple[str, int]]:
+    """Group streamed text into deltas of about ``tokens_per_chunk`` tokens.
+
+    Fragments are split with the pre-tokenizer, so every delta ends on a
+    token boundary. Yields each delta with its token count.
+    """
+    pieces: list[str] = []
+    tokens = 0
+    for fragment in fragments:
+        for piece in _PRE_TOKENIZER.findall(fragment):
+            pieces.append(piece)
+            tokens += token_counter.count_text(piece)
+            if tokens >= tokens_per_chunk:
+                yield "".join(pieces), tokens
+                pieces.clear()
+                tokens = 0
+    if pieces:
+        yield "".join(pieces), tokens
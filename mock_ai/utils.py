@@ -1,14 +1,16 @@
 import base64
+import functools
 import hashlib
 import io
-import random
 import re
-import string
+import sys
+import textwrap
 import uuid
 from collections.abc import AsyncIterator
+from statistics import NormalDist
 
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageDraw, ImageFont
 from pydantic import BaseModel
 
 
@@ -35,24 +37,117 @@ class SSEEncoder:
         raise TypeError("Unsupported item type")
 
 
-def generate_random_string(length: int) -> str:
-    allowed_chars = string.ascii_letters + string.digits + " " * 10
-    return "".join(random.choices(allowed_chars, k=length))
-
-
 def random_gen_from_string(key: str) -> np.random.Generator:
     h = hashlib.md5(key.encode("utf-8")).digest()
     seed = int.from_bytes(h[:8], "big", signed=False)
     return np.random.default_rng(seed)
 
 
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+# Values generated per block of ``normal_rows``.
+NORMAL_BLOCK_SIZE = 1 << 17
+
+
+def splitmix64(z: np.ndarray) -> np.ndarray:
+    """Apply the splitmix64 finalizer to ``z`` in place."""
+    z += _GOLDEN
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return z
+
+
+def string_seeds(keys: list[str]) -> np.ndarray:
+    """Hash every key to a 64 bit seed."""
+    return np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(key.encode(), digest_size=8).digest()
+            )
+            for key in keys
+        ),
+        dtype=np.uint64,
+        count=len(keys),
+    )
+
+
+def _box_muller(seeds: np.ndarray, out: np.ndarray) -> None:
+    """Fill ``out`` with the normal values of one block of seeds."""
+    n = out.shape[1]
+    pairs = (n + 1) // 2
+    bits = splitmix64(
+        seeds[:, None] + np.arange(1, pairs + 1, dtype=np.uint64) * _GOLDEN
+    )
+    radius = (bits >> np.uint64(40)).astype(np.float32)
+    radius += 0.5
+    radius *= 2**-24
+    np.log(radius, out=radius)
+    radius *= -2
+    np.sqrt(radius, out=radius)
+    angle = (bits & np.uint64(0xFFFFFF)).astype(np.float32)
+    angle *= np.float32(2 * np.pi * 2**-24)
+    np.cos(angle[:, : n - n // 2], out=out[:, 0::2])
+    np.sin(angle[:, : n // 2], out=out[:, 1::2])
+    out[:, 0::2] *= radius[:, : n - n // 2]
+    out[:, 1::2] *= radius[:, : n // 2]
+
+
+def normal_rows(
+    keys: list[str], n: int, loc: float = 0.0, scale: float = 1.0
+) -> np.ndarray:
+    """Return one unit-norm float32 row of ``n`` normal values per key.
+
+    Values come from a counter-based generator: the ``j``-th pair of a row
+    is the splitmix64 hash of the key's seed and ``j``, turned into two
+    normal values with the Box-Muller transform. Rows depend only on their
+    key, so a batch fills one matrix without creating a generator per key
+    and identical keys are generated once. The matrix is filled in blocks
+    of rows that fit in the CPU cache.
+    """
+    seeds, inverse = np.unique(string_seeds(keys), return_inverse=True)
+    rows = np.empty((len(seeds), n), dtype=np.float32)
+    block = max(1, NORMAL_BLOCK_SIZE // max(n, 1))
+    for start in range(0, len(seeds), block):
+        _box_muller(seeds[start : start + block], rows[start : start + block])
+    rows *= np.float32(scale)
+    rows += np.float32(loc)
+    rows /= np.sqrt(np.einsum("ij,ij->i", rows, rows))[:, None]
+    return rows[inverse.reshape(-1)]
+
+
 def normal_from_string(
     key: str, n: int, loc: float = 0.0, scale: float = 1.0
 ) -> np.ndarray:
-    rng = random_gen_from_string(key)
-    v = rng.normal(loc=loc, scale=scale, size=n)
-    normalized_v = v / np.linalg.norm(v)
-    return normalized_v
+    return normal_rows([key], n, loc, scale)[0]
+
+
+# Values drawn per tile of a noise image, bounding its temporaries.
+NOISE_TILE_VALUES = 1 << 20
+
+
+@functools.cache
+def _normal_quantiles() -> np.ndarray:
+    """Standard normal quantiles at the midpoints of the 16 bit range."""
+    dist = NormalDist()
+    return np.array(
+        [dist.inv_cdf((u + 0.5) / 65536) for u in range(65536)],
+        dtype=np.float32,
+    )
+
+
+def noise_lut(values: int) -> np.ndarray:
+    """Map 16 bit uniform draws to min-max normalized Gaussian pixels.
+
+    Normalizing ``values`` normal samples by their minimum and maximum
+    spreads them over about plus or minus the expected extreme
+    ``inv_cdf(1 - 1 / (values + 1))``; the table bakes that scaling into the
+    quantile of each draw.
+    """
+    extreme = NormalDist().inv_cdf(1 - 1 / (values + 1))
+    pixels = (_normal_quantiles() + extreme) * (255 / (2 * extreme))
+    return np.clip(pixels, 0, 255).astype(np.uint8)
 
 
 def generate_noise_image_from_string(
@@ -62,15 +157,97 @@ def generate_noise_image_from_string(
     loc: float = 0.0,
     scale: float = 1.0,
 ) -> Image.Image:
+    """Render deterministic Gaussian RGB noise for ``key``.
+
+    Pixels are drawn as 16 bit integers in tiles of rows and mapped
+    through ``noise_lut`` straight into the uint8 output, so peak memory is
+    about the image itself. The pixel distribution matches normal noise
+    stretched to the full range; like that stretch, it does not depend on
+    ``loc`` and ``scale``.
+    """
     rng = random_gen_from_string(key)
-    noise = rng.normal(loc=loc, scale=scale, size=(height, width, 3))
+    lut = noise_lut(width * height * 3)
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    rows = max(1, NOISE_TILE_VALUES // max(width * 3, 1))
+    for top in range(0, height, rows):
+        tile = pixels[top : top + rows]
+        draws = rng.integers(0, 65536, size=tile.shape, dtype=np.uint16)
+        np.take(lut, draws, out=tile)
+    return Image.fromarray(pixels, mode="RGB")
+
+
+@functools.lru_cache(maxsize=16)
+def _font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    return ImageFont.load_default(size)
+
 
-    noise_min = noise.min()
-    noise_max = noise.max()
-    noise_normalized = (noise - noise_min) / (noise_max - noise_min)
-    noise_255 = (noise_normalized * 255).astype(np.uint8)
+def generate_procedural_image_from_string(
+    key: str, width: int, height: int, text: str | None = None
+) -> Image.Image:
+    """Render a deterministic, highly compressible picture for ``key``.
 
-    return Image.fromarray(noise_255, mode="RGB")
+    A linear gradient background carries a checkerboard patch, a few flat
+    shapes and, if given, ``text``. Large flat and smoothly varying areas
+    make the PNG or JPEG a small fraction of the size of a noise image.
+    """
+    rng = random_gen_from_string(key)
+    colors = [tuple(int(c) for c in rng.integers(0, 256, 3)) for _ in range(6)]
+
+    # The gradient level of a pixel is the sum of a row and a column term,
+    # mapped to colours through the palette of a "P" image.
+    angle = rng.uniform(0, 2 * np.pi)
+    ramp_x = np.cos(angle) * np.arange(width, dtype=np.float32)
+    ramp_y = np.sin(angle) * np.arange(height, dtype=np.float32)
+    ramp_x -= ramp_x.min()
+    ramp_y -= ramp_y.min()
+    peak = max(float(ramp_x.max() + ramp_y.max()), 1.0)
+    levels = np.empty((height, width), dtype=np.uint8)
+    np.add(
+        ramp_y[:, None] * (255 / peak),
+        ramp_x[None, :] * (255 / peak),
+        out=levels,
+        casting="unsafe",
+    )
+    start, stop = np.array(colors[:2], dtype=np.float32)
+    palette = start + np.linspace(0, 1, 256, dtype=np.float32)[:, None] * (
+        stop - start
+    )
+    background = Image.fromarray(levels, mode="P")
+    background.putpalette(palette.astype(np.uint8).tobytes())
+    img = background.convert("RGB")
+    draw = ImageDraw.Draw(img)
+
+    left, top = int(rng.integers(0, width)), int(rng.integers(0, height))
+    cell = max(1, min(width, height) // int(rng.integers(8, 17)))
+    right, bottom = (
+        min(width, left + width // 2),
+        min(height, top + height // 2),
+    )
+    for y in range(top, bottom, cell):
+        for x in range(left + (y - top) // cell % 2 * cell, right, 2 * cell):
+            draw.rectangle(
+                (x, y, min(x + cell, right) - 1, min(y + cell, bottom) - 1),
+                fill=colors[2],
+            )
+    for color in colors[3:]:
+        x0, x1 = sorted(int(v) for v in rng.integers(0, width, 2))
+        y0, y1 = sorted(int(v) for v in rng.integers(0, height, 2))
+        box = (x0, y0, max(x1, x0 + 1), max(y1, y0 + 1))
+        if rng.integers(2):
+            draw.ellipse(box, fill=color)
+        else:
+            draw.rectangle(box, fill=color)
+    if text:
+        size = max(8, min(width, height) // 16)
+        draw.multiline_text(
+            (size, size),
+            "\n".join(textwrap.wrap(text, max(1, width * 2 // size - 4))),
+            fill=(255, 255, 255),
+            font=_font(size),
+            stroke_width=max(1, size // 12),
+            stroke_fill=(0, 0, 0),
+        )
+    return img
 
 
 def img_to_b64(img: Image.Image, format: str) -> str:
@@ -180,3 +357,76 @@ class TokenBatchFactory:
 
     def __rmul__(self, other: int) -> "TokenBatchFactory":
         return self.__mul__(other)
+
+
+_token_rng = np.random.default_rng()
+
+
+class TokenVocabulary:
+    """Precomputed table of ``[k]`` tokens shared by every stream.
+
+    Each token is rendered once with the same suffix rules as ``Token`` and
+    interned. The table is also concatenated into a single ``buffer`` where
+    token ``k`` spans ``offsets[k]:offsets[k + 1]``, so long completions can
+    be assembled with one vectorized gather instead of a join.
+    """
+
+    GATHER_THRESHOLD = 256
+
+    def __init__(self, n: int = 1024, stop_token: int = 0):
+        token = Token(n)
+        self.n = n
+        self.stop_token = stop_token
+        self.table: list[str] = [sys.intern(token[k]) for k in range(n)]
+        self.buffer = np.frombuffer(
+            "".join(self.table).encode("ascii"), dtype=np.uint8
+        )
+        lengths = np.fromiter(map(len, self.table), dtype=np.int64, count=n)
+        self.offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+
+    def __len__(self) -> int:
+        return self.n
+
+    def draw(
+        self,
+        size: int | tuple[int, ...],
+        rng: np.random.Generator | None = None,
+    ) -> np.ndarray:
+        """Draw uniformly distributed token indexes in a single call."""
+        rng = rng if rng is not None else _token_rng
+        return rng.bit_generator.random_raw(size) % self.n
+
+    def decode(self, indexes: np.ndarray) -> str:
+        """Render token indexes as text, stopping at the first stop token."""
+        if len(indexes) < self.GATHER_THRESHOLD:
+            values = indexes.tolist()
+            if self.stop_token in values:
+                values = values[: values.index(self.stop_token)]
+            return "".join(map(self.table.__getitem__, values))
+        stops = np.flatnonzero(indexes == self.stop_token)
+        if stops.size:
+            if not stops[0]:
+                return ""
+            indexes = indexes[: stops[0]]
+        starts = self.offsets[indexes]
+        lengths = self.offsets[indexes + 1] - starts
+        ends = np.cumsum(lengths)
+        positions = np.repeat(starts - ends + lengths, lengths)
+        positions += np.arange(ends[-1])
+        return self.buffer[positions].tobytes().decode("ascii")
+
+    def emitted(self, indexes: np.ndarray) -> np.ndarray:
+        """Count the tokens ``decode`` renders for each row of ``indexes``."""
+        stops = indexes == self.stop_token
+        return np.where(stops.any(-1), stops.argmax(-1), indexes.shape[-1])
+
+    def sample(self, size: int, rng: np.random.Generator | None = None) -> str:
+        """Draw and render a chunk of at most ``size`` tokens."""
+        return self.decode(self.draw(size, rng))
+
+
+@functools.cache
+def token_vocabulary(n: int = 1024, stop_token: int = 0) -> TokenVocabulary:
+    """Return the process-wide vocabulary for ``n`` tokens."""
+    return TokenVocabulary(n, stop_token)
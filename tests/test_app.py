@@ -1,4 +1,5 @@
 import asyncio
+import json
 import sys
 import types
 
@@ -13,6 +14,8 @@ from mock_ai.app import (
     models as models_endpoint,
     private,
 )
+from mock_ai.cache import response_cache
+from mock_ai.exceptions import FileNotFound
 from mock_ai.models.standard_registry import STANDARD_REGISTRY
 from mock_ai.schemas.chat_completion_request import ChatCompletionRequest
 from mock_ai.schemas.embedding_request import EmbeddingRequest
@@ -49,6 +52,20 @@ async def test_chat_completion_non_stream():
     assert response.media_type == "application/json"
 
 
+@pytest.mark.asyncio
+async def test_chat_completion_stream():
+    payload = ChatCompletionRequest(
+        model="parrot-chat-model",
+        messages=[{"role": "user", "content": "hello there"}],
+        stream=True,
+    )
+    response = await chat_completions(payload)
+    assert response.media_type == "text/event-stream"
+    frames = [frame async for frame in response.body_iterator]
+    assert frames[-1] == b"data: [DONE]\n\n"
+    assert all(frame.startswith(b"data: ") for frame in frames)
+
+
 @pytest.mark.asyncio
 async def test_embeddings(monkeypatch):
     model = STANDARD_REGISTRY.get("mock-embedding-model")
@@ -61,9 +78,33 @@ async def test_embeddings(monkeypatch):
         )
 
     monkeypatch.setattr(model, "get_response", fake_get_response)
+    response_cache.clear()
     req = EmbeddingRequest(model="mock-embedding-model", input="hello")
     resp = await embeddings(req)
-    assert resp.data[0].embedding == [1.0, 2.0, 3.0]
+    assert json.loads(resp.body)["data"][0]["embedding"] == [1.0, 2.0, 3.0]
+
+
+@pytest.mark.asyncio
+async def test_embeddings_are_served_from_cache(monkeypatch):
+    model = STANDARD_REGISTRY.get("mock-embedding-model")
+    calls = []
+    original = model.get_response
+
+    async def counting_get_response(data):
+        calls.append(data)
+        return await original(data)
+
+    monkeypatch.setattr(model, "get_response", counting_get_response)
+    response_cache.clear()
+    req = EmbeddingRequest(model="mock-embedding-model", input=["a", "b"])
+    first = await embeddings(req)
+    second = await embeddings(req)
+    assert first.body == second.body
+    assert len(calls) == 1
+
+    STANDARD_REGISTRY.register(model)
+    await embeddings(req)
+    assert len(calls) == 2
 
 
 @pytest.mark.asyncio
@@ -85,10 +126,19 @@ async def test_private_image_endpoint(monkeypatch):
             buf.write(b"dummy")
 
     monkeypatch.setattr(
-        sys.modules["mock_ai.app"],
+        sys.modules["mock_ai.models.text_to_image.standard_image"],
         "generate_noise_image_from_string",
         lambda *a, **k: DummyImage(),
     )
     img_id = utils.gen_image_id("10x10|PNG")
     response = await private(img_id, "png")
     assert response.media_type == "image/png"
+
+
+@pytest.mark.asyncio
+async def test_private_procedural_image():
+    img_id = utils.gen_image_id("16x8|PNG|procedural|hello")
+    response = await private(img_id, "png")
+    assert response.body.startswith(b"\x89PNG")
+    with pytest.raises(FileNotFound):
+        await private(utils.gen_image_id("16x8|PNG|sketch"), "png")
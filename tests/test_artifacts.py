@@ -0,0 +1,111 @@
+import base64
+
+from fastapi.testclient import TestClient
+
+from mock_ai import app as app_module
+from mock_ai.artifacts import etag_matches, parse_ranges
+from mock_ai.cache import ResponseCache
+from mock_ai.models.speech.standard_speech import StandardSpeechModel
+from mock_ai.models.standard_registry import STANDARD_REGISTRY
+from mock_ai.utils import gen_image_id
+
+
+def test_etag_matches():
+    assert etag_matches('"a"', '"a"')
+    assert etag_matches('"b", W/"a"', '"a"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"b"', '"a"')
+    assert not etag_matches(None, '"a"')
+
+
+def test_private_image_http_caching(monkeypatch):
+    cache = ResponseCache(1 << 20)
+    monkeypatch.setattr(app_module, "artifact_cache", cache)
+    encoded = []
+
+    def render_b64(id_: str, *args: object) -> str:
+        encoded.append(id_)
+        return base64.b64encode(b"png bytes").decode()
+
+    monkeypatch.setattr(app_module, "render_b64", render_b64)
+    client = TestClient(app_module.api_app)
+    url = f"/private/images/{gen_image_id('8x8|PNG')}.png"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.content == b"png bytes"
+    assert "immutable" in first.headers["cache-control"]
+    etag = first.headers["etag"]
+
+    assert client.get(url).content == b"png bytes"
+    assert len(encoded) == 1 and cache.hits == 1
+
+    not_modified = client.get(url, headers={"If-None-Match": f"W/{etag}"})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+
+def test_parse_ranges():
+    assert parse_ranges("bytes=0-9", 100) == [(0, 10)]
+    assert parse_ranges("bytes=90-", 100) == [(90, 100)]
+    assert parse_ranges("bytes=-5", 100) == [(95, 100)]
+    assert parse_ranges("bytes=0-9, 5-19, 50-150", 100) == [(0, 20), (50, 100)]
+    assert parse_ranges("bytes=100-", 100) == []
+    assert parse_ranges("bytes=9-0", 100) is None
+    assert parse_ranges("items=0-9", 100) is None
+
+
+def test_speech_range_requests(monkeypatch):
+    monkeypatch.setattr(app_module, "artifact_cache", ResponseCache(1 << 20))
+    client = TestClient(app_module.api_app)
+    payload = {"model": "mock-speech-model", "input": "hi", "voice": "alloy"}
+    full = client.post("/v1/audio/speech", json=payload)
+    assert full.status_code == 200
+    audio = full.content
+
+    partial = client.post(
+        "/v1/audio/speech", json=payload, headers={"Range": "bytes=10-19"}
+    )
+    assert partial.status_code == 206
+    assert partial.content == audio[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(audio)}"
+
+    multi = client.post(
+        "/v1/audio/speech", json=payload, headers={"Range": "bytes=0-1,-2"}
+    )
+    assert multi.status_code == 206
+    assert multi.headers["content-type"].startswith("multipart/byteranges")
+    assert audio[:2] in multi.content and audio[-2:] in multi.content
+
+    outside = client.post(
+        "/v1/audio/speech",
+        json=payload,
+        headers={"Range": f"bytes={len(audio)}-"},
+    )
+    assert outside.status_code == 416
+    assert outside.headers["content-range"] == f"bytes */{len(audio)}"
+
+    stale = client.post(
+        "/v1/audio/speech",
+        json=payload,
+        headers={"Range": "bytes=0-1", "If-Range": '"other"'},
+    )
+    assert stale.status_code == 200 and stale.content == audio
+
+
+def test_reregistered_speech_model_does_not_replay_old_audio():
+    client = TestClient(app_module.api_app)
+    payload = {"model": "test-speech-model", "input": "hi", "voice": "alloy"}
+    STANDARD_REGISTRY.register(StandardSpeechModel("test-speech-model"))
+    try:
+        first = client.post("/v1/audio/speech", json=payload)
+        assert first.status_code == 200
+        STANDARD_REGISTRY.register(
+            StandardSpeechModel("test-speech-model", amplitude=0.1)
+        )
+        second = client.post("/v1/audio/speech", json=payload)
+        assert second.content != first.content
+        assert second.headers["etag"] != first.headers["etag"]
+    finally:
+        STANDARD_REGISTRY.delete("test-speech-model")
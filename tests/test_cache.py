@@ -0,0 +1,55 @@
+from pydantic import BaseModel
+
+from mock_ai.cache import ResponseCache
+
+
+class Request(BaseModel):
+    model: str
+    options: dict
+
+
+def test_response_cache_key_is_canonical():
+    first = Request(model="m", options={"a": 1, "b": 2})
+    second = Request(model="m", options={"b": 2, "a": 1})
+    assert ResponseCache.key("m", first) == ResponseCache.key("m", second)
+    assert ResponseCache.key("m", first) != ResponseCache.key("n", first)
+
+
+def test_response_cache_lru_eviction_by_size():
+    cache = ResponseCache(max_bytes=10)
+    cache.put(("m", "a"), b"aaaa")
+    cache.put(("m", "b"), b"bbbb")
+    assert cache.get(("m", "a")) == b"aaaa"
+
+    cache.put(("m", "c"), b"cccc")
+    assert cache.get(("m", "b")) is None
+    assert cache.get(("m", "a")) == b"aaaa"
+    assert cache.size == 8
+
+    cache.put(("m", "d"), b"x" * 11)
+    assert cache.get(("m", "d")) is None
+    assert cache.stats() == {
+        "entries": 2,
+        "bytes": 8,
+        "max_bytes": 10,
+        "hits": 2,
+        "misses": 2,
+        "evictions": 1,
+    }
+
+
+def test_response_cache_invalidate_model():
+    cache = ResponseCache(max_bytes=100)
+    cache.put(("m", "a"), b"a")
+    cache.put(("n", "a"), b"b")
+    cache.invalidate("m")
+    assert cache.get(("m", "a")) is None
+    assert cache.get(("n", "a")) == b"b"
+    assert cache.size == 1
+
+
+def test_response_cache_disabled():
+    cache = ResponseCache(max_bytes=100, enabled=False)
+    cache.put(("m", "a"), b"a")
+    assert cache.get(("m", "a")) is None
+    assert len(cache) == 0
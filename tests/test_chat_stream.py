@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from mock_ai.models.chat.chat_stream import SSE_DONE, ChatCompletionStream
+from mock_ai.schemas.completion_response import Usage
+
+CONTENTS = ["plain", 'quo"te\\', "new\nline\t\x01", "àé 🚀 \u2028"]
+
+
+def _stream(usage: bool = True) -> ChatCompletionStream:
+    async def deltas():
+        for content in CONTENTS:
+            yield content
+        if usage:
+            yield Usage(prompt_tokens=3, completion_tokens=4)
+
+    return ChatCompletionStream("test-model", deltas())
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_stream_chunks():
+    stream = _stream()
+    chunks = [chunk async for chunk in stream]
+
+    assert [c.choices[0].delta.content for c in chunks[:-1]] == CONTENTS
+    assert chunks[-1].choices == []
+    assert chunks[-1].usage.total_tokens == 7
+    for chunk in chunks:
+        assert chunk.id == stream.id
+        assert chunk.created == stream.created
+        assert chunk.object == "chat.completion.chunk"
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_stream_sse_matches_schema():
+    stream = _stream()
+    frames = [frame async for frame in stream.sse()]
+
+    reference = _stream()
+    reference.id, reference.created = stream.id, stream.created
+    expected = [
+        f"data: {chunk.model_dump_json()}\n\n".encode()
+        async for chunk in reference
+    ]
+
+    assert frames[:-1] == expected
+    assert frames[-1] == SSE_DONE
+    payload = json.loads(frames[1].decode()[len("data: ") :])
+    assert payload["choices"][0]["delta"]["content"] == CONTENTS[1]
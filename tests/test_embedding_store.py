@@ -0,0 +1,104 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from typer.testing import CliRunner
+
+from mock_ai.__main__ import app as cli
+from mock_ai.embedding_store import EmbeddingStore
+from mock_ai.models.embedding.standard_embedding import StandardEmbeddingModel
+from mock_ai.models.standard_registry import STANDARD_REGISTRY
+from mock_ai.utils import normal_rows
+
+
+def test_embedding_store_round_trip_across_instances(tmp_path):
+    path = tmp_path / "store"
+    keys = [EmbeddingStore.key("m", 4, text) for text in ("a", "b")]
+    vectors = normal_rows(["a", "b"], 4)
+    store = EmbeddingStore(path, max_bytes=1 << 16, slots=64)
+    assert store.get_many(keys, 4) == [None, None]
+    assert store.put_many(keys, vectors) == 2
+    assert store.put_many(keys, vectors) == 0
+
+    other = EmbeddingStore(path, max_bytes=1 << 16, slots=64)
+    found = other.get_many([*keys, EmbeddingStore.key("m", 4, "c")], 4)
+    assert np.array_equal(found[0], vectors[0])
+    assert np.array_equal(found[1], vectors[1])
+    assert found[2] is None
+    assert other.get_many(keys, 8) == [None, None]
+    assert other.stats()["vectors"] == 2
+
+
+def test_embedding_store_size_cap(tmp_path):
+    store = EmbeddingStore(tmp_path / "store", max_bytes=512, slots=8)
+    texts = [str(i) for i in range(8)]
+    keys = [EmbeddingStore.key("m", 16, text) for text in texts]
+    # 64 byte vectors after a 232 byte header and index.
+    assert store.put_many(keys, normal_rows(texts, 16)) == 4
+    assert store.stats()["rejected"] == 4
+    assert store.stats()["used_bytes"] <= 512
+
+
+def test_standard_embedding_uses_store(tmp_path, monkeypatch):
+    store = EmbeddingStore(tmp_path / "store", max_bytes=1 << 20, slots=64)
+    monkeypatch.setattr(
+        "mock_ai.models.embedding.standard_embedding.embedding_store", store
+    )
+    model = StandardEmbeddingModel("test-key", dimensions=8)
+    first = model.embed(["a", "b"], 8)
+    assert store.stats()["vectors"] == 2
+    second = model.embed(["b", "c", "a"], 8)
+    assert store.hits == 2
+    assert np.array_equal(second, normal_rows(["b", "c", "a"], 8))
+    assert np.array_equal(first[0], second[2])
+
+
+def test_embedding_store_concurrent_threads(tmp_path):
+    store = EmbeddingStore(tmp_path / "store", max_bytes=1 << 22, slots=1 << 14)
+    batches = [[f"{thread}-{i}" for i in range(2000)] for thread in range(4)]
+
+    def put(texts: list[str]) -> int:
+        keys = [EmbeddingStore.key("m", 8, text) for text in texts]
+        return store.put_many(keys, normal_rows(texts, 8))
+
+    # Switch threads often so that unguarded inserts would interleave.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            assert sum(pool.map(put, batches)) == 8000
+    finally:
+        sys.setswitchinterval(interval)
+    assert store.stats()["vectors"] == 8000
+    for texts in batches:
+        keys = [EmbeddingStore.key("m", 8, text) for text in texts]
+        found = store.get_many(keys, 8)
+        assert np.array_equal(np.stack(found), normal_rows(texts, 8))
+
+
+def test_prewarmed_texts_are_store_hits(tmp_path, monkeypatch):
+    store = EmbeddingStore(tmp_path / "store", max_bytes=1 << 20, slots=64)
+    monkeypatch.setattr("mock_ai.embedding_store.embedding_store", store)
+    monkeypatch.setattr(
+        "mock_ai.models.embedding.standard_embedding.embedding_store", store
+    )
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text('"a"\n{"text": "b"}\n')
+    result = CliRunner().invoke(
+        cli,
+        [
+            "prewarm-embeddings",
+            str(corpus),
+            "--model",
+            "mock-embedding-model",
+            "--dimensions",
+            "8",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert store.stats()["vectors"] == 2
+
+    misses = store.misses
+    model = STANDARD_REGISTRY.get("mock-embedding-model")
+    model.encode(["a", "b"], 8, "float32", "float")
+    assert store.hits == 2 and store.misses == misses
@@ -0,0 +1,64 @@
+import asyncio
+import operator
+import threading
+import time
+
+import pytest
+
+from mock_ai.executor import OffloadExecutor
+
+
+@pytest.mark.asyncio
+async def test_executor_limits_concurrency_per_model():
+    executor = OffloadExecutor(max_workers=4, model_limit=1)
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work() -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    tasks = [
+        asyncio.create_task(executor.run("m", "image", work)) for _ in range(3)
+    ]
+    await asyncio.sleep(0.005)
+    stats = executor.stats()
+    assert stats["queued"] == 2 and stats["running"] == 1
+    await asyncio.gather(*tasks)
+    assert peak == 1
+    assert executor.stats()["models"]["m"]["completed"] == 3
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_keeps_event_loop_responsive():
+    executor = OffloadExecutor(max_workers=1)
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.001)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    await executor.run("m", "image", time.sleep, 0.05)
+    task.cancel()
+    assert ticks > 5
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_inline_and_process_workloads():
+    executor = OffloadExecutor(
+        workloads={"speech": "inline", "ocr": "process"}, max_workers=1
+    )
+    assert await executor.run("m", "speech", operator.add, 1, 2) == 3
+    assert await executor.run("m", "ocr", operator.mul, 6, 7) == 42
+    assert executor.stats()["completed"] == 1
+    executor.shutdown()
@@ -0,0 +1,162 @@
+import json
+import re
+
+import numpy as np
+
+from mock_ai.models.chat import json_schema
+from mock_ai.models.chat.json_schema import json_deltas, schema_generator
+
+SCHEMA = {
+    "name": "order",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string", "format": "uuid"},
+            "status": {"enum": ["open", "closed"]},
+            "kind": {"const": "order"},
+            "created": {"type": "string", "format": "date-time"},
+            "quantity": {"type": "integer", "minimum": 5, "maximum": 7},
+            "note": {"type": ["string", "null"]},
+            "items": {
+                "type": "array",
+                "items": {"$ref": "#/$defs/item"},
+                "minItems": 2,
+                "maxItems": 3,
+            },
+            "customer": {"anyOf": [{"$ref": "#/$defs/item"}, {"type": "null"}]},
+        },
+        "required": ["id", "status", "kind", "created", "quantity", "items"],
+        "$defs": {
+            "item": {
+                "type": "object",
+                "properties": {"sku": {"type": "string", "minLength": 3}},
+                "required": ["sku"],
+            }
+        },
+    },
+}
+
+
+def test_schema_generator_honors_keywords():
+    generate = schema_generator(SCHEMA)
+    for seed in range(20):
+        data = generate(np.random.default_rng(seed))
+        assert {"id", "status", "kind", "created", "quantity", "items"} <= set(
+            data
+        )
+        assert re.fullmatch(r"[0-9a-f-]{36}", data["id"])
+        assert data["status"] in ("open", "closed")
+        assert data["kind"] == "order"
+        assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ", data["created"])
+        assert 5 <= data["quantity"] <= 7
+        assert data.get("note") is None or isinstance(data["note"], str)
+        assert 2 <= len(data["items"]) <= 3
+        assert all(len(item["sku"]) >= 3 for item in data["items"])
+        customer = data.get("customer")
+        assert customer is None or isinstance(customer["sku"], str)
+
+
+def test_schema_generator_is_cached_and_deterministic():
+    generate = schema_generator(SCHEMA)
+    cached = len(json_schema._cache)
+    schema_generator(dict(SCHEMA))
+    assert len(json_schema._cache) == cached
+    assert generate(np.random.default_rng(1)) == generate(
+        np.random.default_rng(1)
+    )
+
+
+def test_schema_generator_terminates_on_recursive_schema():
+    tree = {
+        "type": "object",
+        "properties": {
+            "children": {"type": "array", "items": {"$ref": "#"}},
+        },
+    }
+    data = schema_generator(tree)(np.random.default_rng(0))
+    depth = 0
+    while data["children"]:
+        data = data["children"][0]
+        depth += 1
+    assert depth <= 8
+
+
+def test_json_deltas_close_document_within_budget():
+    response_format = {
+        "type": "json_schema",
+        "json_schema": {
+            "schema": {
+                "type": "array",
+                "items": SCHEMA["schema"]["$defs"]["item"],
+                "minItems": 1,
+                "maxItems": 100_000,
+            }
+        },
+    }
+    deltas = list(json_deltas(response_format, np.random.default_rng(0), 50, 3))
+    data = json.loads("".join(delta for delta, _ in deltas))
+    assert 1 <= len(data) < 100
+    assert all(tokens >= 3 for _, tokens in deltas[:-1])
+    assert sum(tokens for _, tokens in deltas) < 50 + 20
+
+
+def test_json_deltas_are_lazy():
+    response_format = {
+        "type": "json_schema",
+        "json_schema": {
+            "type": "array",
+            "items": {"type": "integer"},
+            "minItems": 10**9,
+        },
+    }
+    deltas = json_deltas(
+        response_format, np.random.default_rng(0), float("inf"), 3
+    )
+    delta, _ = next(deltas)
+    assert delta.startswith("[")
+
+
+def test_schema_generator_honors_exclusive_bounds():
+    rng = np.random.default_rng(0)
+    cases = [
+        ({"type": "integer", "exclusiveMinimum": 0.5, "maximum": 1}, {1}),
+        ({"type": "integer", "minimum": 1, "exclusiveMaximum": 3.5}, {1, 2, 3}),
+        # Draft 4 boolean flags.
+        (
+            {
+                "type": "integer",
+                "minimum": 0,
+                "maximum": 2,
+                "exclusiveMinimum": True,
+                "exclusiveMaximum": True,
+            },
+            {1},
+        ),
+        # Nothing satisfies an empty range; the lower bound is emitted.
+        ({"type": "integer", "exclusiveMinimum": 1, "maximum": 1}, {2}),
+    ]
+    for schema, values in cases:
+        generate = schema_generator(schema)
+        assert {generate(rng) for _ in range(50)} == values
+
+    generate = schema_generator(
+        {"type": "number", "minimum": 0, "maximum": 1e-300}
+        | {"exclusiveMinimum": True, "exclusiveMaximum": True}
+    )
+    assert all(0 < generate(rng) < 1e-300 for _ in range(50))
+
+
+def test_schema_generator_emits_null_for_empty_choices():
+    rng = np.random.default_rng(0)
+    for schema in (
+        {"enum": []},
+        {"anyOf": []},
+        {"oneOf": []},
+        {"type": []},
+    ):
+        assert schema_generator(schema)(rng) is None
+    generate = schema_generator(
+        {"type": "object", "properties": {"a": {"enum": []}}, "required": ["a"]}
+    )
+    assert generate(rng) == {"a": None}
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from mock_ai.latency import (
+    FixedDelay,
+    HistogramDelay,
+    LatencyProfile,
+    LogNormalDelay,
+    UniformDelay,
+)
+from mock_ai.models.chat.standard_chat import StandardChatModel
+from mock_ai.models.model_registry import ModelRegistry
+from mock_ai.settings import LatencySettings, latency_settings
+
+
+def test_distributions_sample_within_bounds():
+    rng = np.random.default_rng(0)
+    assert (FixedDelay(value=0.5).sample(rng, 4) == 0.5).all()
+
+    uniform = UniformDelay(low=0.1, high=0.2).sample(rng, 1000)
+    assert uniform.min() >= 0.1 and uniform.max() <= 0.2
+
+    lognormal = LogNormalDelay(median=0.05, sigma=0.5).sample(rng, 10000)
+    assert np.median(lognormal) == pytest.approx(0.05, rel=0.1)
+
+    histogram = HistogramDelay(edges=[0, 1, 2], weights=[0, 1]).sample(
+        rng, 1000
+    )
+    assert histogram.min() >= 1 and histogram.max() <= 2
+
+
+def test_histogram_validation():
+    with pytest.raises(ValidationError):
+        HistogramDelay(edges=[0, 1], weights=[1, 1])
+
+
+def test_sampler_ttft_spikes_and_rate_cap():
+    profile = LatencyProfile(
+        ttft=1.0,
+        prefill_per_token=0.01,
+        inter_chunk=FixedDelay(value=0.01),
+        spike_probability=1.0,
+        spike=FixedDelay(value=0.5),
+        max_tokens_per_second=10,
+    )
+    delays = profile.sampler(
+        np.random.default_rng(0), tokens_per_chunk=10, prompt_tokens=100
+    )
+    values = [next(delays) for _ in range(100)]
+    assert values[0] == pytest.approx(2.0 + 1.0)
+    assert values[1:] == [pytest.approx(1.0)] * 99
+
+
+def test_profiles_from_settings(monkeypatch):
+    monkeypatch.setenv(
+        "LATENCY_PROFILES",
+        '{"fast": {"ttft": 0.3, "inter_chunk": '
+        '{"kind": "lognormal", "median": 0.02, "sigma": 0.4}}}',
+    )
+    profiles = LatencySettings().profiles
+    assert profiles["fast"].ttft == 0.3
+    assert isinstance(profiles["fast"].inter_chunk, LogNormalDelay)
+
+    monkeypatch.setattr(latency_settings, "profiles", profiles)
+    registry = ModelRegistry()
+    model = registry.register(StandardChatModel("fast"))
+    assert model.latency_profile is profiles["fast"]
+    assert model.model_info.latency_profile == profiles["fast"]
+
+
+def test_standard_chat_default_profile():
+    model = StandardChatModel("test", batch_per_second=4)
+    assert model.latency_profile.inter_chunk == FixedDelay(value=0.25)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from mock_ai.models.text_to_image import standard_image as sim
+from mock_ai.noise_atlas import NoiseAtlas
+
+
+def test_noise_atlas_is_shared_through_its_file(tmp_path):
+    path = tmp_path / "atlas"
+    atlas = NoiseAtlas(path, size=64)
+    img = np.asarray(atlas.render("key", 100, 80))
+    assert img.shape == (80, 100, 3)
+    assert path.stat().st_size == NoiseAtlas.HEADER.size + 64 * 64 * 3
+
+    # Another worker maps the same texture and cuts out the same image.
+    other = NoiseAtlas(path, size=64)
+    assert np.array_equal(img, np.asarray(other.render("key", 100, 80)))
+    assert not np.array_equal(img, np.asarray(other.render("other", 100, 80)))
+    # Columns wrap around the edge of the texture.
+    assert np.array_equal(img[:, :36], img[:, 64:])
+
+    # A texture of another size is rebuilt instead of misread.
+    resized = NoiseAtlas(path, size=32)
+    assert resized.render("key", 8, 8).size == (8, 8)
+    assert path.stat().st_size == NoiseAtlas.HEADER.size + 32 * 32 * 3
+
+
+def test_standard_image_renders_from_atlas(monkeypatch):
+    atlas = NoiseAtlas(None, size=32)
+    monkeypatch.setattr(sim, "noise_atlas", atlas)
+    assert sim.render_b64("key", 16, 16, "PNG") == sim.render_b64(
+        "key", 16, 16, "PNG"
+    )
+    assert atlas.stats()["loaded"]
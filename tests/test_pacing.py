@@ -0,0 +1,77 @@
+import asyncio
+import gc
+import weakref
+
+import pytest
+
+from mock_ai.pacing import Pacer, _schedulers, tick_scheduler
+from mock_ai.settings import pacing_settings
+
+
+@pytest.mark.asyncio
+async def test_tick_scheduler_batches_waiters():
+    scheduler = tick_scheduler()
+    assert tick_scheduler() is scheduler
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + 0.02
+    futures = [scheduler.wait_until(deadline) for _ in range(100)]
+    assert len(scheduler._buckets) == 1
+
+    await asyncio.gather(*futures)
+    assert loop.time() >= deadline
+    assert not scheduler._buckets
+    assert scheduler._timer is None
+
+
+@pytest.mark.asyncio
+async def test_tick_scheduler_cancelled_waiter():
+    scheduler = tick_scheduler()
+    loop = asyncio.get_running_loop()
+    cancelled = scheduler.wait_until(loop.time() + 0.01)
+    kept = scheduler.wait_until(loop.time() + 0.02)
+    cancelled.cancel()
+
+    await kept
+    assert cancelled.cancelled()
+    assert not scheduler._buckets
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_scheduler", [True, False])
+async def test_pacer_does_not_drift(monkeypatch, use_scheduler):
+    monkeypatch.setattr(pacing_settings, "use_scheduler", use_scheduler)
+    pacer = Pacer()
+    start = pacer.deadline
+    for _ in range(5):
+        await pacer.wait(0.01)
+    assert pacer.deadline == pytest.approx(start + 0.05)
+    assert pacer.loop.time() >= start + 0.05
+
+    # A pacer that fell behind catches up without waiting.
+    pacer.deadline -= 1
+    before = pacer.loop.time()
+    await pacer.wait(0.01)
+    assert pacer.loop.time() - before < 0.01
+
+
+def test_tick_scheduler_does_not_keep_its_loop_alive():
+    async def wait():
+        scheduler = tick_scheduler()
+        loop = asyncio.get_running_loop()
+        await scheduler.wait_until(loop.time() + 0.01)
+        # A cancelled waiter leaves the timer pending when the loop closes.
+        deadline = loop.time() + 10
+        future = scheduler.wait_until(deadline)
+        future.cancel()
+        scheduler.discard(future, deadline)
+        assert scheduler._timer is not None
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(wait())
+    assert loop in _schedulers
+    loop.close()
+    collected = weakref.ref(loop)
+    del loop
+    gc.collect()
+    assert collected() is None
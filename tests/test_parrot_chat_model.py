@@ -2,8 +2,14 @@ import asyncio
 
 import pytest
 
+from mock_ai.app import chat_completions
 from mock_ai.models.chat.parrot_chat import ParrotChatModel
-from mock_ai.schemas.chat_completion_request import ModelSettings
+from mock_ai.schemas.chat_completion_request import (
+    ChatCompletionRequest,
+    ModelSettings,
+)
+from mock_ai.settings import stream_settings
+from mock_ai.streaming import ChatStreamingResponse
 
 
 @pytest.mark.asyncio
@@ -22,3 +28,19 @@ async def test_parrot_chat_stream():
 
     content = "".join([c.choices[0].delta.content or "" async for c in chunks])
     assert content == "hola"
+
+
+@pytest.mark.asyncio
+async def test_parrot_chat_stream_is_not_coalesced(monkeypatch):
+    monkeypatch.setattr(stream_settings, "flush_interval", 0.05)
+    messages = [{"role": "user", "content": "hola"}]
+    intervals = {}
+    for model in ("parrot-chat-model", "mock-chat-model"):
+        request = ChatCompletionRequest(
+            model=model, messages=messages, stream=True
+        )
+        response = await chat_completions(request)
+        assert isinstance(response, ChatStreamingResponse)
+        intervals[model] = response.flush_interval
+        await response.frames.aclose()
+    assert intervals == {"parrot-chat-model": 0, "mock-chat-model": 0.05}
@@ -0,0 +1,114 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from mock_ai import app as app_module
+from mock_ai.cache import response_cache
+from mock_ai.models.chat.parrot_chat import ParrotChatModel
+from mock_ai.prefix_cache import PrefixCache, prefix_cache
+from mock_ai.schemas import ModelSettings
+from mock_ai.tokenizer import token_counter
+
+SYSTEM = {"role": "system", "content": "You are a helpful assistant." * 10}
+FIRST = {"role": "user", "content": "What is the capital of France?"}
+REPLY = {"role": "assistant", "content": "Paris."}
+SECOND = {"role": "user", "content": "And of Italy?"}
+
+
+def test_prefix_cache_matches_longest_prefix():
+    cache = PrefixCache(max_nodes=100)
+    assert cache.match("m", [SYSTEM, FIRST]) == 0
+    assert cache.match("m", [SYSTEM, FIRST, REPLY, SECOND]) == (
+        token_counter.count_message(SYSTEM) + token_counter.count_message(FIRST)
+    )
+    # Diverging after the system prompt splits the stored edge.
+    assert cache.match("m", [SYSTEM, SECOND]) == token_counter.count_message(
+        SYSTEM
+    )
+    assert cache.match("other", [SYSTEM, FIRST]) == 0
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_prefix_cache_evicts_least_recently_used_leaf():
+    cache = PrefixCache(max_nodes=3)
+    cache.match("m", [SYSTEM, FIRST])
+    cache.match("m", [SYSTEM, SECOND])
+    assert len(cache) == 3
+    cache.match("m", [SYSTEM, FIRST])
+
+    cache.match("n", [REPLY])
+    assert len(cache) == 3
+    assert cache.evictions == 1
+    assert cache.match("m", [SYSTEM, FIRST]) > token_counter.count_message(
+        SYSTEM
+    )
+    assert cache.match("m", [SYSTEM, SECOND]) == token_counter.count_message(
+        SYSTEM
+    )
+
+
+@pytest.mark.asyncio
+async def test_chat_usage_reports_cached_tokens(monkeypatch):
+    monkeypatch.setattr(prefix_cache, "enabled", True)
+    prefix_cache.clear()
+    model = ParrotChatModel()
+    first = await model.get_response(
+        ModelSettings(model=model.key, messages=[SYSTEM, FIRST]), stream=False
+    )
+    second = await model.get_response(
+        ModelSettings(model=model.key, messages=[SYSTEM, FIRST, REPLY, SECOND]),
+        stream=False,
+    )
+    assert first.usage.prompt_tokens_details.cached_tokens == 0
+    cached = second.usage.prompt_tokens_details.cached_tokens
+    assert 0 < cached < second.usage.prompt_tokens
+
+
+def test_response_cache_replays_report_cached_tokens(monkeypatch):
+    monkeypatch.setattr(prefix_cache, "enabled", True)
+    monkeypatch.setattr(response_cache, "enabled", True)
+    prefix_cache.clear()
+    response_cache.clear()
+    client = TestClient(app_module.api_app)
+    payload = {"model": "parrot-chat-model", "messages": [SYSTEM, FIRST]}
+    response_hits = response_cache.stats()["hits"]
+    prefix_hits = prefix_cache.stats()["hits"]
+
+    first = client.post("/v1/chat/completions", json=payload).json()
+    second = client.post("/v1/chat/completions", json=payload).json()
+    assert first["usage"]["prompt_tokens_details"]["cached_tokens"] == 0
+    assert second["choices"] == first["choices"]
+    assert response_cache.stats()["hits"] == response_hits + 1
+    usage = second["usage"]
+    assert usage["prompt_tokens_details"]["cached_tokens"] == (
+        usage["prompt_tokens"] - token_counter.TOKENS_PER_REPLY
+    )
+    assert prefix_cache.stats()["hits"] == prefix_hits + 1
+
+
+def test_response_cache_replays_get_new_ids(monkeypatch):
+    monkeypatch.setattr(response_cache, "enabled", True)
+    response_cache.clear()
+    client = TestClient(app_module.api_app)
+    payload = {"model": "parrot-chat-model", "messages": [SYSTEM, FIRST]}
+
+    first = client.post("/v1/chat/completions", json=payload).json()
+    second = client.post("/v1/chat/completions", json=payload).json()
+    third = client.post("/v1/chat/completions", json=payload).json()
+    assert second["choices"] == third["choices"] == first["choices"]
+    assert len({first["id"], second["id"], third["id"]}) == 3
+    assert second["created"] >= first["created"]
+
+
+def test_chat_replay_template_cuts_only_top_level_fields():
+    body = (
+        b'{"id":"chatcmpl-1","created":5,"choices":[{"message":'
+        b'{"content":"\\"id\\":\\"x\\"","tool_calls":[{"id":"call_1"}]}}],'
+        b'"usage":{"prompt_tokens_details":{"cached_tokens":7}}}'
+    )
+    template = app_module.ChatReplay.template(body)
+    assert template == (
+        b'{"id":\x00i,"created":\x00t,"choices":[{"message":'
+        b'{"content":"\\"id\\":\\"x\\"","tool_calls":[{"id":"call_1"}]}}],'
+        b'"usage":{"prompt_tokens_details":{"cached_tokens":\x00c}}}'
+    )
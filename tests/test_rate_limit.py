@@ -0,0 +1,147 @@
+from fastapi.testclient import TestClient
+
+from mock_ai import app as app_module
+from mock_ai.rate_limit import RateLimit, RateLimiter, SharedBuckets
+
+
+def test_rate_limiter_request_bucket_refills():
+    limiter = RateLimiter(RateLimit(requests_per_minute=2))
+    assert limiter.acquire("t", "m", 0, now=0).allowed
+    assert limiter.acquire("t", "m", 0, now=0).allowed
+
+    status = limiter.acquire("t", "m", 0, now=0)
+    assert not status.allowed
+    assert status.retry_after == 30
+    assert status.headers()["retry-after"] == "30"
+    # Another caller or model has its own budget.
+    assert limiter.acquire("other", "m", 0, now=0).allowed
+    assert limiter.acquire("t", "n", 0, now=0).allowed
+
+    assert limiter.acquire("t", "m", 0, now=30).allowed
+    assert limiter.stats() == {"allowed": 5, "rejected": 1}
+
+
+def test_rate_limiter_rejected_requests_are_not_charged():
+    limiter = RateLimiter(
+        RateLimit(tokens_per_minute=100),
+        models={"big": RateLimit(tokens_per_minute=1000)},
+    )
+    status = limiter.acquire("t", "m", 80, now=0)
+    assert status.allowed
+    assert status.headers()["x-ratelimit-remaining-tokens"] == "20"
+    assert "x-ratelimit-limit-requests" not in status.headers()
+
+    assert not limiter.acquire("t", "m", 30, now=0).allowed
+    assert limiter.acquire("t", "m", 20, now=0).allowed
+    assert limiter.acquire("t", "big", 800, now=0).allowed
+
+
+def test_rate_limiter_rejects_requests_larger_than_the_bucket():
+    limiter = RateLimiter(RateLimit(tokens_per_minute=100))
+    status = limiter.acquire("t", "m", 101, now=0)
+    assert status.too_large and not status.allowed
+    assert "retry-after" not in status.headers()
+    # The bucket was not charged.
+    assert limiter.acquire("t", "m", 100, now=0).allowed
+    assert limiter.stats() == {"allowed": 1, "rejected": 1}
+
+
+def test_shared_buckets_are_shared_between_limiters(tmp_path):
+    path = tmp_path / "buckets"
+    limit = RateLimit(requests_per_minute=3)
+    first = RateLimiter(limit, buckets=SharedBuckets(path, slots=8))
+    second = RateLimiter(limit, buckets=SharedBuckets(path, slots=8))
+
+    assert first.acquire("t", "m", 0, now=100).allowed
+    assert second.acquire("t", "m", 0, now=100).allowed
+    status = first.acquire("t", "m", 0, now=100)
+    assert status.remaining_requests == 0
+    assert not second.acquire("t", "m", 0, now=100).allowed
+    assert second.acquire("t", "m", 0, now=120).allowed
+
+
+def test_shared_buckets_evict_the_least_recently_updated(tmp_path):
+    limiter = RateLimiter(
+        RateLimit(requests_per_minute=1),
+        buckets=SharedBuckets(tmp_path / "buckets", slots=2),
+    )
+
+    def caller(prefix: str, home: int) -> str:
+        # A caller whose bucket hashes to the ``home`` slot.
+        return next(
+            name
+            for name in (f"{prefix}{i}" for i in range(100))
+            if RateLimiter.key(name, "m") % 2 == home
+        )
+
+    old, recent, new = caller("old", 0), caller("recent", 1), caller("new", 1)
+    assert limiter.acquire(old, "m", 0, now=100).allowed
+    assert limiter.acquire(recent, "m", 0, now=110).allowed
+    # The table is full and no bucket is stale: the oldest one is evicted,
+    # not the one in the home slot of the new caller.
+    assert limiter.acquire(new, "m", 0, now=120).allowed
+    assert not limiter.acquire(recent, "m", 0, now=120).allowed
+    assert not limiter.acquire(new, "m", 0, now=120).allowed
+
+
+def test_chat_completions_rate_limited(monkeypatch):
+    monkeypatch.setattr(
+        app_module,
+        "rate_limiter",
+        RateLimiter(RateLimit(requests_per_minute=1, tokens_per_minute=500)),
+    )
+    client = TestClient(app_module.api_app)
+    payload = {
+        "model": "parrot-chat-model",
+        "messages": [{"role": "user", "content": "hi"}],
+    }
+    response = client.post("/v1/chat/completions", json=payload)
+    assert response.status_code == 200
+    assert response.headers["x-ratelimit-limit-requests"] == "1"
+    assert response.headers["x-ratelimit-remaining-requests"] == "0"
+    assert response.headers["x-ratelimit-limit-tokens"] == "500"
+
+    response = client.post("/v1/chat/completions", json=payload)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+    assert response.headers["x-ratelimit-remaining-requests"] == "0"
+
+
+def test_rate_limited_malformed_body_is_a_validation_error(monkeypatch):
+    monkeypatch.setattr(
+        app_module,
+        "rate_limiter",
+        RateLimiter(RateLimit(requests_per_minute=10, tokens_per_minute=500)),
+    )
+    client = TestClient(app_module.api_app)
+    for payload in (
+        {"model": "parrot-chat-model", "messages": ["hi"]},
+        {"model": "parrot-chat-model", "messages": "hi"},
+        {"model": "parrot-chat-model"},
+    ):
+        response = client.post("/v1/chat/completions", json=payload)
+        assert response.status_code == 422
+    response = client.post(
+        "/v1/chat/completions",
+        content=b"{not json",
+        headers={"content-type": "application/json"},
+    )
+    assert response.status_code == 422
+
+
+def test_chat_completions_request_too_large(monkeypatch):
+    monkeypatch.setattr(
+        app_module,
+        "rate_limiter",
+        RateLimiter(RateLimit(tokens_per_minute=10)),
+    )
+    client = TestClient(app_module.api_app)
+    payload = {
+        "model": "parrot-chat-model",
+        "messages": [{"role": "user", "content": "hi"}],
+        "max_tokens": 100,
+    }
+    response = client.post("/v1/chat/completions", json=payload)
+    assert response.status_code == 413
+    assert "retry-after" not in response.headers
+    assert "Request too large" in response.json()["detail"]
@@ -23,8 +23,8 @@ async def test_standard_chat_non_stream():
     resp = await model.get_response(settings, False)
     content = resp.choices[0].message.content
     assert _count_tokens(content) <= 7
-    assert resp.usage.prompt_tokens == 1
-    assert resp.usage.completion_tokens == 1
+    assert resp.usage.prompt_tokens > 0
+    assert resp.usage.completion_tokens == _count_tokens(content)
 
 
 @pytest.mark.asyncio
@@ -34,9 +34,7 @@ async def test_standard_chat_stream(monkeypatch):
         messages=[{"role": "user", "content": "hello"}],
         stream_options={"include_usage": True},
     )
-    monkeypatch.setattr(
-        "mock_ai.models.chat.standard_chat.asyncio.sleep", async_noop
-    )
+    monkeypatch.setattr("mock_ai.pacing.Pacer.wait", async_noop)
     chunks = []
     async for chunk in await model.get_response(settings, True):
         chunks.append(chunk)
@@ -78,9 +76,7 @@ async def test_standard_chat_json_schema_stream(monkeypatch):
         response_format={"type": "json_schema", "json_schema": schema},
         stream_options={"include_usage": True},
     )
-    monkeypatch.setattr(
-        "mock_ai.models.chat.standard_chat.asyncio.sleep", async_noop
-    )
+    monkeypatch.setattr("mock_ai.pacing.Pacer.wait", async_noop)
     chunks = []
     async for chunk in await model.get_response(settings, True):
         chunks.append(chunk)
@@ -90,3 +86,81 @@ async def test_standard_chat_json_schema_stream(monkeypatch):
     data = json.loads(content)
     assert set(data.keys()) == {"name", "age"}
     assert chunks[-1].usage is not None
+
+
+@pytest.mark.asyncio
+async def test_standard_chat_is_deterministic(monkeypatch):
+    monkeypatch.setattr("mock_ai.pacing.Pacer.wait", async_noop)
+    model = StandardChatModel("test", completions_tokens_limit=50)
+    messages = [{"role": "user", "content": "hello"}]
+
+    async def stream_content(settings: ModelSettings) -> str:
+        stream = await model.get_response(settings, True)
+        return "".join([c.choices[0].delta.content async for c in stream])
+
+    first = await model.get_response(ModelSettings(messages=messages), False)
+    second = await model.get_response(ModelSettings(messages=messages), False)
+    assert first.choices[0].message == second.choices[0].message
+
+    seeded = ModelSettings(messages=messages, seed=42)
+    assert await stream_content(seeded) == await stream_content(seeded)
+    assert await stream_content(seeded) != await stream_content(
+        ModelSettings(messages=messages, seed=43)
+    )
+
+
+@pytest.mark.asyncio
+async def test_standard_chat_json_schema_is_deterministic():
+    model = StandardChatModel("test")
+    schema = {
+        "type": "object",
+        "properties": {"name": {"type": "string"}, "n": {"type": "number"}},
+    }
+    settings = ModelSettings(
+        messages=[{"role": "user", "content": "hi"}],
+        response_format={"type": "json_schema", "json_schema": schema},
+        seed=-1,
+    )
+    first = await model.get_response(settings, False)
+    second = await model.get_response(settings, False)
+    assert first.choices[0].message == second.choices[0].message
+
+
+@pytest.mark.asyncio
+async def test_standard_chat_n_choices():
+    model = StandardChatModel("test", completions_tokens_limit=20)
+    settings = ModelSettings(
+        messages=[{"role": "user", "content": "hello"}], n=3
+    )
+    resp = await model.get_response(settings, False)
+    assert [choice.index for choice in resp.choices] == [0, 1, 2]
+    contents = [choice.message.content for choice in resp.choices]
+    assert len(set(contents)) == 3
+    assert resp.usage.completion_tokens == sum(map(_count_tokens, contents))
+
+
+@pytest.mark.asyncio
+async def test_standard_chat_n_choices_stream_interleaved(monkeypatch):
+    monkeypatch.setattr("mock_ai.pacing.Pacer.wait", async_noop)
+    model = StandardChatModel("test", completions_tokens_limit=25)
+    schema = {"type": "object", "properties": {"a": {"type": "string"}}}
+    for response_format in (
+        None,
+        {"type": "json_schema", "json_schema": schema},
+    ):
+        settings = ModelSettings(
+            messages=[{"role": "user", "content": "hello"}],
+            response_format=response_format,
+            stream_options={"include_usage": True},
+            n=2,
+        )
+        chunks = [c async for c in await model.get_response(settings, True)]
+        indexes = [c.choices[0].index for c in chunks if c.choices]
+        assert indexes[:2] == [0, 1] and set(indexes) == {0, 1}
+        contents = ["", ""]
+        for chunk in chunks:
+            for choice in chunk.choices:
+                contents[choice.index] += choice.delta.content or ""
+        if response_format:
+            assert all(json.loads(content) for content in contents)
+        assert chunks[-1].usage.completion_tokens > 0
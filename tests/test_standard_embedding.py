@@ -1,7 +1,12 @@
 import asyncio
+import base64
 
+import numpy as np
 import pytest
 
+from mock_ai.models.embedding.similarity_embedding import (
+    SimilarityEmbeddingModel,
+)
 from mock_ai.models.embedding.standard_embedding import StandardEmbeddingModel
 from mock_ai.schemas.embedding_request import EmbeddingRequest
 
@@ -26,3 +31,78 @@ async def test_standard_embedding_list_and_dimensions_override():
     for i, obj in enumerate(resp.data):
         assert obj.index == i
         assert len(obj.embedding) == 5
+
+
+@pytest.mark.asyncio
+async def test_standard_embedding_base64_matches_float():
+    model = StandardEmbeddingModel("test-key", dimensions=8)
+    floats = await model.get_response(
+        EmbeddingRequest(input=["a", "b"], model="test")
+    )
+    encoded = await model.get_response(
+        EmbeddingRequest(
+            input=["a", "b"], model="test", encoding_format="base64"
+        )
+    )
+    for float_obj, b64_obj in zip(floats.data, encoded.data, strict=True):
+        vector = np.frombuffer(base64.b64decode(b64_obj.embedding), "<f4")
+        assert vector.tolist() == float_obj.embedding
+    assert '"embedding":"' in encoded.model_dump_json()
+
+
+def test_similarity_embedding_preserves_similarity():
+    model = SimilarityEmbeddingModel("test-key", dimensions=64)
+    texts = [
+        "the quick brown fox jumps over the lazy dog",
+        "the quick brown fox jumped over the lazy dog",
+        "stock markets fell sharply on monday",
+        "",
+    ]
+    rows = model.generate(texts, 64)
+    np.testing.assert_allclose(np.linalg.norm(rows, axis=1), 1, rtol=1e-5)
+    similarity = rows @ rows.T
+    assert similarity[0, 1] > 0.8
+    assert similarity[0, 1] > similarity[0, 2] + 0.5
+    np.testing.assert_allclose(
+        model.generate(texts[1:2], 64)[0], rows[1], atol=1e-6
+    )
+
+
+@pytest.mark.asyncio
+async def test_standard_embedding_precisions():
+    model = StandardEmbeddingModel("test-key", dimensions=16)
+    full = await model.get_response(EmbeddingRequest(input="a", model="test"))
+    vector = np.array(full.data[0].embedding)
+
+    def request(**kwargs):
+        return model.get_response(
+            EmbeddingRequest(input="a", model="test", **kwargs)
+        )
+
+    half = await request(precision="float16", encoding_format="base64")
+    decoded = np.frombuffer(base64.b64decode(half.data[0].embedding), "<f2")
+    np.testing.assert_allclose(decoded, vector, atol=1e-3)
+
+    int8 = (await request(precision="int8")).data[0]
+    assert max(map(abs, int8.embedding)) == 127
+    np.testing.assert_allclose(
+        np.array(int8.embedding) * int8.scale, vector, atol=int8.scale
+    )
+    assert '"scale"' not in full.model_dump_json()
+
+    binary = (await request(precision="binary")).data[0].embedding
+    assert len(binary) == 2
+    assert np.array_equal(np.unpackbits(np.uint8(binary)), vector > 0)
+
+
+@pytest.mark.asyncio
+async def test_standard_embedding_dimensions_slice_full_vector():
+    model = StandardEmbeddingModel("test-key", dimensions=16)
+    full = await model.get_response(EmbeddingRequest(input="a", model="test"))
+    short = await model.get_response(
+        EmbeddingRequest(input="a", model="test", dimensions=4)
+    )
+    prefix = np.array(full.data[0].embedding[:4])
+    np.testing.assert_allclose(
+        short.data[0].embedding, prefix / np.linalg.norm(prefix), rtol=1e-6
+    )
@@ -5,7 +5,11 @@ import pytest
 import mock_ai.models.text_to_image.standard_image as sim
 from mock_ai.models.text_to_image.standard_image import StandardImageModel
 from mock_ai.schemas.image_request import ImageRequest
-from mock_ai.utils import check_image_id, parse_dimensions
+from mock_ai.utils import (
+    check_image_id,
+    get_data_from_image_id,
+    parse_dimensions,
+)
 
 
 @pytest.mark.asyncio
@@ -61,3 +65,25 @@ async def test_standard_image_invalid_format():
     req = ImageRequest(prompt="foo", model="bar")
     with pytest.raises(ValueError):
         await model.get_response(req, "invalid")
+
+
+@pytest.mark.asyncio
+async def test_procedural_image_style(monkeypatch):
+    def fake_b64(img, format: str) -> str:
+        assert img.size == (64, 32) and img.mode == "RGB"
+        return img.tobytes().hex()
+
+    monkeypatch.setattr(sim, "img_to_b64", fake_b64)
+    model = StandardImageModel("test", style="procedural", prompt_text=True)
+    req = ImageRequest(
+        prompt="a fox", model="test", n=2, size="64x32", output_format="png"
+    )
+    resp = await model.get_response(req, "b64_json")
+    first, second = (item.b64_json for item in resp.data)
+    assert first != second
+    again = await model.get_response(req, "b64_json")
+    assert again.data[0].b64_json == first
+
+    resp = await model.get_response(req, "url")
+    image_id = resp.data[0].url[len("private/images/") :].split(".")[0]
+    assert get_data_from_image_id(image_id) == "64x32|png|procedural|a fox"
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from mock_ai.models.chat.chat_stream import ChatCompletionStream
+from mock_ai.pacing import Pacer, tick_scheduler
+from mock_ai.streaming import ChatStreamingResponse, stream_stats
+
+
+def _endless_stream(closed: asyncio.Event) -> ChatCompletionStream:
+    async def deltas():
+        pacer = Pacer()
+        try:
+            while True:
+                await pacer.wait(0.01)
+                yield "hello"
+        finally:
+            closed.set()
+
+    return ChatCompletionStream("m", deltas())
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_stream():
+    closed = asyncio.Event()
+    sent: list[dict] = []
+    frames = asyncio.Event()
+    aborted = stream_stats.aborted
+    wasted_bytes = stream_stats.wasted_bytes
+
+    async def receive() -> dict:
+        await frames.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+        if len(sent) > 3:
+            frames.set()
+
+    response = ChatStreamingResponse(_endless_stream(closed))
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+    await asyncio.wait_for(response(scope, receive, send), 1)
+
+    assert closed.is_set()
+    assert stream_stats.aborted == aborted + 1
+    assert stream_stats.wasted_bytes > wasted_bytes
+    assert not tick_scheduler()._buckets
+
+
+@pytest.mark.asyncio
+async def test_completed_stream_is_not_aborted():
+    async def deltas():
+        yield "hi"
+
+    async def receive() -> dict:
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    sent: list[dict] = []
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    completed, aborted = stream_stats.completed, stream_stats.aborted
+    response = ChatStreamingResponse(ChatCompletionStream("m", deltas()))
+    await asyncio.wait_for(response({"type": "http"}, receive, send), 1)
+
+    assert sent[-2]["body"] == b"data: [DONE]\n\n"
+    assert stream_stats.completed == completed + 1
+    assert stream_stats.aborted == aborted
+
+
+@pytest.mark.asyncio
+async def test_coalescing_merges_frames_within_flush_interval():
+    async def deltas():
+        for _ in range(5):
+            yield "a"
+        await asyncio.sleep(0.2)
+        for _ in range(5):
+            yield "b"
+
+    async def receive() -> dict:
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    bodies: list[bytes] = []
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body":
+            bodies.append(message["body"])
+
+    stream = ChatCompletionStream("m", deltas())
+    response = ChatStreamingResponse(stream, flush_interval=0.05)
+    await asyncio.wait_for(response({"type": "http"}, receive, send), 1)
+
+    assert len(bodies) == 3
+    assert bodies[0].count(b'"content":"a"') == 5
+    assert bodies[1].count(b'"content":"b"') == 5
+    assert bodies[1].endswith(b"data: [DONE]\n\n")
+    assert bodies[2] == b""
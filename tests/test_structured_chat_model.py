@@ -25,9 +25,7 @@ async def async_noop(*args, **kwargs):
 
 @pytest.mark.asyncio
 async def test_structured_chat_json_schema_stream(monkeypatch):
-    monkeypatch.setattr(
-        "mock_ai.models.chat.structured_chat.asyncio.sleep", async_noop
-    )
+    monkeypatch.setattr("mock_ai.pacing.Pacer.wait", async_noop)
     model = StructuredChatModel()
     schema = {
         "type": "object",
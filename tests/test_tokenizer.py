@@ -0,0 +1,126 @@
+import base64
+
+from mock_ai.tokenizer import (
+    BpeTokenCounter,
+    HeuristicTokenCounter,
+    message_digest,
+)
+
+
+def test_heuristic_counter_walks_multimodal_content():
+    counter = HeuristicTokenCounter()
+    assert counter.count_text("") == 0
+    assert counter.count_text("abcde") == 2
+
+    messages = [
+        {"role": "system", "content": "abcd"},
+        {"role": "user", "name": "bob", "content": None},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "abcdefgh"},
+                {
+                    "type": "image_url",
+                    "image_url": {"url": "data:" + "A" * 999},
+                },
+            ],
+        },
+        {
+            "role": "assistant",
+            "tool_calls": [
+                {"function": {"name": "add", "arguments": '{"a": 1}'}}
+            ],
+        },
+    ]
+    assert counter.count_messages(messages) == (
+        counter.TOKENS_PER_REPLY
+        + (3 + 1)
+        + (3 + 1 + 1)
+        + (3 + 2 + counter.TOKENS_PER_MEDIA_PART)
+        + (3 + 1 + 2)
+    )
+
+
+def test_counter_tolerates_malformed_messages():
+    counter = HeuristicTokenCounter()
+    messages = [
+        {"role": "user", "name": 5, "content": "abcd"},
+        {"role": "assistant", "tool_calls": ["x", {"function": "add"}]},
+        {"role": "assistant", "tool_calls": 3},
+    ]
+    assert counter.count_messages(messages) == (
+        counter.TOKENS_PER_REPLY + (3 + 1 + 1 + 1) + 3 + 3
+    )
+
+
+def _write_vocab(path, tokens):
+    path.write_text(
+        "\n".join(
+            f"{base64.b64encode(token).decode()} {rank}"
+            for rank, token in enumerate(tokens)
+        )
+    )
+
+
+def test_bpe_counter_merges_by_rank(tmp_path):
+    vocab = tmp_path / "vocab.tiktoken"
+    single_bytes = [bytes([i]) for i in range(256)]
+    _write_vocab(vocab, [*single_bytes, b"he", b"ll", b"hell", b"hello"])
+    counter = BpeTokenCounter.from_file(vocab)
+
+    assert counter.count_text("hello") == 1
+    assert counter.count_text("hellx") == 2
+    assert counter.count_text("hex") == 2
+    assert counter.count_text("hello hello") == 1 + 2
+
+
+def test_bpe_counter_memoizes_messages(tmp_path):
+    vocab = tmp_path / "vocab.tiktoken"
+    _write_vocab(vocab, [bytes([i]) for i in range(256)])
+    counter = BpeTokenCounter.from_file(vocab)
+    calls = []
+    count_message = counter._count_message
+
+    def spy(message):
+        calls.append(message)
+        return count_message(message)
+
+    counter._count_message = spy
+    conversation = [{"role": "user", "content": "abc"}]
+    first = counter.count_messages(conversation)
+    conversation.append({"role": "assistant", "content": "de"})
+    second = counter.count_messages(conversation)
+
+    assert second - first == 3 + 2
+    assert len(calls) == 2
+
+
+def test_message_digest_walks_content_parts():
+    def image(url, text="look"):
+        return {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": text},
+                {"type": "image_url", "image_url": {"url": url}},
+            ],
+        }
+
+    digests = {
+        message_digest(message)
+        for message in (
+            image("data:" + "A" * 999),
+            image("data:" + "A" * 998),
+            image("data:" + "A" * 999, text="look!"),
+            {"role": "user", "content": "look"},
+            {"role": "user", "content": ["look"]},
+            {"role": "user", "content": [{"type": "text", "text": "look"}]},
+            {"role": "user", "content": [1]},
+            {"role": "user", "content": ["1"]},
+            {"role": "user", "content": ["ab", "c"]},
+            {"role": "user", "content": ["a", "bc"]},
+        )
+    }
+    assert len(digests) == 10
+    assert message_digest(image("data:xyz")) == message_digest(
+        image("data:xyz")
+    )
@@ -1,6 +1,7 @@
 import sys
 from collections.abc import Iterator
 
+import numpy as np
 import pytest
 from pydantic import BaseModel
 
@@ -8,9 +9,13 @@ from mock_ai.utils import (
     SSEEncoder,
     Token,
     TokenBatchFactory,
+    TokenVocabulary,
     check_image_id,
     gen_image_id,
+    generate_noise_image_from_string,
     get_data_from_image_id,
+    normal_from_string,
+    normal_rows,
     parse_dimensions,
 )
 
@@ -128,3 +133,64 @@ def test_token_and_batch(monkeypatch):
     expected = "".join(token[i] for i in range(6))
     assert out2 == expected
     assert len(batch) == 6
+
+
+def test_token_vocabulary_matches_token():
+    vocabulary = TokenVocabulary(n=150)
+    token = Token(n=150)
+    assert len(vocabulary) == 150
+    assert vocabulary.table == [token[i] for i in range(150)]
+
+    indexes = np.array([1, 10, 100, 42])
+    assert vocabulary.decode(indexes) == "[1][10] [100]\n[42]"
+
+    long_indexes = np.arange(1, 150).repeat(3)
+    expected = "".join(token[i] for i in long_indexes)
+    assert len(long_indexes) >= vocabulary.GATHER_THRESHOLD
+    assert vocabulary.decode(long_indexes) == expected
+
+
+def test_token_vocabulary_stops_at_stop_token():
+    vocabulary = TokenVocabulary(n=10, stop_token=7)
+    assert vocabulary.decode(np.array([3, 4, 7, 5, 7])) == "[3][4]"
+    assert vocabulary.decode(np.array([3, 4])) == "[3][4]"
+    assert vocabulary.decode(np.full(300, 7)) == ""
+
+    long_indexes = np.array([1] * 300 + [7, 2])
+    assert vocabulary.decode(long_indexes) == "[1]" * 300
+
+
+def test_token_vocabulary_draw_is_in_range():
+    vocabulary = TokenVocabulary(n=10)
+    indexes = vocabulary.draw(1000, np.random.default_rng(0))
+    assert indexes.shape == (1000,)
+    assert indexes.min() >= 0
+    assert indexes.max() < 10
+
+
+def test_normal_rows_match_single_inputs():
+    keys = ["a", "b", "a", "c"]
+    rows = normal_rows(keys, 7)
+    assert rows.dtype == np.float32 and rows.shape == (4, 7)
+    np.testing.assert_allclose(np.linalg.norm(rows, axis=1), 1, rtol=1e-6)
+    for key, row in zip(keys, rows, strict=True):
+        assert np.array_equal(row, normal_from_string(key, 7))
+    assert np.array_equal(rows[0], rows[2])
+    assert not np.array_equal(rows[0], rows[1])
+
+
+def test_noise_image_is_deterministic_and_tiled(monkeypatch):
+    monkeypatch.setattr("mock_ai.utils.NOISE_TILE_VALUES", 1000)
+    img = generate_noise_image_from_string("key", 300, 200)
+    pixels = np.asarray(img)
+    assert img.mode == "RGB" and pixels.shape == (200, 300, 3)
+    assert np.array_equal(
+        pixels, np.asarray(generate_noise_image_from_string("key", 300, 200))
+    )
+    assert not np.array_equal(
+        pixels, np.asarray(generate_noise_image_from_string("other", 300, 200))
+    )
+    # Normal noise stretched over its extremes: centred, spread about a
+    # sixth of the range on either side.
+    assert abs(pixels.mean() - 127.5) < 1
+    assert 22 < pixels.std() < 30